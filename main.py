@@ -2,13 +2,16 @@ import traceback
 import src.tts as tts
 import src.stt as stt
 import logging
-import os
-import time
 import src.output_manager as output_manager
 import src.game_manager as game_manager
-import src.character_manager as character_manager
+from src.game_io.transport import create_transport
+from src.character_registry import CharacterRegistry
+from src.character_admission import CharacterAdmission
+from src.voice_resolution import VoiceResolver
 import src.characters_manager as characters_manager
 import src.setup as setup
+from src.startup import Startup
+from src.llm.openai_client import openai_client
 from src.conversation.conversation import conversation
 from src.conversation.context import context
 from src.remember.remembering import remembering
@@ -18,34 +21,64 @@ from src.remember.summaries import summaries
 game_state_manager = None
 
 try:
-    config, character_df, language_info, client, FO4_Voice_folder_and_models_df = setup.initialise(
+    config = setup.initialise(
         config_file='config.ini',
-        logging_file='logging.log', 
-        secret_key_file='GPT_SECRET_KEY.txt', 
-        #Additional df_file added to support Fallout 4 data/fallout4_characters.csv, keep in mind there's also a new file in data\Fallout4\FO4_Voice_folder_XVASynth_matches.csv
-        character_df_files=('data/Skyrim/skyrim_characters.csv', 'data/Fallout4/fallout4_characters.csv'), 
-        language_file='data/language_support.csv',
-        FO4_XVASynth_file='data\\Fallout4\\FO4_Voice_folder_XVASynth_matches.csv'
+        logging_file='logging.log'
     )
 
-    token_limit = client.token_limit
     starting_prompt_token_limit_percent: float = 0.5
     mantella_version = '0.11.2'
     logging.log(24, f'\nMantella v{mantella_version}')
 
-    # Check if the mic setting has been configured in MCM
-    # If it has, use this instead of the config.ini setting, otherwise take the config.ini value
-    if os.path.exists(f'{config.game_path}/_mantella_microphone_enabled.txt'):
-        with open(f'{config.game_path}/_mantella_microphone_enabled.txt', 'r', encoding='utf-8') as f:
-            mcm_mic_enabled = f.readline().strip()
-        config.mic_enabled = '1' if mcm_mic_enabled == 'TRUE' else '0'
-
-    synthesizer = tts.Synthesizer(config,character_df)
-    game_state_manager = game_manager.GameStateManager(config.game_path, config.game)
-    chat_manager = output_manager.ChatManager(game_state_manager, config, synthesizer, client)
-    transcriber = stt.Transcriber(game_state_manager, config, client.api_key)    
+    def start_game_state_manager(config):
+        global game_state_manager
+        game_state_manager = game_manager.GameStateManager(config.game_path, config.game, create_transport(config))
+
+        # Check if the mic setting has been configured in MCM
+        # If it has, use this instead of the config.ini setting, otherwise take the config.ini value
+        mcm_mic_enabled = game_state_manager.read_game_info('_mantella_microphone_enabled')
+        if mcm_mic_enabled:
+            config.mic_enabled = '1' if mcm_mic_enabled == 'TRUE' else '0'
+        return game_state_manager
+
+    def start_voice_resolver(config, characters, FO4_voice_folders_and_models):
+        voice_resolver = VoiceResolver(config.game, characters.stores, FO4_voice_folders_and_models)
+        characters.add_listener(voice_resolver.set_characters)
+        characters.start()
+        return voice_resolver
+
+    def start_chat_manager(game_state_manager, config, synthesizer, client):
+        chat_manager = output_manager.ChatManager(game_state_manager, config, synthesizer, client)
+        chat_manager.pygame_initialize()
+        return chat_manager
+
+    # independent components start in parallel (eg the LLM endpoint, xVASynth and Whisper), each one as soon as what it needs is ready
+    startup = Startup()
+    startup.add('config', lambda: config)
+    #Additional df_file added to support Fallout 4 data/fallout4_characters.csv, keep in mind there's also a new file in data\Fallout4\FO4_Voice_folder_XVASynth_matches.csv
+    startup.add('character_store', lambda config: setup.load_character_store(config, ('data/Skyrim/skyrim_characters.csv', 'data/Fallout4/fallout4_characters.csv')), 'config')
+    startup.add('FO4_voice_folders_and_models', lambda config: setup.load_FO4_voice_folders_and_models(config, 'data\\Fallout4\\FO4_Voice_folder_XVASynth_matches.csv'), 'config')
+    startup.add('language_info', lambda config: setup.load_language_info(config, 'data/language_support.csv'), 'config')
+    startup.add('client', lambda config: openai_client(config, 'GPT_SECRET_KEY.txt'), 'config')
+    startup.add('game_state_manager', start_game_state_manager, 'config')
+    startup.add('synthesizer', tts.Synthesizer, 'config', 'character_store')
+    startup.add('characters', lambda character_store, config: CharacterRegistry(character_store, config.character_overlay_folder), 'character_store', 'config')
+    startup.add('voice_resolver', start_voice_resolver, 'config', 'characters', 'FO4_voice_folders_and_models')
+    startup.add('chat_manager', start_chat_manager, 'game_state_manager', 'config', 'synthesizer', 'client')
+    startup.add('transcriber', lambda game_state_manager, config, client: stt.Transcriber(game_state_manager, config, client.api_key), 'game_state_manager', 'config', 'client')
+    components = startup.run()
+
+    language_info = components['language_info']
+    client = components['client']
+    synthesizer = components['synthesizer']
+    characters = components['characters']
+    voice_resolver = components['voice_resolver']
+    chat_manager = components['chat_manager']
+    transcriber = components['transcriber']
+    token_limit = client.token_limit
+
+    character_admission = CharacterAdmission(game_state_manager, characters, voice_resolver, language_info['language'], config.game)
     rememberer: remembering = summaries(config.memory_prompt, config.resummarize_prompt, client, language_info['language'], config.game)
-    chat_manager.pygame_initialize()
 
     # end any lingering conversations from previous run
     game_state_manager.write_game_info('_mantella_end_conversation', 'True')
@@ -54,9 +87,9 @@ try:
         # clear _mantella_ files in Skyrim or Fallout4 folder
         character_name, character_id, location, in_game_time = game_state_manager.reset_game_info()
         if config.debug_mode == "1":        
-            character_name, character_id, location, in_game_time = game_state_manager.debugging_setup(config.debug_character_name, character_df)
+            character_name, character_id, location, in_game_time = game_state_manager.debugging_setup(config.debug_character_name, characters)
             character_info, location, in_game_time, is_generic_npc = game_state_manager.load_game_state(
-                config.debug_mode, config.debug_character_name, character_df, character_name, character_id, location, in_game_time, FO4_Voice_folder_and_models_df
+                config.debug_mode, config.debug_character_name, characters, character_name, character_id, location, in_game_time, voice_resolver
             )
             
         
@@ -66,29 +99,27 @@ try:
 
         #base setup for conversation
         num_characters_selected = 0
+        character_admission.reset()
         context_for_conversation = context(config, rememberer, language_info, client, starting_prompt_token_limit_percent)
 
-        with open(f'{config.game_path}/_mantella_radiant_dialogue.txt', 'r', encoding='utf-8') as f:
-            is_radiant_dialogue = f.readline().strip().lower() == 'true'
+        is_radiant_dialogue = game_state_manager.read_game_info('_mantella_radiant_dialogue').lower() == 'true'
 
         talk = conversation(context_for_conversation, transcriber, synthesizer, game_state_manager, chat_manager, rememberer, is_radiant_dialogue, token_limit, config.max_tokens)
 
         while True: # Start conversation loop
             try:
-                num_characters_selected = int(game_state_manager.load_data_when_available('_mantella_actor_count', ''))
-
-                while num_characters_selected == 0: # if this is the first character, wait for this character to load
-                    num_characters_selected = int(game_state_manager.load_data_when_available('_mantella_actor_count', ''))
-                    time.sleep(0.1)
+                # if this is the first character, wait for this character to load
+                num_characters_selected = int(game_state_manager.wait_for('_mantella_actor_count', lambda count: count not in ('', '0')))
             except:
                 logging.info('Failed to read _mantella_actor_count.txt')
 
             # check if a new character has been added to conversation
             if num_characters_selected > context_for_conversation.npcs_in_conversation.active_character_count():
                 try:
-                    # load character when data is available
-                    character_info, location, in_game_time, is_generic_npc = game_state_manager.load_game_state(
-                        config.debug_mode, config.debug_character_name, character_df, character_name, character_id, location, in_game_time, FO4_Voice_folder_and_models_df
+                    # load every newly selected character when their data is available
+                    new_characters, location, in_game_time = character_admission.admit(
+                        num_characters_selected - context_for_conversation.npcs_in_conversation.active_character_count(),
+                        config.debug_mode, config.debug_character_name, character_name, character_id, location, in_game_time
                     )
                 except game_manager.CharacterDoesNotExist:
                     game_state_manager.write_game_info('_mantella_end_conversation', 'True')
@@ -98,20 +129,18 @@ try:
                 context_for_conversation.location = location
                 context_for_conversation.ingame_time = int(in_game_time)
 
-                character = character_manager.Character(character_info, language_info['language'], is_generic_npc, config.game)
-                if num_characters_selected == 1: 
-                    #Only automatically preload the voice model for the first character, can't predict who will talk first/next in multi-npc or radiant
-                    #synthesizer.change_voice(character.voice_model)
-                    chat_manager.character_num = 0
-                    chat_manager.active_character = character
-                game_state_manager.write_game_info('_mantella_character_selection', 'True')
-                # if the NPC is from a mod, create the NPC's voice folder and exit Mantella
-                chat_manager.setup_voiceline_save_location(character_info['in_game_voice_model'])
-                talk.add_character(character)
-
-            with open(f'{config.game_path}/_mantella_end_conversation.txt', 'r', encoding='utf-8') as f:
-                if f.readline().strip().lower() == 'true':
-                    talk.end()
+                for character in new_characters:
+                    if num_characters_selected == 1: 
+                        #Only automatically preload the voice model for the first character, can't predict who will talk first/next in multi-npc or radiant
+                        #synthesizer.change_voice(character.voice_model)
+                        chat_manager.character_num = 0
+                        chat_manager.active_character = character
+                    # if the NPC is from a mod, create the NPC's voice folder and exit Mantella
+                    chat_manager.setup_voiceline_save_location(character.in_game_voice_model)
+                    talk.add_character(character)
+
+            if game_state_manager.read_game_info('_mantella_end_conversation').lower() == 'true':
+                talk.end()
 
             # proceed the conversation
             if not talk.proceed():
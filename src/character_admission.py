@@ -0,0 +1,91 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.character_manager import Character
+from src.character_registry import CharacterRegistry
+from src.game_manager import GameStateManager
+from src.voice_resolution import VoiceResolver
+
+
+class CharacterAdmission:
+    """Loads the NPCs that joined a conversation, several at a time.
+
+    The game hands over one actor at a time through the same _mantella_ files, so each actor's data is still read in turn.
+    Every actor is acknowledged through _mantella_character_selection as soon as their data has been read, so the game can send
+    the next one while the slow part of loading the previous one (their conversation folder, summary and history) runs on a thread pool.
+    An actor is only read once the game has handed over a new one since the last actor was admitted: it lowers _mantella_character_selection
+    again, or changes the actor's name or ID. Actors that share a name and ID (eg two guards) can only be told apart by the former.
+    As the game writes the name and ID one after the other, both are given a moment to change before the actor is read.
+    """
+    NEXT_ACTOR_TIMEOUT = 2
+    # seconds to wait for both the actor's name and ID to change once the game has started handing over the next actor
+    NEXT_ACTOR_DATA_TIMEOUT = 0.25
+
+    def __init__(self, game_state_manager: GameStateManager, characters: CharacterRegistry, voice_resolver: VoiceResolver, language_name: str, game: str, max_workers: int = 4) -> None:
+        self.__game_state_manager: GameStateManager = game_state_manager
+        self.__characters: CharacterRegistry = characters
+        self.__voice_resolver: VoiceResolver = voice_resolver
+        self.__language_name: str = language_name
+        self.__game: str = game
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='CharacterAdmission')
+        # name and ID of the last actor admitted in this conversation
+        self.__previous_actor: tuple[str, str] | None = None
+
+    def reset(self):
+        """Forgets the actors of the previous conversation, so the first actor of the next one is read straight away"""
+        self.__previous_actor = None
+
+    def admit(self, count: int, debug_mode: str, debug_character_name: str, character_name, character_id, location, in_game_time) -> tuple[list[Character], str, str]:
+        """Reads the data of up to `count` newly selected actors and loads them as Characters
+
+        Returns:
+            tuple[list[Character], str, str]: the new characters in the order the game sent them (fewer than `count` if the game
+            did not hand over the rest within NEXT_ACTOR_TIMEOUT seconds each), the location and the in-game time
+        """
+        pending: list[Future[Character]] = []
+        for _ in range(count):
+            if self.__previous_actor is not None and not self.__wait_for_next_actor(self.__previous_actor):
+                logging.warning(f'The game did not send the next NPC within {self.NEXT_ACTOR_TIMEOUT} seconds')
+                break
+            character_info, location, in_game_time, is_generic_npc = self.__game_state_manager.load_game_state(
+                debug_mode, debug_character_name, self.__characters, character_name, character_id, location, in_game_time, self.__voice_resolver
+            )
+            self.__previous_actor = self.__read_current_actor()
+            self.__game_state_manager.write_game_info('_mantella_character_selection', 'True')
+            pending.append(self.__executor.submit(self.__load_character, character_info, is_generic_npc))
+
+        return [future.result() for future in pending], location, in_game_time
+
+    def __read_current_actor(self) -> tuple[str, str]:
+        return self.__game_state_manager.read_game_info('_mantella_current_actor'), self.__game_state_manager.read_game_info('_mantella_current_actor_id')
+
+    def __wait_for_next_actor(self, previous_actor: tuple[str, str]) -> bool:
+        """Waits until the game hands over another actor
+
+        Returns:
+            bool: False if it did not within NEXT_ACTOR_TIMEOUT seconds
+        """
+        previous_name, previous_id = previous_actor
+        is_new_actor = {
+            '_mantella_current_actor': lambda text: text not in ('', previous_name),
+            '_mantella_current_actor_id': lambda text: text not in ('', previous_id),
+        }
+        try:
+            self.__game_state_manager.wait_for_any({'_mantella_character_selection': lambda text: text.lower() == 'false', **is_new_actor}, timeout=self.NEXT_ACTOR_TIMEOUT)
+        except TimeoutError:
+            return False
+        # otherwise a name read before the game wrote the new ID would be paired with the previous actor's ID
+        deadline = time.monotonic() + self.NEXT_ACTOR_DATA_TIMEOUT
+        for key, predicate in is_new_actor.items():
+            try:
+                self.__game_state_manager.wait_for_any({key: predicate}, timeout=max(0, deadline - time.monotonic()))
+            except TimeoutError:
+                # the same name or ID as the previous actor
+                pass
+        return True
+
+    def __load_character(self, character_info: dict, is_generic_npc: bool) -> Character:
+        character = Character(character_info, self.__language_name, is_generic_npc, self.__game)
+        # otherwise the first prompt reads the summary and parses the history of every NPC in turn
+        character.preload()
+        return character
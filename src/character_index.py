@@ -0,0 +1,80 @@
+import logging
+import src.utils as utils
+from src.character_store import CharacterStore
+
+
+def _as_text(value) -> str:
+    """A CSV cell as the text the lookup compares, where an empty cell is 'nan' (as it was when the CSV was read with pandas)"""
+    return 'nan' if value is None else str(value)
+
+
+class CharacterIndex:
+    """Looks up rows of skyrim_characters.csv / fallout4_characters.csv in constant time.
+    Built once at startup: every combination `find` can match on gets its own hash map, holding the first row (in file order) with that key.
+    """
+    FULL_ID_LENGTH = 6
+    PARTIAL_ID_LENGTH = 3
+
+    @utils.time_it
+    def __init__(self, character_store: CharacterStore) -> None:
+        self.__store: CharacterStore = character_store
+        self.__by_name_id_race: dict[tuple[str, str, str], int] = {}
+        self.__by_name_id: dict[tuple[str, str], int] = {}
+        self.__by_name_partial_id_race: dict[tuple[str, str, str], int] = {}
+        self.__by_name_partial_id: dict[tuple[str, str], int] = {}
+        self.__by_name_race: dict[tuple[str, str], int] = {}
+        self.__by_name: dict[str, int] = {}
+        self.__by_id: dict[str, int] = {}
+
+        for row, (name, base_id, race) in enumerate(zip(character_store.column('name'), character_store.column('base_id'), character_store.column('race'))):
+            name = _as_text(name).lower()
+            base_id = _as_text(base_id).lower()
+            full_id = base_id[-self.FULL_ID_LENGTH:]
+            partial_id = base_id[-self.PARTIAL_ID_LENGTH:]
+            race = _as_text(race).lower()
+
+            self.__by_name_id_race.setdefault((name, full_id, race), row)
+            self.__by_name_id.setdefault((name, full_id), row)
+            self.__by_name_partial_id_race.setdefault((name, partial_id, race), row)
+            self.__by_name_partial_id.setdefault((name, partial_id), row)
+            self.__by_name_race.setdefault((name, race), row)
+            self.__by_name.setdefault(name, row)
+            self.__by_id.setdefault(full_id, row)
+        logging.debug(f'Indexed {len(character_store)} characters')
+
+    def __len__(self) -> int:
+        return len(self.__store)
+
+    def find(self, character_name: str, character_id: str, character_race: str) -> dict | None:
+        """Finds the character in the same order of precedence as matching the CSV column by column:
+        name, full ID and race (needed for Fallout 4 NPCs like Curie) / name and full ID / name, partial ID and race /
+        name and partial ID / name and race / just name / just full ID
+
+        Returns:
+            dict | None: the character's row, or None if nothing matches (a generic NPC)
+        """
+        match = self.match(character_name, character_id, character_race)
+        return None if match is None else self.__store.to_dict(match[1])
+
+    def match(self, character_name: str, character_id: str, character_race: str) -> tuple[int, int] | None:
+        """Like `find`, but returns how the character matched (0 = name, full ID and race ... 6 = just full ID) and its row,
+        so that matches from several indexes can be compared
+        """
+        name = character_name.lower()
+        full_id = character_id[-self.FULL_ID_LENGTH:]
+        partial_id = character_id[-self.PARTIAL_ID_LENGTH:]
+        race = character_race.lower()
+
+        for level, (index, key) in enumerate((
+            (self.__by_name_id_race, (name, full_id, race)),
+            (self.__by_name_id, (name, full_id)),
+            (self.__by_name_partial_id_race, (name, partial_id, race)),
+            (self.__by_name_partial_id, (name, partial_id)),
+            (self.__by_name_race, (name, race)),
+            (self.__by_name, name),
+            (self.__by_id, full_id),
+        )):
+            row = index.get(key)
+            if row is not None:
+                return level, row
+        return None
@@ -6,6 +6,7 @@ from pathlib import Path
 import sys
 
 from src.llm.message_thread import message_thread
+from src.character_profiles import get_file_signature, profile_cache
 
 class Character:
     def __init__(self, info, language, is_generic_npc, game):
@@ -28,12 +29,39 @@ class Character:
             self.conversation_folder = f"data/{game.replace('VR','')}/conversations"
         
         self.conversation_history_file = f"{self.conversation_folder}/{self.name}/{self.name}.json"
+        # what is read from this folder is shared with every later Character of the same NPC, see CharacterProfileCache
+        self.__profile_folder = f"{self.conversation_folder}/{self.name}"
         self.conversation_summary_file = self.get_latest_conversation_summary_file_path()
         self.conversation_summary = ''
 
+    def preload(self):
+        """Reads the latest conversation summary and counts the previous messages ahead of the first prompt, eg from a worker thread"""
+        self.load_conversation_summary()
+        self.get_message_count()
+
+    def load_conversation_summary(self) -> str:
+        """Returns the latest conversation summary, or '' if there is no conversation history yet"""
+        self.conversation_summary = profile_cache.get(self.__profile_folder, 'summary', self.__get_summary_signature(), self.__read_conversation_summary)
+        return self.conversation_summary
+
+    def set_conversation_summary(self, conversation_summary: str, conversation_summary_file: str | None = None):
+        """Updates the summary after it has been written to conversation_summary_file (or to a new `conversation_summary_file`)"""
+        if conversation_summary_file:
+            self.conversation_summary_file = conversation_summary_file
+        self.conversation_summary = conversation_summary
+        profile_cache.set(self.__profile_folder, 'summary_file', get_file_signature(self.__profile_folder), self.conversation_summary_file)
+        profile_cache.set(self.__profile_folder, 'summary', self.__get_summary_signature(), conversation_summary)
+
+    def get_message_count(self) -> int:
+        """Number of messages in all previous conversations with this NPC"""
+        return profile_cache.get(self.__profile_folder, 'message_count', get_file_signature(self.conversation_history_file), lambda: len(self.load_conversation_log()))
+
     def get_latest_conversation_summary_file_path(self):
         """Get latest conversation summary by file name suffix"""
+        # files are only added to the folder, which updates its mtime
+        return profile_cache.get(self.__profile_folder, 'summary_file', get_file_signature(self.__profile_folder), self.__find_latest_conversation_summary_file)
 
+    def __find_latest_conversation_summary_file(self) -> str:
         if os.path.exists(f"{self.conversation_folder}/{self.name}"):
             # get all files from the directory
             files = os.listdir(f"{self.conversation_folder}/{self.name}")
@@ -52,6 +80,16 @@ class Character:
         
         conversation_summary_file = f"{self.conversation_folder}/{self.name}/{self.name}_summary_{latest_file_number}.txt"
         return conversation_summary_file
+
+    def __get_summary_signature(self) -> tuple:
+        # the summary only counts once the conversation history exists
+        return (os.path.exists(self.conversation_history_file), self.conversation_summary_file, get_file_signature(self.conversation_summary_file))
+
+    def __read_conversation_summary(self) -> str:
+        if os.path.exists(self.conversation_history_file) and os.path.exists(self.conversation_summary_file):
+            with open(self.conversation_summary_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        return ''
     
     def save_conversation_log(self, messages: message_thread):
         # save conversation history
@@ -73,6 +111,8 @@ class Character:
             
             with open(self.conversation_history_file, 'w', encoding='utf-8') as f:
                 json.dump(conversation_history, f, indent=4) # save everything except the initial system prompt
+            # the mtime may not have changed if the history was written within the file system's time resolution
+            profile_cache.invalidate(self.__profile_folder, 'message_count', 'summary_file', 'summary')
         else:
             logging.info('Conversation history will not be saved for this generic NPC.')
     
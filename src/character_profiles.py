@@ -0,0 +1,79 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+T = TypeVar('T')
+
+
+def get_file_signature(path: str) -> tuple[int, int] | None:
+    """The mtime and size of `path`, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class CharacterProfileCache:
+    """What has been read from the conversation folders of the most recently met NPCs, kept for as long as Mantella runs.
+
+    A new Character is created every time an NPC joins a conversation, so without this cache talking to the same NPC again would
+    list their folder for the latest summary file and parse their whole conversation history again.
+    Each value is stored with the signature (eg mtime and size) of the files it was read from, and is read again if the signature
+    no longer matches, so edits made outside of Mantella are still picked up. Mantella's own writes update or invalidate values directly.
+    """
+    MAX_PROFILES = 256
+
+    def __init__(self, max_profiles: int = MAX_PROFILES) -> None:
+        self.__max_profiles: int = max_profiles
+        # NPC conversation folder -> value name -> (signature, value), least recently used first
+        self.__profiles: OrderedDict[str, dict[str, tuple[Any, Any]]] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def get(self, folder: str, name: str, signature: Any, load: Callable[[], T]) -> T:
+        """Returns the value `name` of the NPC whose conversations are stored in `folder`, calling `load()` if it is missing or its signature changed"""
+        with self.__lock:
+            cached = self.__get_profile(folder).get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        value = load()
+        self.set(folder, name, signature, value)
+        return value
+
+    def set(self, folder: str, name: str, signature: Any, value: Any):
+        with self.__lock:
+            self.__get_profile(folder)[name] = (signature, value)
+
+    def invalidate(self, folder: str, *names: str):
+        """Forgets the given values of an NPC (or all of them if no name is given), so they are read again on next use"""
+        with self.__lock:
+            profile = self.__profiles.get(folder)
+            if profile is None:
+                return
+            if names:
+                for name in names:
+                    profile.pop(name, None)
+            else:
+                del self.__profiles[folder]
+
+    def clear(self):
+        with self.__lock:
+            self.__profiles.clear()
+
+    def __len__(self) -> int:
+        return len(self.__profiles)
+
+    def __get_profile(self, folder: str) -> dict[str, tuple[Any, Any]]:
+        profile = self.__profiles.get(folder)
+        if profile is None:
+            profile = self.__profiles[folder] = {}
+            if len(self.__profiles) > self.__max_profiles:
+                self.__profiles.popitem(last=False)
+        else:
+            self.__profiles.move_to_end(folder)
+        return profile
+
+
+# shared by every Character, so that what was read about an NPC outlives the conversation they were in
+profile_cache = CharacterProfileCache()
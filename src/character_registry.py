@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable
+import src.utils as utils
+from src.character_index import CharacterIndex
+from src.character_store import CharacterStore
+from src.data_table import read_csv
+
+
+def read_overlay(file_name: str) -> CharacterStore:
+    """Reads an overlay CSV, which has the same columns as the game's character CSV (missing columns are left empty)"""
+    encoding = utils.get_file_encoding(file_name)
+    columns, rows = read_csv(file_name, encoding)
+    rows = [row for row in rows if row.get('voice_model') is not None]
+    for row in rows:
+        row['advanced_voice_model'] = row.get('advanced_voice_model') or ''
+    # overlays are small and change often, so their text stays in memory
+    return CharacterStore(columns, rows)
+
+
+class CharacterRegistry:
+    """The characters of skyrim_characters.csv / fallout4_characters.csv merged with the overlay CSVs in `overlay_folder`.
+
+    Overlays can add NPCs or replace existing ones (eg to edit a bio) while Mantella is running: the folder is scanned every
+    `scan_interval` seconds, and only the overlays that were added, changed or removed are reloaded.
+    A character is matched as precisely as possible across all CSVs (see `CharacterIndex.find`). Between equally precise
+    matches, overlays win over the base CSV, and overlays later in alphabetical order win over earlier ones.
+    """
+    SCAN_INTERVAL = 1.0
+    # an overlay modified this many seconds before a scan could be saved again in the same mtime tick without changing size,
+    # so it is reloaded on the next scan as well (see ControlFileCache)
+    RACY_WINDOW = 0.05
+
+    def __init__(self, base_store: CharacterStore, overlay_folder: str | None = None, scan_interval: float = SCAN_INTERVAL, base_index: CharacterIndex | None = None) -> None:
+        self.__base: tuple[CharacterStore, CharacterIndex] = (base_store, base_index or CharacterIndex(base_store))
+        self.__overlay_folder: str | None = overlay_folder
+        self.__scan_interval: float = scan_interval
+        self.__lock: threading.Lock = threading.Lock()
+        # file name -> (mtime, size) it was loaded with (None if that could hide a later edit) / its characters, in order of precedence
+        self.__signatures: dict[str, tuple[int, int] | None] = {}
+        self.__overlays: dict[str, tuple[CharacterStore, CharacterIndex]] = {}
+        self.__ordered: list[tuple[CharacterStore, CharacterIndex]] = [self.__base]
+        self.__listeners: list[Callable[[list[CharacterStore]], None]] = []
+        self.__stopped: threading.Event = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+        if self.__overlay_folder:
+            try:
+                os.makedirs(self.__overlay_folder, exist_ok=True)
+            except OSError as e:
+                logging.debug(f'Could not create character overlay folder {self.__overlay_folder}: {e}')
+            self.scan()
+
+    @property
+    def stores(self) -> list[CharacterStore]:
+        """Every CSV's characters, in order of precedence (the base CSV last)"""
+        with self.__lock:
+            return [store for store, _ in self.__ordered]
+
+    def add_listener(self, callback: Callable[[list[CharacterStore]], None]):
+        """Calls `callback(stores)` after overlays have been reloaded, with the same list as `stores`"""
+        self.__listeners.append(callback)
+
+    def start(self) -> 'CharacterRegistry':
+        """Starts watching the overlay folder from a background thread"""
+        if self.__overlay_folder and self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, name='CharacterRegistry', daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stopped.set()
+
+    def find(self, character_name: str, character_id: str, character_race: str) -> dict | None:
+        """Finds a character across the base CSV and the overlays. See `CharacterIndex.find`"""
+        best = None
+        for store, index in self.__get_ordered():
+            match = index.match(character_name, character_id, character_race)
+            if match is not None and (best is None or match[0] < best[0]):
+                best = (match[0], store, match[1])
+                if match[0] == 0:
+                    break
+        return None if best is None else best[1].to_dict(best[2])
+
+    def find_value(self, column: str, value: str, result_column: str, default: Any = None) -> Any:
+        """Returns `result_column` of the first character whose `column` matches `value` (ignoring case), or `default` if there is none"""
+        for store, _ in self.__get_ordered():
+            row = store.find(column, value)
+            if row is not None:
+                return store.get(row, result_column, default)
+        return default
+
+    def scan(self) -> bool:
+        """Reloads the overlays that changed since the last scan
+
+        Returns:
+            bool: whether any overlay was added, changed or removed
+        """
+        signatures = {}
+        scanned_at_ns = time.time_ns()
+        try:
+            with os.scandir(self.__overlay_folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith('.csv'):
+                        stat = entry.stat()
+                        signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+
+        changed_files = [file_name for file_name, signature in signatures.items() if self.__signatures.get(file_name) != signature]
+        removed_files = [file_name for file_name in self.__signatures if file_name not in signatures]
+        if not changed_files and not removed_files:
+            return False
+
+        loaded = {}
+        for file_name in changed_files:
+            try:
+                store = read_overlay(os.path.join(self.__overlay_folder, file_name))
+                loaded[file_name] = (store, CharacterIndex(store))
+                logging.info(f'Loaded {len(store)} characters from {file_name}')
+            except Exception as e:
+                # most likely still being saved, it is read again once its signature changes
+                logging.warning(f'Could not read character overlay {file_name}, keeping its previous version: {e}')
+            is_racily_clean = signatures[file_name][0] + int(self.RACY_WINDOW * 1_000_000_000) >= scanned_at_ns
+            self.__signatures[file_name] = None if is_racily_clean else signatures[file_name]
+        for file_name in removed_files:
+            del self.__signatures[file_name]
+            logging.info(f'Removed characters of {file_name}')
+
+        with self.__lock:
+            for file_name in removed_files:
+                self.__overlays.pop(file_name, None)
+            self.__overlays.update(loaded)
+            self.__ordered = [self.__overlays[file_name] for file_name in sorted(self.__overlays, reverse=True)] + [self.__base]
+            stores = [store for store, _ in self.__ordered]
+
+        for callback in self.__listeners:
+            try:
+                callback(stores)
+            except Exception as e:
+                logging.error(f'Failed to apply character overlay changes: {e}')
+        return True
+
+    def __get_ordered(self) -> list[tuple[CharacterStore, CharacterIndex]]:
+        with self.__lock:
+            return self.__ordered
+
+    def __run(self):
+        while not self.__stopped.wait(self.__scan_interval):
+            self.scan()
@@ -0,0 +1,102 @@
+import logging
+import mmap
+import os
+import uuid
+from array import array
+from typing import Any, Iterable
+from src.data_table import DataTable
+
+
+class CharacterStore(DataTable):
+    """Holds the rows of skyrim_characters.csv / fallout4_characters.csv without keeping their free text in memory.
+
+    Lookup columns (name, voice model, race, IDs...) are kept as one tuple per row. Free text columns (bio, URLs, notes) are
+    written to a text file next to the CSV and only read when a character is loaded, through a byte offset index into a memory map of it.
+    If the text file cannot be written (eg a read-only install folder), the text is kept in memory instead.
+    """
+    TEXT_COLUMNS = ('bio', 'bio_url', 'author', 'note', 'author and notes')
+    TEXT_SUFFIX = '.text'
+
+    def __init__(self, columns: list[str], rows: Iterable[dict[str, Any]], text_file: str | None = None) -> None:
+        rows = list(rows)
+        self.__all_columns: tuple[str, ...] = tuple(columns)
+        self.__text_columns: tuple[str, ...] = tuple(column for column in self.__all_columns if column in self.TEXT_COLUMNS)
+        super().__init__([column for column in self.__all_columns if column not in self.TEXT_COLUMNS], rows)
+        # the text of row r, column c spans __offsets[r * len(text_columns) + c] up to the next offset
+        self.__offsets: array = array('Q', [0])
+
+        text = bytearray()
+        for row in rows:
+            for column in self.__text_columns:
+                value = row.get(column)
+                # missing text (None / NaN) is stored as an empty string
+                if isinstance(value, str):
+                    text += value.encode('utf-8')
+                self.__offsets.append(len(text))
+
+        self.__header: bytes = f'mantella character text {uuid.uuid4().hex}\n'.encode('ascii')
+        self.__text_file: str | None = text_file if text_file and self.__write_text_file(text_file, text) else None
+        self.__text_start: int = len(self.__header) if self.__text_file else 0
+        self.__text: bytes | mmap.mmap | None = None if self.__text_file else bytes(text)
+        logging.debug(f'Stored {len(self)} characters, {len(text)} bytes of text {"in " + self.__text_file if self.__text_file else "in memory"}')
+
+    @classmethod
+    def get_text_file(cls, csv_file: str) -> str:
+        return csv_file + cls.TEXT_SUFFIX
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        # the memory map is reopened on first use after unpickling
+        if self.__text_file:
+            state['_CharacterStore__text'] = None
+        return state
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self.__all_columns
+
+    def open_text(self) -> bool:
+        """Maps the text file into memory if it is not already
+
+        Returns:
+            bool: False if the text file is missing or was written for a different build of this store
+        """
+        if self.__text is not None:
+            return True
+        try:
+            with open(self.__text_file, 'rb') as f:
+                if f.readline() != self.__header or os.fstat(f.fileno()).st_size != len(self.__header) + self.__offsets[-1]:
+                    return False
+                self.__text = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logging.debug(f'Could not map {self.__text_file}: {e}')
+            return False
+        return True
+
+    def get(self, row: int, column: str, default: Any = None) -> Any:
+        if column in self.__text_columns:
+            return self.get_text(row, column)
+        return super().get(row, column, default)
+
+    def get_text(self, row: int, column: str) -> str:
+        if self.__text is None and not self.open_text():
+            raise OSError(f'{self.__text_file} is missing or out of date. Please restart Mantella to rebuild it.')
+        i = row * len(self.__text_columns) + self.__text_columns.index(column)
+        start, end = self.__offsets[i] + self.__text_start, self.__offsets[i + 1] + self.__text_start
+        return self.__text[start:end].decode('utf-8')
+
+    def __write_text_file(self, text_file: str, text: bytearray) -> bool:
+        temp_file = f'{text_file}.{os.getpid()}.tmp'
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(self.__header)
+                f.write(text)
+            os.replace(temp_file, text_file)
+            return True
+        except OSError as e:
+            logging.debug(f'Could not write {text_file}, keeping character text in memory: {e}')
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            return False
@@ -93,6 +93,9 @@ https://github.com/art-from-the-machine/Mantella#issues-qa
                 self.mod_path = config['Paths']['skyrim_mod_folder']
             
             logging.log(23, f'Mantella currently running for {self.game} ({self.game_path}). Mantella mod located in {self.mod_path}')
+            self.ipc_transport = config['Game']['ipc_transport'].strip().lower()
+            self.ipc_port = int(config['Game']['ipc_port'])
+            self.ipc_record_file = config['Game']['ipc_record_file'].strip()
             self.language = config['Language']['language']
             self.end_conversation_keyword = config['Language']['end_conversation_keyword']
             self.goodbye_npc_response = config['Language.Advanced']['goodbye_npc_response']
@@ -102,6 +105,9 @@ https://github.com/art-from-the-machine/Mantella#issues-qa
             self.follow_npc_response = config['Language.Advanced']['follow_npc_response']
 
             self.xvasynth_path = config['Paths']['xvasynth_folder']
+            self.character_overlay_folder = config['Paths']['character_overlay_folder'].strip()
+            if not self.character_overlay_folder:
+                self.character_overlay_folder = f"data/{self.game.replace('VR','')}/character_overlays"
             self.facefx_path = config['Paths']['facefx_folder']
             #Added from xTTS implementation
             self.xtts_server_path = config['Paths']['xtts_server_folder']
@@ -148,6 +154,8 @@ https://github.com/art-from-the-machine/Mantella#issues-qa
             self.xtts_lowvram = int(config['Speech.Advanced']['xtts_lowvram'])
             self.xtts_device = config['Speech.Advanced']['xtts_device']
             self.number_words_tts = int(config['Speech.Advanced']['number_words_tts'])
+            self.say_line_queue_depth = int(config['Speech.Advanced']['say_line_queue_depth'])
+            self.synthesis_look_ahead = int(config['Speech.Advanced']['synthesis_look_ahead'])
             self.xtts_url = config['Speech.Advanced']['xtts_url'].rstrip('/')
             self.xtts_data = config['Speech.Advanced']['xtts_data']
             self.xtts_accent = int(config['Speech.Advanced']['xtts_accent'])
@@ -158,6 +166,7 @@ https://github.com/art-from-the-machine/Mantella#issues-qa
             self.use_sr = int(config['Speech.Advanced']['use_sr'])
             self.FO4Volume = int(config['Speech.Advanced']['FO4_NPC_response_volume'])
             self.tts_print = int(config['Speech.Advanced']['tts_print'])
+            self.voiceline_cache_size = int(config['Speech.Advanced']['voiceline_cache_size'])
 
             self.remove_mei_folders = config['Cleanup']['remove_mei_folders']
             #Debugging
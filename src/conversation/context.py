@@ -99,7 +99,7 @@ class context:
         Returns:
             str: a natural text representing the trust
         """
-        trust_level = len(npc.load_conversation_log())
+        trust_level = npc.get_message_count()
         trust = 'a stranger'
         if npc.relationship_rank == 0:
             if trust_level < 1:
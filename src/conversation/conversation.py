@@ -39,6 +39,9 @@ class conversation:
             new_character (Character): the new character to add
         """
         self.__context.npcs_in_conversation.add_character(new_character)
+        # prepare the lines every NPC may end up saying (when the conversation ends, reloads or the LLM fails) while the player is still talking
+        config = self.__context.config
+        self.__output_manager.presynthesize_sentences([config.goodbye_npc_response, config.collecting_thoughts_npc_response, ChatManager.ERROR_RESPONSE], new_character)
 
         #switch to or continue multi-npc dialog
         if (isinstance(self.__conversation_type, pc_to_npc) and len(self.__context.npcs_in_conversation) > 1) or (isinstance(self.__conversation_type, multi_npc)):
@@ -190,8 +193,7 @@ class conversation:
         config = self.__context.config
         transcript_cleaned = utils.clean_text(last_user_text)
         # check if conversation has ended again after player input
-        with open(f'{config.game_path}/_mantella_end_conversation.txt', 'r', encoding='utf-8') as f:
-            conversation_ended = f.readline().strip()
+        conversation_ended = self.__game_manager.read_game_info('_mantella_end_conversation')
 
         # check if user is ending conversation
         return transcriber.activation_name_exists(transcript_cleaned, config.end_conversation_keyword.lower()) or (transcriber.activation_name_exists(transcript_cleaned, 'good bye')) or (conversation_ended.lower() == 'true')
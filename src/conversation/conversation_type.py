@@ -151,8 +151,7 @@ class radiant(conversation_type):
 
     def pre_proceed_conversation(self, context_for_conversation: context, messages: message_thread, game_state: GameStateManager):
         # check if radiant dialogue has switched to multi NPC
-            with open(f'{context_for_conversation.config.game_path}/_mantella_radiant_dialogue.txt', 'r', encoding='utf-8') as f:
-                context_for_conversation.should_switch_to_multi_npc_conversation = f.readline().strip().lower() != 'true'
+        context_for_conversation.should_switch_to_multi_npc_conversation = game_state.read_game_info('_mantella_radiant_dialogue').lower() != 'true'
     
     def get_user_message(self, context_for_conversation: context, stt: Transcriber, messages: message_thread) -> user_message:
         text = ""
@@ -0,0 +1,89 @@
+import hashlib
+import logging
+import os
+import pickle
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+CACHE_SUFFIX = '.cache'
+# bump when the cached layout of any file changes, so old caches are rebuilt instead of loaded
+CACHE_VERSION = 2
+
+
+def get_cache_path(file_name: str) -> str:
+    return file_name + CACHE_SUFFIX
+
+
+def hash_file(file_name: str) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cached(file_name: str, parse: Callable[[str], T], is_valid: Callable[[T], bool] | None = None) -> T:
+    """Loads the parsed contents of `file_name` from a pickle cache next to it, only running `parse(file_name)` when the file has changed.
+
+    The cache is keyed on the file's mtime, size and content hash: if the mtime and size still match the file is trusted as is,
+    otherwise it is hashed so that a touched or re-checked-out but unchanged file does not trigger a rebuild.
+    Failing to read or write the cache (eg a read-only install folder) falls back to parsing the file every time.
+    `is_valid` can reject cached data that depends on more than the file itself (eg files written alongside the cache).
+    """
+    cache_path = get_cache_path(file_name)
+    stat = os.stat(file_name)
+    content_hash = None
+
+    cached = read_cache(cache_path)
+    if cached is not None and is_valid is not None and not is_valid(cached['data']):
+        cached = None
+    if cached is not None and cached['size'] == stat.st_size:
+        if cached['mtime_ns'] == stat.st_mtime_ns:
+            logging.debug(f'Loaded {file_name} from {cache_path}')
+            return cached['data']
+        content_hash = hash_file(file_name)
+        if cached['hash'] == content_hash:
+            logging.debug(f'Loaded {file_name} from {cache_path} (file touched but unchanged)')
+            write_cache(cache_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': content_hash, 'data': cached['data']})
+            return cached['data']
+
+    logging.debug(f'Rebuilding {cache_path}')
+    data = parse(file_name)
+    if content_hash is None:
+        content_hash = hash_file(file_name)
+    write_cache(cache_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'hash': content_hash, 'data': data})
+    return data
+
+
+def read_cache(cache_path: str, version: int = CACHE_VERSION) -> dict | None:
+    """Reads a cache written by `write_cache`, or returns None if it is missing, unreadable or was written for another `version`"""
+    try:
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.debug(f'Ignoring unreadable cache {cache_path}: {e}')
+        return None
+    if not isinstance(cached, dict) or cached.get('version') != version:
+        return None
+    return cached
+
+
+def write_cache(cache_path: str, cached: dict, version: int = CACHE_VERSION):
+    """Pickles `cached` (with its `version`) to `cache_path`. Failing to write is only logged, as caches can always be rebuilt."""
+    cached = {**cached, 'version': version}
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            pickle.dump(cached, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # replace in one step so a crash or a second instance never leaves a half written cache behind
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        logging.debug(f'Could not write cache {cache_path}: {e}')
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
@@ -0,0 +1,75 @@
+import csv
+from typing import Any, Iterable
+
+
+def read_csv(file_name: str, encoding: str | None = 'utf-8') -> tuple[list[str], list[dict[str, str | None]]]:
+    """Reads a CSV into its column names and one dict per row, with empty cells as None (where pandas would give NaN)"""
+    with open(file_name, 'r', encoding=encoding, newline='') as f:
+        reader = csv.reader(f)
+        columns = next(reader, [])
+        if columns:
+            columns[0] = columns[0].lstrip('\ufeff')
+        rows = [{column: (value if value != '' else None) for column, value in zip(columns, values)} for values in reader if values]
+    return columns, rows
+
+
+class DataTable:
+    """Rows of a data CSV as one tuple each, with case-insensitive lookups by column built on first use"""
+    def __init__(self, columns: Iterable[str], rows: Iterable[dict[str, Any]]) -> None:
+        self.__columns: tuple[str, ...] = tuple(columns)
+        self.__positions: dict[str, int] = {column: i for i, column in enumerate(self.__columns)}
+        self.__rows: list[tuple] = [tuple(row.get(column) for column in self.__columns) for row in rows]
+        self.__lookups: dict[str, dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # lookups are rebuilt when needed rather than stored in the data cache
+        state['_DataTable__lookups'] = {}
+        return state
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self.__columns
+
+    def get(self, row: int, column: str, default: Any = None) -> Any:
+        position = self.__positions.get(column)
+        return default if position is None else self.__rows[row][position]
+
+    def column(self, column: str) -> list:
+        """All values of `column`, or all None if the CSV does not have it"""
+        position = self.__positions.get(column)
+        if position is None:
+            return [None] * len(self.__rows)
+        return [row[position] for row in self.__rows]
+
+    def find(self, column: str, value: str) -> int | None:
+        """Finds the first row whose `column` matches `value`, ignoring case"""
+        if column not in self.__positions:
+            return None
+        lookup = self.__lookups.get(column)
+        if lookup is None:
+            lookup = {}
+            for row, key in enumerate(self.column(column)):
+                if key is not None:
+                    lookup.setdefault(str(key).lower(), row)
+            self.__lookups[column] = lookup
+        return lookup.get(value.lower())
+
+    def find_value(self, column: str, value: str, result_column: str, default: Any = None) -> Any:
+        """Returns `result_column` of the first row whose `column` matches `value` (ignoring case), or `default` if there is none"""
+        row = self.find(column, value)
+        return default if row is None else self.get(row, result_column, default)
+
+    def to_dict(self, row: int) -> dict[str, Any]:
+        return {column: self.get(row, column) for column in self.columns}
+
+    def to_dataframe(self):
+        """Converts the table to a pandas DataFrame, for tools that edit the data CSVs. pandas is not needed otherwise."""
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError('pandas is required to convert data tables to DataFrames. Install it with `pip install pandas`.')
+        return pd.DataFrame([self.to_dict(row) for row in range(len(self))], columns=list(self.columns))
@@ -0,0 +1,105 @@
+import logging
+import time
+from collections import deque
+from src.game_io.transport import GameTransport
+
+
+class GameEvent:
+    """A single line of _mantella_in_game_events, e.g. 'The player picked up an iron sword'"""
+    def __init__(self, text: str, offset: int, received_at: float) -> None:
+        self.__text: str = text
+        self.__offset: int = offset
+        self.__received_at: float = received_at
+
+    @property
+    def text(self) -> str:
+        return self.__text
+
+    @property
+    def offset(self) -> int:
+        """Byte offset of the event in the events file"""
+        return self.__offset
+
+    @property
+    def received_at(self) -> float:
+        """time.monotonic() when the event was read"""
+        return self.__received_at
+
+    def __repr__(self) -> str:
+        return f'GameEvent({self.__text!r}, offset={self.__offset})'
+
+
+class InGameEventReader:
+    """Tails the in-game events the game appends to, reading only the bytes added since the last poll.
+    The newest `capacity` events are kept in memory. The game does not end its last event with a line break, so a last line without one
+    is returned as an event straight away. If the game later adds to that same line, the longer line replaces it.
+    """
+    def __init__(self, transport: GameTransport, key: str = '_mantella_in_game_events', capacity: int = 50) -> None:
+        self.__transport: GameTransport = transport
+        self.__key: str = key
+        self.__offset: int = 0
+        self.__remainder: bytes = b''
+        # the event returned for __remainder, the last line which did not end with a line break yet
+        self.__partial: GameEvent | None = None
+        self.__events: deque[GameEvent] = deque(maxlen=capacity)
+
+    @property
+    def offset(self) -> int:
+        """Number of bytes of the events file consumed so far"""
+        return self.__offset
+
+    def poll(self) -> list[GameEvent]:
+        """Reads the events appended since the last poll and adds them to the buffer
+
+        Returns:
+            list[GameEvent]: the new events, oldest first
+        """
+        start, data = self.__transport.read_from(self.__key, self.__offset)
+        if start != self.__offset:
+            logging.debug(f'{self.__key} was cleared by the game, reading it from the start')
+            self.__remainder = b''
+            self.__partial = None
+        self.__offset = start + len(data)
+        if not data:
+            return []
+
+        line_start = start - len(self.__remainder)
+        *complete, remainder = (self.__remainder + data).split(b'\n')
+        received_at = time.monotonic()
+        new_events = []
+        partial = None
+        for i, line in enumerate(complete + [remainder]):
+            if i == 0 and self.__partial is not None:
+                if line == self.__remainder:
+                    # the game only ended the line that was already returned
+                    line_start += len(line) + 1
+                    continue
+                # the game added to the line that was already returned
+                if self.__partial in self.__events:
+                    self.__events.remove(self.__partial)
+            text = line.decode('utf-8', errors='replace').strip()
+            if text:
+                event = GameEvent(text, line_start, received_at)
+                new_events.append(event)
+                if i == len(complete):
+                    partial = event
+            line_start += len(line) + 1
+        self.__remainder = remainder
+        self.__partial = partial
+        self.__events.extend(new_events)
+        return new_events
+
+    def drain(self, latest: int | None = None) -> list[GameEvent]:
+        """Empties the buffer, returning its newest `latest` events (all of them if None), oldest first"""
+        events = list(self.__events)
+        self.__events.clear()
+        if latest is not None:
+            events = events[-latest:] if latest > 0 else []
+        return events
+
+    def reset(self):
+        """Forgets everything read so far. Call after the events file has been emptied"""
+        self.__offset = 0
+        self.__remainder = b''
+        self.__partial = None
+        self.__events.clear()
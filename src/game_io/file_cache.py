@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+
+
+class ControlFileCache:
+    """Read-through cache of the first line of the _mantella_ control files, validated by (mtime_ns, size).
+    An unchanged file costs a single stat instead of an open / decode / close.
+
+    Like git's racily clean index entries, a file modified within `racy_window` seconds before it was read is
+    not trusted: another write could land in the same mtime tick without changing the size, so it is read again next time.
+    """
+    def __init__(self, racy_window: float = 0.05) -> None:
+        self.__racy_window_ns: int = int(racy_window * 1_000_000_000)
+        self.__entries: dict[tuple[str, str | None], tuple[tuple[int, int], str, bool]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        """Number of reads answered from memory after a stat"""
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """Number of reads that had to open the file"""
+        return self.__misses
+
+    def read(self, file_path: str, encoding: str | None = 'utf-8') -> str:
+        """Returns the stripped first line of `file_path`, or an empty string if the file does not exist"""
+        key = (file_path, encoding)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            with self.__lock:
+                self.__entries.pop(key, None)
+                self.__misses += 1
+            return ''
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry and entry[0] == signature and entry[2]:
+                self.__hits += 1
+                return entry[1]
+            self.__misses += 1
+
+        read_at_ns = time.time_ns()
+        try:
+            with open(file_path, 'r', encoding=encoding) as f:
+                text = f.readline().strip()
+        except FileNotFoundError:
+            return ''
+        is_trusted = signature[0] + self.__racy_window_ns < read_at_ns
+        with self.__lock:
+            self.__entries[key] = (signature, text, is_trusted)
+        return text
+
+    def invalidate(self, file_path: str | None = None):
+        """Drops the cached content of `file_path` (or of every file)"""
+        with self.__lock:
+            if file_path is None:
+                self.__entries.clear()
+            else:
+                for key in [key for key in self.__entries if key[0] == file_path]:
+                    del self.__entries[key]
+
+    def reset_stats(self):
+        with self.__lock:
+            self.__hits = 0
+            self.__misses = 0
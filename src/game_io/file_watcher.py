@@ -0,0 +1,278 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable
+
+
+def read_first_line(file_path: str) -> str:
+    """Reads a _mantella_ file the way the game protocol expects it: first line, stripped. A missing file counts as empty"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.readline().strip()
+    except FileNotFoundError:
+        return ''
+
+
+class FileWatcher:
+    """Base class for watching the _mantella_ files of a single folder.
+    Subclasses only have to call `_notify(file_name)` whenever a file in the folder might have changed.
+    Waiting on a condition (blocking or awaitable) is shared between all implementations.
+    """
+    def __init__(self, directory: str, reader: Callable[[str], str] = read_first_line) -> None:
+        self._directory: str = directory
+        self._reader: Callable[[str], str] = reader
+        self._condition: threading.Condition = threading.Condition()
+        self._generation: int = 0
+        self._watched_files: dict[str, int] = {}
+        self._subscribers: dict[int, tuple[str | None, Callable[[str], None]]] = {}
+        self._next_subscriber_id: int = 0
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    def subscribe(self, file_name: str | None, callback: Callable[[str], None]) -> int:
+        """Calls `callback(file_name)` from the watcher thread whenever `file_name` changes
+
+        Args:
+            file_name (str | None): the file (e.g. '_mantella_say_line.txt') to watch. None watches every file of the folder
+            callback (Callable[[str], None]): called with the name of the changed file. Must not block
+
+        Returns:
+            int: a handle to pass to `unsubscribe`
+        """
+        with self._condition:
+            handle = self._next_subscriber_id
+            self._next_subscriber_id += 1
+            self._subscribers[handle] = (file_name, callback)
+            if file_name:
+                self.__add_watched_file(file_name)
+        return handle
+
+    def unsubscribe(self, handle: int):
+        with self._condition:
+            file_name, _ = self._subscribers.pop(handle, (None, None))
+            if file_name:
+                self.__remove_watched_file(file_name)
+
+    def wait_for(self, file_name: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Blocks until the content of `file_name` satisfies `predicate`
+
+        Args:
+            file_name (str): the file in the watched folder, e.g. '_mantella_actor_count.txt'
+            predicate (Callable[[str], bool]): condition on the (stripped first line of the) file
+            timeout (float | None, optional): seconds to wait at most. Defaults to None (wait forever).
+
+        Raises:
+            TimeoutError: if the condition was not met within `timeout` seconds
+
+        Returns:
+            str: the content that satisfied `predicate`
+        """
+        _, text = self.wait_for_any({file_name: predicate}, timeout)
+        return text
+
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        """Blocks until the content of any of the files satisfies its predicate. Files are checked in the order given
+
+        Returns:
+            tuple[str, str]: the name of the file and the content that satisfied its predicate
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            for file_name in predicates:
+                self.__add_watched_file(file_name)
+        try:
+            while True:
+                with self._condition:
+                    generation = self._generation
+                for file_name, predicate in predicates.items():
+                    text = self._read(file_name)
+                    if predicate(text):
+                        return file_name, text
+                with self._condition:
+                    while self._generation == generation:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise TimeoutError(f'Timed out waiting for {", ".join(predicates)}')
+                        self._condition.wait(remaining)
+        finally:
+            with self._condition:
+                for file_name in predicates:
+                    self.__remove_watched_file(file_name)
+
+    async def wait_for_async(self, file_name: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Awaitable version of `wait_for`. Does not block the running event loop while waiting"""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        handle = self.subscribe(file_name, lambda _: loop.call_soon_threadsafe(changed.set))
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    changed.clear()
+                    text = self._read(file_name)
+                    if predicate(text):
+                        return text
+                    await changed.wait()
+        finally:
+            self.unsubscribe(handle)
+
+    def stop(self):
+        """Stops watching the folder"""
+        pass
+
+    def _read(self, file_name: str) -> str:
+        return self._reader(os.path.join(self._directory, file_name))
+
+    def _notify(self, file_name: str | None):
+        """Wakes up everyone waiting on `file_name`. None means that any file might have changed"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+            subscribers = list(self._subscribers.values())
+        for subscribed_file, callback in subscribers:
+            if file_name is None or subscribed_file is None or subscribed_file == file_name:
+                try:
+                    callback(file_name or subscribed_file or '')
+                except Exception as e:
+                    logging.debug(f'File watcher callback failed: {e}')
+
+    def _get_watched_files(self) -> list[str]:
+        with self._condition:
+            return list(self._watched_files)
+
+    def __add_watched_file(self, file_name: str):
+        self._watched_files[file_name] = self._watched_files.get(file_name, 0) + 1
+
+    def __remove_watched_file(self, file_name: str):
+        count = self._watched_files.get(file_name, 0) - 1
+        if count > 0:
+            self._watched_files[file_name] = count
+        else:
+            self._watched_files.pop(file_name, None)
+
+
+class PollingWatcher(FileWatcher):
+    """Fallback watcher that stats the watched files from a background thread.
+    The interval starts at `min_interval` after a change and doubles up to `max_interval` while nothing happens,
+    so a quiet game folder costs a handful of stat calls per second instead of an open / read every 10 ms.
+    """
+    def __init__(self, directory: str, reader: Callable[[str], str] = read_first_line, min_interval: float = 0.002, max_interval: float = 0.05) -> None:
+        super().__init__(directory, reader)
+        self.__min_interval: float = min_interval
+        self.__max_interval: float = max_interval
+        self.__stopped: threading.Event = threading.Event()
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, name='PollingWatcher', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        self.__stopped.set()
+
+    def __run(self):
+        interval = self.__min_interval
+        last_seen: dict[str, tuple[int, int] | None] = {}
+        while not self.__stopped.is_set():
+            watched_files = self._get_watched_files()
+            changed_files = []
+            for file_name in watched_files:
+                try:
+                    stat = os.stat(os.path.join(self._directory, file_name))
+                    signature = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    signature = None
+                # a newly watched file is reported once, in case it changed before its first stat
+                if file_name not in last_seen or last_seen[file_name] != signature:
+                    changed_files.append(file_name)
+                last_seen[file_name] = signature
+            for file_name in list(last_seen):
+                if file_name not in watched_files:
+                    del last_seen[file_name]
+
+            for file_name in changed_files:
+                self._notify(file_name)
+
+            if changed_files:
+                interval = self.__min_interval
+            else:
+                interval = min(interval * 2, self.__max_interval)
+            self.__stopped.wait(interval)
+
+
+class InotifyWatcher(FileWatcher):
+    """Linux watcher that blocks on inotify events for the folder, so waiters wake on the write itself"""
+    __IN_MODIFY = 0x00000002
+    __IN_CLOSE_WRITE = 0x00000008
+    __IN_MOVED_TO = 0x00000080
+    __IN_CREATE = 0x00000100
+    __IN_DELETE = 0x00000200
+    __IN_Q_OVERFLOW = 0x00004000
+    __IN_NONBLOCK = 0o4000
+    __IN_CLOEXEC = 0o2000000
+    __EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, directory: str, reader: Callable[[str], str] = read_first_line) -> None:
+        super().__init__(directory, reader)
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.__fd: int = libc.inotify_init1(self.__IN_NONBLOCK | self.__IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = self.__IN_MODIFY | self.__IN_CLOSE_WRITE | self.__IN_MOVED_TO | self.__IN_CREATE | self.__IN_DELETE
+        if libc.inotify_add_watch(self.__fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.__fd)
+            raise OSError(error, f'inotify_add_watch failed for {directory}')
+        self.__wakeup_read, self.__wakeup_write = os.pipe()
+        self.__thread: threading.Thread = threading.Thread(target=self.__run, name='InotifyWatcher', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        try:
+            os.write(self.__wakeup_write, b'x')
+        except OSError:
+            pass
+
+    def __run(self):
+        try:
+            while True:
+                readable, _, _ = select.select([self.__fd, self.__wakeup_read], [], [])
+                if self.__wakeup_read in readable:
+                    break
+                try:
+                    buffer = os.read(self.__fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                changed_files: list[str | None] = []
+                offset = 0
+                while offset < len(buffer):
+                    _, mask, _, name_length = self.__EVENT_HEADER.unpack_from(buffer, offset)
+                    offset += self.__EVENT_HEADER.size
+                    name = buffer[offset:offset + name_length].rstrip(b'\0').decode('utf-8', errors='replace')
+                    offset += name_length
+                    file_name = None if mask & self.__IN_Q_OVERFLOW else name
+                    if file_name not in changed_files:
+                        changed_files.append(file_name)
+                for file_name in changed_files:
+                    self._notify(file_name)
+        finally:
+            for fd in (self.__fd, self.__wakeup_read, self.__wakeup_write):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+
+def create_watcher(directory: str, reader: Callable[[str], str] = read_first_line) -> FileWatcher:
+    """Creates the best available watcher for this platform: inotify on Linux, adaptive polling everywhere else"""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory, reader)
+        except (OSError, AttributeError) as e:
+            logging.debug(f'inotify is not available ({e}). Falling back to polling {directory}')
+    return PollingWatcher(directory, reader)
@@ -0,0 +1,93 @@
+import logging
+
+
+class SayLineQueue:
+    """Hands voicelines to the game through `depth` numbered slots, so the next lines can be staged while one is still playing.
+
+    Every line gets a sequence number (1, 2, 3, ...) and goes into slot `(sequence - 1) % depth`:
+        _mantella_say_line_slot_{slot + 1}: '{sequence}|{actor number}|{subtitle}'
+    and its voiceline is copied to the voice folder as ..._{slot + 1}.wav / .lip.
+    The game plays the slots in sequence order and writes the sequence number of the last line it finished to
+        _mantella_say_line_ack
+    A slot is only reused once the line that was in it has been acknowledged.
+
+    If the game does not acknowledge a line within `ack_timeout` seconds (eg a build of the mod without the say line queue, or the game
+    was closed), the queue is disabled until Mantella restarts and voicelines go through the single _mantella_say_line flag again.
+    """
+    ACK_FILE = '_mantella_say_line_ack'
+    ACK_TIMEOUT = 30
+
+    def __init__(self, game_state_manager, depth: int, ack_timeout: float = ACK_TIMEOUT) -> None:
+        self.__game_state_manager = game_state_manager
+        self.__depth: int = depth
+        self.__ack_timeout: float = ack_timeout
+        self.__last_sequence: int = 0
+        self.__is_enabled: bool = True
+
+    @property
+    def depth(self) -> int:
+        return self.__depth
+
+    @property
+    def last_sequence(self) -> int:
+        return self.__last_sequence
+
+    @property
+    def is_enabled(self) -> bool:
+        """False once the game failed to acknowledge a line in time"""
+        return self.__is_enabled
+
+    @staticmethod
+    def slot_file(slot: int) -> str:
+        return f'_mantella_say_line_slot_{slot + 1}'
+
+    def reset(self):
+        """Empties every slot and starts counting from 1 again. Only call once everything sent has been acknowledged"""
+        self.__last_sequence = 0
+        values = {self.slot_file(slot): '' for slot in range(self.__depth)}
+        values[self.ACK_FILE] = '0'
+        self.__game_state_manager.transport.write_many(values)
+
+    async def acquire_slot(self) -> tuple[int, int] | None:
+        """Waits until the slot for the next line is free
+
+        Returns:
+            tuple[int, int] | None: the sequence number of the next line and its slot, or None if the queue is disabled
+        """
+        sequence = self.__last_sequence + 1
+        if not await self.wait_until_played(sequence - self.__depth):
+            return None
+        return sequence, (sequence - 1) % self.__depth
+
+    def publish(self, sequence: int, slot: int, actor_number: int, subtitle: str):
+        """Hands the line to the game. Its voiceline must already be in the voice folder"""
+        self.__game_state_manager.write_game_info(self.slot_file(slot), f'{sequence}|{actor_number}|{subtitle}')
+        self.__last_sequence = sequence
+        logging.debug(f'Queued voiceline {sequence} in slot {slot + 1}')
+
+    async def wait_until_played(self, sequence: int | None = None) -> bool:
+        """Waits until the game has acknowledged line `sequence` (by default the last line published)
+
+        Returns:
+            bool: False if the queue is disabled, or was disabled because the game did not acknowledge the line within `ack_timeout` seconds
+        """
+        if not self.__is_enabled:
+            return False
+        if sequence is None:
+            sequence = self.__last_sequence
+        if sequence <= 0:
+            return True
+        try:
+            await self.__game_state_manager.wait_for_async(self.ACK_FILE, lambda ack: self.__parse_ack(ack) >= sequence, timeout=self.__ack_timeout)
+        except TimeoutError:
+            logging.warning(f'The game did not acknowledge voiceline {sequence} within {self.__ack_timeout} seconds. Handing voicelines over through _mantella_say_line instead')
+            self.__is_enabled = False
+            return False
+        return True
+
+    @staticmethod
+    def __parse_ack(ack: str) -> int:
+        try:
+            return int(ack)
+        except ValueError:
+            return 0
@@ -0,0 +1,49 @@
+import asyncio
+from src.game_io.transport import GameTransport
+
+
+class PlaybackTracker:
+    """Tracks the say line flags of the actors in a conversation. Fallout 4 sets an actor's flag back to 'false'
+    once their line has finished playing, so playback is complete when every active flag reads 'false'.
+    Only the given flags are subscribed to, and they are only read again when one of them changes.
+    """
+    def __init__(self, transport: GameTransport, say_line_files: list[str]) -> None:
+        self.__transport: GameTransport = transport
+        self.__say_line_files: list[str] = say_line_files
+
+    @staticmethod
+    def for_actor_count(transport: GameTransport, actor_count: int) -> 'PlaybackTracker':
+        """Tracks _mantella_say_line for the first actor and _mantella_say_line_N for actors 2 to `actor_count`"""
+        say_line_files = ['_mantella_say_line'] + [f'_mantella_say_line_{i}' for i in range(2, actor_count + 1)]
+        return PlaybackTracker(transport, say_line_files)
+
+    def is_complete(self) -> bool:
+        return all(self.__transport.read(say_line_file).lower() == 'false' for say_line_file in self.__say_line_files)
+
+    async def wait(self, timeout: float | None = None):
+        """Resolves once every tracked say line flag reads 'false'
+
+        Raises:
+            TimeoutError: if playback has not completed within `timeout` seconds
+        """
+        loop = asyncio.get_running_loop()
+        completed: asyncio.Future = loop.create_future()
+
+        def set_completed():
+            if not completed.done():
+                completed.set_result(None)
+
+        def on_change(_):
+            if self.is_complete():
+                loop.call_soon_threadsafe(set_completed)
+
+        handles = [self.__transport.subscribe(say_line_file, on_change) for say_line_file in self.__say_line_files]
+        try:
+            # subscribe first and check afterwards, so a change in between is not missed
+            if self.is_complete():
+                return
+            async with asyncio.timeout(timeout):
+                await completed
+        finally:
+            for handle in handles:
+                self.__transport.unsubscribe(handle)
@@ -0,0 +1,95 @@
+import json
+import threading
+import time
+from typing import Callable
+from src.game_io.transport import GameTransport
+
+
+class RecordingTransport(GameTransport):
+    """Wraps another transport and appends its traffic to a JSON lines file, one entry per change:
+        {"t": seconds since the recording started, "source": "mantella" | "game", "key": ..., "value": ...}
+
+    Values Mantella writes are recorded as they are written. Values set by the game are recorded the first time
+    Mantella reads them, so the recording holds exactly what the game told Mantella and when Mantella noticed.
+    """
+    def __init__(self, transport: GameTransport, record_file: str) -> None:
+        self.__transport: GameTransport = transport
+        self.__record_file = open(record_file, 'a', encoding='utf-8')
+        self.__lock: threading.Lock = threading.Lock()
+        self.__start: float = time.monotonic()
+        self.__known_values: dict[str, str] = {}
+
+    @property
+    def transport(self) -> GameTransport:
+        return self.__transport
+
+    def read(self, key: str, encoding: str | None = 'utf-8') -> str:
+        return self.__observe(key, self.__transport.read(key, encoding))
+
+    async def read_async(self, key: str, encoding: str | None = 'utf-8') -> str:
+        return self.__observe(key, await self.__transport.read_async(key, encoding))
+
+    def read_all(self, key: str) -> str:
+        text = self.__transport.read_all(key)
+        # multi-line values are only recorded by their first line, like every other read
+        self.__observe(key, text.split('\n', 1)[0].strip())
+        return text
+
+    def read_from(self, key: str, offset: int) -> tuple[int, bytes]:
+        start, data = self.__transport.read_from(key, offset)
+        if data:
+            self.__record('game', key, data.decode('utf-8', errors='replace'), append=True)
+        return start, data
+
+    def write_many(self, values: dict[str, str]):
+        self.__transport.write_many(values)
+        for key, text in values.items():
+            with self.__lock:
+                is_changed = self.__known_values.get(key) != text
+                self.__known_values[key] = text
+            if is_changed:
+                self.__record('mantella', key, text)
+
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        key, text = self.__transport.wait_for_any(predicates, timeout)
+        return key, self.__observe(key, text)
+
+    async def wait_for_async(self, key: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        return self.__observe(key, await self.__transport.wait_for_async(key, predicate, timeout))
+
+    def subscribe(self, key: str, callback: Callable[[str], None]) -> int:
+        return self.__transport.subscribe(key, callback)
+
+    def unsubscribe(self, handle: int):
+        self.__transport.unsubscribe(handle)
+
+    def get_read_stats(self) -> tuple[int, int]:
+        return self.__transport.get_read_stats()
+
+    def close(self):
+        self.__transport.close()
+        with self.__lock:
+            self.__record_file.close()
+
+    def __observe(self, key: str, text: str) -> str:
+        with self.__lock:
+            is_changed = self.__known_values.get(key) != text
+            self.__known_values[key] = text
+        if is_changed:
+            self.__record('game', key, text)
+        return text
+
+    def __record(self, source: str, key: str, value: str, append: bool = False):
+        entry = {'t': round(time.monotonic() - self.__start, 6), 'source': source, 'key': key, 'value': value}
+        if append:
+            entry['append'] = True
+        with self.__lock:
+            if not self.__record_file.closed:
+                self.__record_file.write(json.dumps(entry) + '\n')
+                self.__record_file.flush()
+
+
+def load_recording(record_file: str) -> list[dict]:
+    """Reads the entries of a file written by RecordingTransport"""
+    with open(record_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
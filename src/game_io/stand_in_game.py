@@ -0,0 +1,137 @@
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from typing import Callable
+from src.game_io.transport import GameTransport, FileTransport, SocketTransport
+from src.game_io.line_queue import SayLineQueue
+
+
+class StandInGame:
+    """Plays the game's side of the protocol over any GameTransport, so Mantella can be exercised without Skyrim / Fallout 4.
+    For the file transport, give it a FileTransport on the same folder as Mantella's. For the socket transport, a SocketTransport with `listen=False`.
+
+    Voicelines are acknowledged (their _mantella_say_line flag set back to False) once they have "played" for `line_duration` seconds,
+    which can also be a function of the subtitle. With `say_line_queue_depth` > 0, lines from the say line queue slots are also played in sequence order.
+    `on_line(key, subtitle)` is called from the background thread as soon as a line is picked up.
+    """
+    def __init__(self, transport: GameTransport, say_line_slots: int = 10, line_duration: float | Callable[[str], float] = 0, say_line_queue_depth: int = 0, on_line: Callable[[str, str], None] | None = None) -> None:
+        self.__transport: GameTransport = transport
+        self.__say_line_keys: list[str] = ['_mantella_say_line'] + [f'_mantella_say_line_{slot}' for slot in range(2, say_line_slots + 1)]
+        self.__line_duration: float | Callable[[str], float] = line_duration
+        self.__on_line: Callable[[str, str], None] | None = on_line
+        self.__say_line_queue_depth: int = say_line_queue_depth
+        self.__stopped: threading.Event = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.lines_played: int = 0
+
+    @property
+    def transport(self) -> GameTransport:
+        return self.__transport
+
+    def set(self, key: str, value: str):
+        self.__transport.write(key, value)
+
+    def start_conversation(self, character_name: str, character_id: str, location: str = 'Skyrim', in_game_time: str = '12', actor_count: int = 1):
+        """Selects a character the way the spell / MCM does when a conversation is started"""
+        self.__transport.write_many({
+            # lowered first, until Mantella has read the actor
+            '_mantella_character_selection': 'False',
+            '_mantella_current_actor': character_name,
+            '_mantella_current_actor_id': character_id,
+            '_mantella_current_location': location,
+            '_mantella_in_game_time': in_game_time,
+            '_mantella_actor_count': str(actor_count),
+        })
+
+    def say(self, text: str):
+        """Sends the player's typed input"""
+        self.__transport.write('_mantella_text_input', text)
+
+    def end_conversation(self):
+        self.__transport.write('_mantella_end_conversation', 'True')
+
+    def start(self) -> 'StandInGame':
+        """Starts acknowledging voicelines from a background thread"""
+        self.__thread = threading.Thread(target=self.__run, name='StandInGame', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__thread:
+            self.__thread.join()
+
+    def __run(self):
+        # Mantella writes the subtitle (or 'True') to raise a say line, the game lowers it with 'False'
+        is_raised = lambda text: text.lower() not in ('false', '')
+        while not self.__stopped.is_set():
+            predicates = {key: is_raised for key in self.__say_line_keys}
+            if self.__say_line_queue_depth > 0:
+                # Mantella resets the ack to 0 when it starts a new response, so the next line always follows the ack
+                try:
+                    next_sequence = int(self.__transport.read(SayLineQueue.ACK_FILE) or 0) + 1
+                except ValueError:
+                    next_sequence = 1
+                slot_file = SayLineQueue.slot_file((next_sequence - 1) % self.__say_line_queue_depth)
+                predicates[slot_file] = lambda text, sequence=str(next_sequence): text.split('|', 1)[0] == sequence
+            try:
+                key, text = self.__transport.wait_for_any(predicates, timeout=0.1)
+            except TimeoutError:
+                continue
+            subtitle = text if key in self.__say_line_keys else text.split('|', 2)[-1]
+            if self.__on_line:
+                self.__on_line(key, subtitle)
+            line_duration = self.__line_duration(subtitle) if callable(self.__line_duration) else self.__line_duration
+            if line_duration > 0:
+                time.sleep(line_duration)
+            self.lines_played += 1
+            if key in self.__say_line_keys:
+                self.__transport.write(key, 'False')
+            else:
+                self.__transport.write(SayLineQueue.ACK_FILE, str(next_sequence))
+
+
+def measure_round_trips(mantella: GameTransport, game: GameTransport, count: int = 200) -> list[float]:
+    """Times `count` voiceline handshakes: Mantella raises _mantella_say_line and waits until the stand-in game lowers it again
+
+    Returns:
+        list[float]: the duration of every round trip in seconds
+    """
+    stand_in_game = StandInGame(game).start()
+    durations = []
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            mantella.write('_mantella_say_line', 'True')
+            mantella.wait_for('_mantella_say_line', lambda text: text.lower() == 'false', timeout=5)
+            durations.append(time.perf_counter() - start)
+    finally:
+        stand_in_game.stop()
+    return durations
+
+
+def _report(name: str, durations: list[float]):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f'{name:>8}: median {statistics.median(durations) * 1000:.3f} ms, p95 {p95 * 1000:.3f} ms, max {durations[-1] * 1000:.3f} ms ({len(durations)} round trips)')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the voiceline handshake between Mantella and a stand-in game for each transport')
+    parser.add_argument('--count', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as game_folder:
+        mantella_files, game_files = FileTransport(game_folder), FileTransport(game_folder)
+        mantella_files.write('_mantella_say_line', 'False')
+        _report('file', measure_round_trips(mantella_files, game_files, args.count))
+        mantella_files.close()
+        game_files.close()
+
+    mantella_socket = SocketTransport(port=0)
+    game_socket = SocketTransport(port=mantella_socket.port, listen=False)
+    _report('socket', measure_round_trips(mantella_socket, game_socket, args.count))
+    game_socket.close()
+    mantella_socket.close()
@@ -0,0 +1,119 @@
+import logging
+import os
+import time
+
+
+class GameStateWriter:
+    """Writes the _mantella_ files of a single folder.
+    Remembers the value and (mtime_ns, size) of every file it wrote, so writing a value that a file still holds is skipped.
+    If the game has written to the file in the meantime its stat no longer matches and the file is written again.
+
+    A stat taken within `racy_window` seconds of the file's mtime is not trusted on its own (the game may have written
+    in the same mtime tick), so until the file is older than that its content is compared instead.
+    """
+    def __init__(self, directory: str, retry_delays: tuple[float, ...] = (0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0), racy_window: float = 0.05) -> None:
+        self.__directory: str = directory
+        self.__retry_delays: tuple[float, ...] = retry_delays
+        self.__racy_window_ns: int = int(racy_window * 1_000_000_000)
+        self.__last_written: dict[str, tuple[str, tuple[int, int], bool]] = {}
+
+    def write(self, file_name: str, text: str) -> bool:
+        """Writes `text` to `file_name` unless the file still holds it
+
+        Returns:
+            bool: True if the file had to be written, False if it was unchanged
+        """
+        return self.write_many({file_name: text}) > 0
+
+    def write_many(self, values: dict[str, str]) -> int:
+        """Writes all changed files in one pass. Files the game has locked are retried with a short, growing delay
+
+        Raises:
+            PermissionError: if a file still could not be written after all retries
+
+        Returns:
+            int: the number of files that were actually written
+        """
+        pending = {file_name: text for file_name, text in values.items() if self.__is_dirty(file_name, text)}
+        written = 0
+        for delay in (0,) + self.__retry_delays:
+            if delay > 0:
+                time.sleep(delay)
+            failed: dict[str, str] = {}
+            for file_name, text in pending.items():
+                try:
+                    self.__write_file(file_name, text)
+                    written += 1
+                except PermissionError:
+                    failed[file_name] = text
+            if not failed:
+                return written
+            logging.debug(f'Permission denied to write to {", ".join(failed)}. Retrying...')
+            pending = failed
+        raise PermissionError(f'Permission denied to write to {", ".join(pending)}')
+
+    def batch(self) -> 'GameStateBatch':
+        """Collects writes and flushes the changed ones together when the `with` block exits without an error"""
+        return GameStateBatch(self)
+
+    def forget(self, file_name: str | None = None):
+        """Forgets what was written to `file_name` (or to every file), so the next write always reaches the disk"""
+        if file_name:
+            self.__last_written.pop(file_name, None)
+        else:
+            self.__last_written.clear()
+
+    def __is_dirty(self, file_name: str, text: str) -> bool:
+        last_written = self.__last_written.get(file_name)
+        if not last_written or last_written[0] != text:
+            return True
+        file_path = os.path.join(self.__directory, file_name)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return True
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if last_written[1] != signature:
+            return True
+        if last_written[2]:
+            return False
+
+        # racily clean: the stat matches but could hide a write in the same mtime tick, so compare the content
+        checked_at_ns = time.time_ns()
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                if f.read() != text:
+                    return True
+        except OSError:
+            return True
+        self.__last_written[file_name] = (text, signature, signature[0] + self.__racy_window_ns < checked_at_ns)
+        return False
+
+    def __write_file(self, file_name: str, text: str):
+        with open(os.path.join(self.__directory, file_name), 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            # stat before closing: if the game writes right after us, its write can only make the signature differ
+            stat = os.fstat(f.fileno())
+        self.__last_written[file_name] = (text, (stat.st_mtime_ns, stat.st_size), False)
+
+
+class GameStateBatch:
+    """A set of pending writes for a GameStateWriter. Later values for the same file replace earlier ones"""
+    def __init__(self, writer: GameStateWriter) -> None:
+        self.__writer: GameStateWriter = writer
+        self.__values: dict[str, str] = {}
+
+    def set(self, file_name: str, text: str):
+        self.__values[file_name] = text
+
+    def flush(self) -> int:
+        values, self.__values = self.__values, {}
+        return self.__writer.write_many(values)
+
+    def __enter__(self) -> 'GameStateBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+from src.game_io.file_cache import ControlFileCache
+from src.game_io.file_watcher import FileWatcher, create_watcher
+from src.game_io.state_writer import GameStateWriter
+
+
+class GameTransport(ABC):
+    """Carries the values exchanged between Mantella and the game (e.g. '_mantella_say_line').
+    Keys are the names of the original _mantella_ files without their .txt extension.
+    """
+    @abstractmethod
+    def read(self, key: str, encoding: str | None = 'utf-8') -> str:
+        """Returns the stripped first line of the value of `key`, or an empty string if it has not been set"""
+        pass
+
+    async def read_async(self, key: str, encoding: str | None = 'utf-8') -> str:
+        """Awaitable version of `read`. Runs the read on a worker thread unless the transport can answer from memory"""
+        return await asyncio.to_thread(self.read, key, encoding)
+
+    @abstractmethod
+    def read_all(self, key: str) -> str:
+        """Returns the complete value of `key` (e.g. every line of '_mantella_in_game_events')"""
+        pass
+
+    def read_from(self, key: str, offset: int) -> tuple[int, bytes]:
+        """Returns the UTF-8 bytes of the value of `key` from byte `offset` on, for values the game appends to.
+        If the value is now shorter than `offset` it has been cleared, and it is returned from the start
+
+        Returns:
+            tuple[int, bytes]: the offset the returned bytes start at and the bytes themselves
+        """
+        data = self.read_all(key).encode('utf-8')
+        if len(data) < offset:
+            offset = 0
+        return offset, data[offset:]
+
+    def write(self, key: str, text: str):
+        self.write_many({key: text})
+
+    @abstractmethod
+    def write_many(self, values: dict[str, str]):
+        """Sets several values in one go. Values that have not changed are skipped"""
+        pass
+
+    def wait_for(self, key: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Blocks until the value of `key` satisfies `predicate`. Raises TimeoutError after `timeout` seconds"""
+        _, text = self.wait_for_any({key: predicate}, timeout)
+        return text
+
+    @abstractmethod
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        """Blocks until any of the values satisfies its predicate. Returns the key and its value"""
+        pass
+
+    @abstractmethod
+    async def wait_for_async(self, key: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Awaitable version of `wait_for` that does not block the event loop"""
+        pass
+
+    @abstractmethod
+    def subscribe(self, key: str, callback: Callable[[str], None]) -> int:
+        """Calls `callback(key)` from a background thread whenever the value of `key` may have changed. Returns a handle for `unsubscribe`"""
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, handle: int):
+        pass
+
+    def get_read_stats(self) -> tuple[int, int]:
+        """Returns how many reads were answered from memory and how many had to go to the underlying medium"""
+        return 0, 0
+
+    def close(self):
+        pass
+
+
+class FileTransport(GameTransport):
+    """The original protocol: one _mantella_*.txt file per key in the game folder"""
+    def __init__(self, directory: str) -> None:
+        self.__directory: str = directory
+        self.__cache: ControlFileCache = ControlFileCache()
+        self.__watcher: FileWatcher = create_watcher(directory, self.__cache.read)
+        self.__writer: GameStateWriter = GameStateWriter(directory)
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def read(self, key: str, encoding: str | None = 'utf-8') -> str:
+        return self.__cache.read(f'{self.__directory}/{key}.txt', encoding)
+
+    def read_all(self, key: str) -> str:
+        try:
+            with open(f'{self.__directory}/{key}.txt', 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return ''
+
+    def read_from(self, key: str, offset: int) -> tuple[int, bytes]:
+        try:
+            with open(f'{self.__directory}/{key}.txt', 'rb') as f:
+                if os.fstat(f.fileno()).st_size < offset:
+                    offset = 0
+                f.seek(offset)
+                return offset, f.read()
+        except FileNotFoundError:
+            return 0, b''
+
+    def write_many(self, values: dict[str, str]):
+        with self.__writer.batch() as batch:
+            for key, text in values.items():
+                batch.set(f'{key}.txt', text)
+
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        # answer straight from the cache if possible, without registering with the watcher
+        for key, predicate in predicates.items():
+            text = self.read(key)
+            if predicate(text):
+                return key, text
+        file_name, text = self.__watcher.wait_for_any({f'{key}.txt': predicate for key, predicate in predicates.items()}, timeout)
+        return file_name.removesuffix('.txt'), text
+
+    async def wait_for_async(self, key: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        return await self.__watcher.wait_for_async(f'{key}.txt', predicate, timeout)
+
+    def subscribe(self, key: str, callback: Callable[[str], None]) -> int:
+        return self.__watcher.subscribe(f'{key}.txt', lambda file_name: callback(file_name.removesuffix('.txt')))
+
+    def unsubscribe(self, handle: int):
+        self.__watcher.unsubscribe(handle)
+
+    def get_read_stats(self) -> tuple[int, int]:
+        return self.__cache.hits, self.__cache.misses
+
+    def close(self):
+        self.__watcher.stop()
+
+
+class _Mailbox(FileWatcher):
+    """In-memory key / value store with the same waiting semantics as the file watcher"""
+    def __init__(self) -> None:
+        super().__init__('')
+        self.__values: dict[str, str] = {}
+
+    def get(self, key: str) -> str:
+        with self._condition:
+            return self.__values.get(key, '')
+
+    def get_first_line(self, key: str) -> str:
+        return self.get(key).split('\n', 1)[0].strip()
+
+    def items(self) -> list[tuple[str, str]]:
+        with self._condition:
+            return list(self.__values.items())
+
+    def set(self, key: str, value: str) -> bool:
+        """Stores `value` and wakes up everyone waiting on `key`. Returns False if the value was already set"""
+        with self._condition:
+            if self.__values.get(key) == value:
+                return False
+            self.__values[key] = value
+        self._notify(key)
+        return True
+
+    def _read(self, file_name: str) -> str:
+        return self.get_first_line(file_name)
+
+
+class SocketTransport(GameTransport):
+    """Exchanges values over a local TCP connection instead of the game folder, so a bridge plugin on the game side
+    can push changes the moment they happen. Each message is one line of JSON: {"op": "set", "key": ..., "value": ...}
+
+    Mantella listens (`listen=True`) and the game connects. Values set before the game connects are sent as soon as it does.
+    A stand-in game connects with `listen=False`.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 21789, listen: bool = True, connect_timeout: float = 10) -> None:
+        self.__mailbox: _Mailbox = _Mailbox()
+        self.__send_lock: threading.Lock = threading.Lock()
+        self.__connection: socket.socket | None = None
+        self.__local_keys: set[str] = set()
+        self.__closed: bool = False
+        self.__server: socket.socket | None = None
+        self.__reads: int = 0
+
+        if listen:
+            self.__server = socket.create_server((host, port))
+            logging.info(f'Waiting for the game to connect to {host}:{port}')
+            threading.Thread(target=self.__accept_connections, name='SocketTransportServer', daemon=True).start()
+        else:
+            connection = socket.create_connection((host, port), timeout=connect_timeout)
+            connection.settimeout(None)
+            self.__attach(connection)
+
+    @property
+    def port(self) -> int:
+        if self.__server:
+            return self.__server.getsockname()[1]
+        elif self.__connection:
+            return self.__connection.getpeername()[1]
+        return 0
+
+    def read(self, key: str, encoding: str | None = 'utf-8') -> str:
+        self.__reads += 1
+        return self.__mailbox.get_first_line(key)
+
+    async def read_async(self, key: str, encoding: str | None = 'utf-8') -> str:
+        # values are already in memory, so there is nothing that could block the event loop
+        return self.read(key, encoding)
+
+    def read_all(self, key: str) -> str:
+        self.__reads += 1
+        return self.__mailbox.get(key)
+
+    def write_many(self, values: dict[str, str]):
+        messages = []
+        for key, text in values.items():
+            self.__local_keys.add(key)
+            if self.__mailbox.set(key, text):
+                messages.append(json.dumps({'op': 'set', 'key': key, 'value': text}) + '\n')
+        if messages:
+            self.__send(''.join(messages))
+
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        return self.__mailbox.wait_for_any(predicates, timeout)
+
+    async def wait_for_async(self, key: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        return await self.__mailbox.wait_for_async(key, predicate, timeout)
+
+    def subscribe(self, key: str, callback: Callable[[str], None]) -> int:
+        return self.__mailbox.subscribe(key, callback)
+
+    def unsubscribe(self, handle: int):
+        self.__mailbox.unsubscribe(handle)
+
+    def get_read_stats(self) -> tuple[int, int]:
+        return self.__reads, 0
+
+    def close(self):
+        self.__closed = True
+        for sock in (self.__server, self.__connection):
+            if sock:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+
+    def __accept_connections(self):
+        while not self.__closed:
+            try:
+                connection, address = self.__server.accept()
+            except OSError:
+                break
+            logging.info(f'Game connected from {address[0]}:{address[1]}')
+            self.__attach(connection)
+            # bring the game up to date with everything Mantella has set so far
+            snapshot = [json.dumps({'op': 'set', 'key': key, 'value': value}) + '\n' for key, value in self.__mailbox.items() if key in self.__local_keys]
+            if snapshot:
+                self.__send(''.join(snapshot))
+
+    def __attach(self, connection: socket.socket):
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.__send_lock:
+            previous_connection, self.__connection = self.__connection, connection
+        if previous_connection:
+            previous_connection.close()
+        threading.Thread(target=self.__receive, args=(connection,), name='SocketTransportReceiver', daemon=True).start()
+
+    def __receive(self, connection: socket.socket):
+        try:
+            with connection.makefile('r', encoding='utf-8', newline='\n') as stream:
+                for line in stream:
+                    try:
+                        message = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f'Ignoring malformed message from the game: {line.strip()}')
+                        continue
+                    if message.get('op') == 'set':
+                        self.__mailbox.set(str(message['key']), str(message['value']))
+        except OSError:
+            pass
+        finally:
+            with self.__send_lock:
+                if self.__connection is connection:
+                    self.__connection = None
+            if not self.__closed:
+                logging.info('Game disconnected')
+
+    def __send(self, data: str):
+        with self.__send_lock:
+            if not self.__connection:
+                return
+            try:
+                self.__connection.sendall(data.encode('utf-8'))
+            except OSError as e:
+                logging.warning(f'Could not send update to the game: {e}')
+
+
+def create_transport(config) -> GameTransport:
+    """Creates the transport selected by the `ipc_transport` setting in config.ini, recording its traffic if `ipc_record_file` is set"""
+    if config.ipc_transport == 'socket':
+        transport = SocketTransport(port=config.ipc_port)
+    else:
+        transport = FileTransport(config.game_path)
+    if config.ipc_record_file:
+        # imported here as the recording module builds on this one
+        from src.game_io.recording import RecordingTransport
+        logging.info(f'Recording game traffic to {config.ipc_record_file}')
+        transport = RecordingTransport(transport, config.ipc_record_file)
+    return transport
@@ -1,8 +1,13 @@
 import logging
 from src.llm.messages import user_message
 import src.utils as utils
-import time
+from src.game_io.transport import GameTransport, FileTransport
+from src.game_io.event_reader import InGameEventReader
+from src.character_registry import CharacterRegistry
+from src.voice_resolution import VoiceResolver, MALE_VOICE_MODELS, FEMALE_VOICE_MODELS
+from typing import Callable
 import random
+import time
 
 class CharacterDoesNotExist(Exception):
     """Exception raised when NPC name cannot be found in skyrim_characters.csv/fallout4_characters.csv"""
@@ -10,118 +15,125 @@ class CharacterDoesNotExist(Exception):
 
 
 class GameStateManager:
-    def __init__(self, game_path, game):
+    # seconds to wait for the game to write the selected NPC's name after their ID
+    CHARACTER_NAME_TIMEOUT = 2
+    # seconds to wait for the game to finish the goodbye line once a conversation ends
+    END_CONVERSATION_TIMEOUT = 5
+    # _mantella_say_line and _mantella_say_line_2 to _mantella_say_line_10, one per NPC in the conversation
+    SAY_LINE_FILE_COUNT = 10
+
+    def __init__(self, game_path, game, transport: GameTransport | None = None):
         self.game_path = game_path
         self.prev_game_time = ''
         self.game= game
+        # every exchange with the game goes through the transport, by default the _mantella_ files in the game folder
+        self.transport: GameTransport = transport if transport else FileTransport(game_path)
+        # only reads what the game appended to _mantella_in_game_events since the previous exchange
+        self.event_reader = InGameEventReader(self.transport)
 
     def write_game_info(self, text_file_name, text):
-        max_attempts = 2
-        delay_between_attempts = 5
-
-        for attempt in range(max_attempts):
-            try:
-                with open(f'{self.game_path}/{text_file_name}.txt', 'w', encoding='utf-8') as f:
-                    f.write(text)
-                break
-            except PermissionError:
-                print(f'Permission denied to write to {text_file_name}.txt. Retrying...')
-                if attempt + 1 == max_attempts:
-                    raise
-                else:
-                    time.sleep(delay_between_attempts)
+        self.transport.write(text_file_name, text)
         return None
     
+    def read_game_info(self, text_file_name: str, encoding: str | None = 'utf-8') -> str:
+        """Read the first line of a _mantella_ file (empty if it does not exist)"""
+        return self.transport.read(text_file_name, encoding)
+
+    async def read_game_info_async(self, text_file_name: str, encoding: str | None = 'utf-8') -> str:
+        """Awaitable version of `read_game_info` that does not block the event loop"""
+        return await self.transport.read_async(text_file_name, encoding)
+
+    def get_read_stats(self) -> tuple[int, int]:
+        """Returns the number of reads of _mantella_ files answered from memory (hits) and from disk (misses)"""
+        return self.transport.get_read_stats()
 
     def load_data_when_available(self, text_file_name, text):
-        while text == '':
-            with open(f'{self.game_path}/{text_file_name}.txt', 'r', encoding='utf-8') as f:
-                text = f.readline().strip()
-            # decrease stress on CPU while waiting for file to populate
-            time.sleep(0.01)
+        if text == '':
+            text = self.wait_for(text_file_name, lambda text: text != '')
         return text
+
+    async def load_data_when_available_async(self, text_file_name, text):
+        """Awaitable version of `load_data_when_available` that does not block the event loop"""
+        if text == '':
+            text = await self.wait_for_async(text_file_name, lambda text: text != '')
+        return text
+
+    def wait_for(self, text_file_name: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Block until the first line of a _mantella_ file satisfies `predicate` and return it. Raises TimeoutError after `timeout` seconds"""
+        return self.transport.wait_for(text_file_name, predicate, timeout)
+
+    def wait_for_any(self, predicates: dict[str, Callable[[str], bool]], timeout: float | None = None) -> tuple[str, str]:
+        """Block until any of the _mantella_ files satisfies its predicate. Returns the file name (without .txt) and its first line"""
+        return self.transport.wait_for_any(predicates, timeout)
+
+    async def wait_for_async(self, text_file_name: str, predicate: Callable[[str], bool], timeout: float | None = None) -> str:
+        """Awaitable version of `wait_for` that does not block the event loop"""
+        return await self.transport.wait_for_async(text_file_name, predicate, timeout)
     
+    @utils.time_it
     def wait_for_conversation_init(self):
         self.load_data_when_available('_mantella_current_actor_id', '')
 
     @utils.time_it
     def reset_game_info(self):
-        self.write_game_info('_mantella_current_actor', '')
         character_name = ''
-
-        self.write_game_info('_mantella_current_actor_id', '')
         character_id = ''
-
-        self.write_game_info('_mantella_current_location', '')
         location = ''
-
-        self.write_game_info('_mantella_in_game_time', '')
         in_game_time = ''
 
-        self.write_game_info('_mantella_active_actors', '')
-
-        self.write_game_info('_mantella_in_game_events', '')
-
-        self.write_game_info('_mantella_status', 'False')
-
-        self.write_game_info('_mantella_actor_is_enemy', 'False')
-        self.write_game_info('_mantella_actor_is_in_combat', 'False')
-
-        self.write_game_info('_mantella_actor_relationship', '')
-
-        self.write_game_info('_mantella_character_selection', 'True')
-
-        self.write_game_info('_mantella_say_line', 'False')
-        self.write_game_info('_mantella_say_line_2', 'False')
-        self.write_game_info('_mantella_say_line_3', 'False')
-        self.write_game_info('_mantella_say_line_4', 'False')
-        self.write_game_info('_mantella_say_line_5', 'False')
-        self.write_game_info('_mantella_say_line_6', 'False')
-        self.write_game_info('_mantella_say_line_7', 'False')
-        self.write_game_info('_mantella_say_line_8', 'False')
-        self.write_game_info('_mantella_say_line_9', 'False')
-        self.write_game_info('_mantella_say_line_10', 'False')
-        self.write_game_info('_mantella_actor_count', '0')
-
-        self.write_game_info('_mantella_player_input', '')
-
-        self.write_game_info('_mantella_aggro', '')
+        reset_values = {
+            '_mantella_current_actor': '',
+            '_mantella_current_actor_id': '',
+            '_mantella_current_location': '',
+            '_mantella_in_game_time': '',
+            '_mantella_active_actors': '',
+            '_mantella_in_game_events': '',
+            '_mantella_status': 'False',
+            '_mantella_actor_is_enemy': 'False',
+            '_mantella_actor_is_in_combat': 'False',
+            '_mantella_actor_relationship': '',
+            '_mantella_character_selection': 'True',
+            '_mantella_say_line': 'False',
+            '_mantella_say_line_2': 'False',
+            '_mantella_say_line_3': 'False',
+            '_mantella_say_line_4': 'False',
+            '_mantella_say_line_5': 'False',
+            '_mantella_say_line_6': 'False',
+            '_mantella_say_line_7': 'False',
+            '_mantella_say_line_8': 'False',
+            '_mantella_say_line_9': 'False',
+            '_mantella_say_line_10': 'False',
+            '_mantella_actor_count': '0',
+            '_mantella_player_input': '',
+            '_mantella_aggro': '',
+            '_mantella_radiant_dialogue': 'False',
+            '_mantella_audio_ready': 'False',
+        }
 
-        self.write_game_info('_mantella_radiant_dialogue', 'False')
-        self.write_game_info('_mantella_audio_ready', 'False')
+        # only the files that changed since the last reset are written, all in one pass
+        self.transport.write_many(reset_values)
+        self.event_reader.reset()
 
         return character_name, character_id, location, in_game_time
     
     
-    def write_dummy_game_info(self, character_name, character_df):
+    def write_dummy_game_info(self, character_name, characters: CharacterRegistry):
         """Write fake data to game files when debugging"""
         logging.info(f'Writing dummy game status for debugging character {character_name}')
         actor_sex = random.choice(['Female','Male'])
         actor_race = random.choice(['ArgonianRace','BretonRace','DarkElfRace','HighElfRace','ImperialRace','KhajiitRace','NordRace','OrcRace','RedguardRace','WoodElfRace'])
-        try:
-            actor_sex = character_df.loc[character_df['name'].astype(str).str.lower()==character_name.lower(), 'gender'].values[0]
-        except:
-            pass
-        try:
-            actor_race = character_df.loc[character_df['name'].astype(str).str.lower()==character_name.lower(), 'race'].values[0]
-        except:
-            pass
+        actor_sex = characters.find_value('name', character_name, 'gender', actor_sex)
+        actor_race = characters.find_value('name', character_name, 'race', actor_race)
         self.write_game_info('_mantella_actor_race', f'<{actor_race}')
         self.write_game_info('_mantella_actor_sex', actor_sex)
         voice_model = random.choice(['Female Nord', 'Male Nord'])
-        try: # search for voice model in skyrim_characters.csv/fallout4_characters.csv"
-            voice_model = character_df.loc[character_df['name'].astype(str).str.lower()==character_name.lower(), 'voice_model'].values[0]
-        except: # guess voice model based on sex and race
+        # search for voice model in skyrim_characters.csv/fallout4_characters.csv"
+        voice_model = characters.find_value('name', character_name, 'voice_model', '')
+        if voice_model == '': # guess voice model based on sex and race
             if actor_sex == 'Female':
-                try:
-                    voice_model = _female_voice_models[actor_race]
-                except:
-                    voice_model = 'Female Nord'
+                voice_model = FEMALE_VOICE_MODELS.get(actor_race, 'Female Nord')
             else:
-                try:
-                    voice_model = _male_voice_models[actor_race]
-                except:
-                    voice_model = 'Male Nord'
+                voice_model = MALE_VOICE_MODELS.get(actor_race, 'Male Nord')
 
         self.write_game_info('_mantella_actor_voice', f'<{voice_model}')
 
@@ -131,10 +143,8 @@ class GameStateManager:
         self.write_game_info('_mantella_current_actor', character_name)
 
         character_id = '0'
-        try: # search for voice model in skyrim_characters.csv/fallout4_characters.csv"
-            voice_model = character_df.loc[character_df['name'].astype(str).str.lower()==character_name.lower(), 'base_id_int'].values[0]
-        except:
-            pass
+        # search for voice model in skyrim_characters.csv/fallout4_characters.csv"
+        voice_model = characters.find_value('name', character_name, 'base_id_int', voice_model)
         self.write_game_info('_mantella_current_actor_id', str(character_id))
 
         if self.game == "Fallout4" or self.game == "Fallout4VR":
@@ -149,6 +159,7 @@ class GameStateManager:
         return character_name, character_id, location, in_game_time
     
 
+    @utils.time_it
     def load_character_name_id(self):
         """Wait for character ID to populate then load character name"""
 
@@ -158,14 +169,17 @@ class GameStateManager:
         except:
             logging.warning('Could not find ID for the selected NPC')
         
-        time.sleep(0.5) # wait for file to register
-        with open(f'{self.game_path}/_mantella_current_actor.txt', 'r') as f:
-            character_name = f.readline().strip()
+        # the game writes the name alongside the ID, so it is usually there already
+        try:
+            self.wait_for('_mantella_current_actor', lambda text: text != '', timeout=self.CHARACTER_NAME_TIMEOUT)
+        except TimeoutError:
+            logging.warning(f'_mantella_current_actor was still empty after {self.CHARACTER_NAME_TIMEOUT} seconds')
+        character_name = self.read_game_info('_mantella_current_actor', encoding=None)
         
         return character_id, character_name
     
     
-    def debugging_setup(self, debug_character_name, character_df):
+    def debugging_setup(self, debug_character_name, characters: CharacterRegistry):
         """Select character based on debugging parameters"""
 
         # None == in-game character chosen by spell
@@ -175,186 +189,32 @@ class GameStateManager:
             character_name = debug_character_name
             debug_character_name = ''
 
-        character_name, character_id, location, in_game_time = self.write_dummy_game_info(character_name, character_df)
+        character_name, character_id, location, in_game_time = self.write_dummy_game_info(character_name, characters)
 
         return character_name, character_id, location, in_game_time
     
     
-    def skyrim_load_unnamed_npc(self, character_name, character_df):
-        """Load generic NPC if character cannot be found in skyrim_characters.csv"""
-        # unknown == I couldn't find the IDs for these voice models
-        voice_model_ids = {
-            '0002992B':	'Dragon',
-            '2470000': 'Male Dark Elf Commoner',
-            '18469': 'Male Dark Elf Cynical',
-            '00013AEF':	'Female Argonian',
-            '00013AE3':	'Female Commander',
-            '00013ADE':	'Female Commoner',
-            '00013AE4':	'Female Condescending',
-            '00013AE5': 'Female Coward',
-            '00013AF3':	'Female Dark Elf',
-            'unknown': 'Female Dark Elf Commoner',
-            '00013AF1':	'Female Elf Haughty',
-            '00013ADD':	'Female Even Toned',
-            '00013AED':	'Female Khajiit',
-            '00013AE7':	'Female Nord',
-            '00013AE2':	'Female Old Grumpy',
-            '00013AE1':	'Female Old Kindly',
-            '00013AEB':	'Female Orc',
-            '00013BC3':	'Female Shrill',
-            '00012AE0':	'Female Sultry',
-            'unknown': 'Female Vampire',
-            '00013ADC':	'Female Young Eager',
-            '00013AEE':	'Male Argonian',
-            'unknown': 'Male Bandit',
-            '00013ADA':	'Male Brute',
-            '00013AD8':	'Male Commander',
-            '00013AD3': 'Male Commoner',
-            '000EA266': 'Male Commoner Accented',
-            '00013AD9':	'Male Condescending',
-            '00013ADB':	'Male Coward',
-            '00013AF2':	'Male Dark Elf Commoner',
-            'unknown': 'Male Dark Elf Cynical',
-            '00013AD4':	'Male Drunk',
-            '00013AF0':	'Male Elf Haughty',
-            '00013AD2':	'Male Even Toned',
-            '000EA267':	'Male Even Toned Accented',
-            '000AA8D3':	'Male Guard', # not in csv
-            '00013AEC':	'Male Khajiit',
-            '00013AE6':	'Male Nord',
-            '000E5003':	'Male Nord Commander',
-            '00013AD7':	'Male Old Grumpy',
-            '00013AD6':	'Male Old Kindly',
-            '00013AEA':	'Male Orc',
-            '00013AD5':	'Male Sly Cynical',
-            '0001B55F':	'Male Soldier',
-            'unknown': 'Male Vampire',
-            'unknown': 'Male Warlock',
-            '00012AD1':	'Male Young Eager',
-        }
-
-        actor_voice_model = self.load_data_when_available('_mantella_actor_voice', '')
-        actor_voice_model_id = actor_voice_model.split('(')[1].split(')')[0]
-        actor_voice_model_name = actor_voice_model.split('<')[1].split(' ')[0]
-
-        actor_race = self.load_data_when_available('_mantella_actor_race', '')
-        actor_race = actor_race.split('<')[1].split(' ')[0]
-
-        actor_sex = self.load_data_when_available('_mantella_actor_sex', '')
-
-        voice_model = ''
-        for key in voice_model_ids:
-            # using endswith because sometimes leading zeros are ignored
-            if actor_voice_model_id.endswith(key):
-                voice_model = voice_model_ids[key]
-                break
-        
-        # if voice_model not found in the voice model ID list
-        if voice_model == '':
-            try: # search for voice model in skyrim_characters.csv
-                voice_model = character_df.loc[character_df['skyrim_voice_folder'].astype(str).str.lower()==actor_voice_model_name.lower(), 'voice_model'].values[0]
-            except: # guess voice model based on sex and race
-                if actor_sex == '1':
-                    try:
-                        voice_model = _female_voice_models[actor_race]
-                    except:
-                        voice_model = 'Female Nord'
-                else:
-                    try:
-                        voice_model = _male_voice_models[actor_race]
-                    except:
-                        voice_model = 'Male Nord'
-
-        try: # search for relavant skyrim_voice_folder for voice_model
-            skyrim_voice_folder = character_df.loc[character_df['voice_model'].astype(str).str.lower()==voice_model.lower(), 'skyrim_voice_folder'].values[0]
-        except: # assume it is simply the voice_model name without spaces
-            skyrim_voice_folder = voice_model.replace(' ','')
-        
-        character_info = {
-            'name': character_name,
-            'bio': f'You are a {character_name}',
-            'voice_model': voice_model,
-            'advanced_voice_model': '',
-            'skyrim_voice_folder': skyrim_voice_folder,
-        }
-
-        return character_info
-    
-    def FO4_load_unnamed_npc(self, character_name, character_df, FO4_Voice_folder_and_models_df):
-        """Load generic NPC if character cannot be found in fallout4_characters.csv"""
-        # unknown == I couldn't find the IDs for these voice models
-
+    def load_unnamed_npc(self, character_name, voice_resolver: VoiceResolver):
+        """Load generic NPC if character cannot be found in skyrim_characters.csv / fallout4_characters.csv"""
         actor_voice_model = self.load_data_when_available('_mantella_actor_voice', '')
         actor_voice_model_id = actor_voice_model.split('(')[1].split(')')[0]
         actor_voice_model_name = actor_voice_model.split('<')[1].split(' ')[0]
 
-        #make the substitutions below to bypass non-functional XVASynth voice models: RobotCompanionMaleDefault, RobotCompanionMaleProcessed,Gen1Synth02 & Gen1Synth03 
-        if actor_voice_model_name in  ("DLC01RobotCompanionMaleDefault", "DLC01RobotCompanionMaleProcessed"):
-            actor_voice_model_name='robot_assaultron'
-            actor_voice_model_id='robot_assaultron'
-        if actor_voice_model_name in  ("SynthGen1Male02", "SynthGen1Male03"):
-            actor_voice_model_name='gen1synth01'
-            actor_voice_model_id='000BBBF0'
-
         actor_race = self.load_data_when_available('_mantella_actor_race', '')
         actor_race = actor_race.split('<')[1].split(' ')[0]
 
         actor_sex = self.load_data_when_available('_mantella_actor_sex', '')
 
         logging.info(f"Current voice actor is voice model {actor_voice_model_name} with ID {actor_voice_model_id} gender {actor_sex} race {actor_race} ")
+        voice_model, voice_folder = voice_resolver.resolve(actor_voice_model_id, actor_voice_model_name, actor_race, actor_sex)
 
-        voice_model = ''
-        matching_row=''
-        FO4_voice_folder=''
-        # Search for the Matching 'voice_ID'
-        matching_row = FO4_Voice_folder_and_models_df[FO4_Voice_folder_and_models_df['voice_ID'] == actor_voice_model_id]
-
-        # Return the Matching Row's Values
-        if not matching_row.empty:
-            # Assuming there's only one match, get the value from the 'voice_model' column
-            voice_model = matching_row['voice_model'].iloc[0]
-            FO4_voice_folder = matching_row['voice_file_name'].iloc[0]
-            logging.info(f"Matched voice model with ID to {FO4_voice_folder}")  # Or use the variable as needed
-        else:
-            logging.info("No matching voice ID found. Attempting voice_file_name match.")
-      
-        if voice_model == '':
-            # If no match by 'voice_ID' and not found in , search by 'voice_model' (actor_voice_model_name)
-            matching_row_by_name = FO4_Voice_folder_and_models_df[FO4_Voice_folder_and_models_df['voice_file_name'].str.lower() == actor_voice_model_name.lower()]
-            if not matching_row_by_name.empty:
-                # If there is a match, set 'voice_model' to 'actor_voice_model_name'
-                voice_model = matching_row_by_name['voice_model'].iloc[0]
-                FO4_voice_folder = matching_row_by_name['voice_file_name'].iloc[0]
-            else:
-                try: # search for voice model in fallout4_characters.csv
-                    voice_model = character_df.loc[character_df['fallout4_voice_folder'].astype(str).str.lower()==actor_voice_model_name.lower(), 'voice_model'].values[0]
-                except: 
-                    #except then try to match using gender and race with pre-established dictionaries
-                    if actor_sex == '1':
-                        try:
-                            voice_model = _FO4_female_voice_models[actor_race]
-                        except:
-                            voice_model = 'femaleboston'
-                    else:
-                        try:
-                            voice_model = _FO4_male_voice_models[actor_race]
-                        except:
-                            voice_model = 'maleboston'
-        if FO4_voice_folder == '':
-            try: # search for relevant FO4_Voice_folder_and_models_df for voice_model
-                matching_row_by_voicemodel = FO4_Voice_folder_and_models_df[FO4_Voice_folder_and_models_df['voice_model'].str.lower() == voice_model.lower()]
-                if not matching_row_by_voicemodel.empty:
-                    # FO4_voice_folder becomes the matching row of FO4_Voice_folder_XVASynth_matches.csv
-                    FO4_voice_folder = matching_row_by_voicemodel['voice_file_name'].iloc[0]
-            except: # assume it is simply the voice_model name without spaces
-                FO4_voice_folder = voice_model.replace(' ','')
-        
+        voice_folder_column = 'fallout4_voice_folder' if self.game in ["Fallout4", "Fallout4VR"] else 'skyrim_voice_folder'
         character_info = {
             'name': character_name,
             'bio': f'You are a {character_name}',
             'voice_model': voice_model,
             'advanced_voice_model': '',
-            'fallout4_voice_folder': FO4_voice_folder,
+            voice_folder_column: voice_folder,
         }
 
         return character_info
@@ -362,64 +222,32 @@ class GameStateManager:
 
 
     @utils.time_it
-    def load_game_state(self, debug_mode, debug_character_name, character_df, character_name, character_id, location, in_game_time, FO4_Voice_folder_and_models_df):
+    def load_game_state(self, debug_mode, debug_character_name, characters: CharacterRegistry, character_name, character_id, location, in_game_time, voice_resolver: VoiceResolver):
         """Load game variables from _mantella_ files in Skyrim/Fallout4 folder (data passed by the Mantella spell)"""
 
         if debug_mode == '1':
-            character_name, character_id, location, in_game_time = self.debugging_setup(debug_character_name, character_df)
+            character_name, character_id, location, in_game_time = self.debugging_setup(debug_character_name, characters)
         
         # tell Skyrim/Fallout4 papyrus script to start waiting for voiceline input
         self.write_game_info('_mantella_end_conversation', 'False')
         character_id, character_name = self.load_character_name_id()
 
-        def find_character_info(character_name, character_id, character_race, character_df):
-            full_id_len = 6
-            full_id_search = character_id[-full_id_len:]
-            partial_id_len = 3
-            partial_id_search = character_id[-partial_id_len:]
-
-            name_match = character_df['name'].astype(str).str.lower() == character_name.lower()
-            id_match = character_df['base_id'].astype(str).str.lower().str[-full_id_len:] == full_id_search
-            partial_id_match = character_df['base_id'].astype(str).str.lower().str[-partial_id_len:] == partial_id_search
-            race_match = character_df['race'].astype(str).str.lower() == character_race.lower()
-
+        def find_character_info(character_name, character_id, character_race):
             is_generic_npc = False
-            try: # match name, full ID, race (needed for Fallout 4 NPCs like Curie)
-                character_info = character_df.loc[name_match & id_match & race_match].to_dict('records')[0]
-            except IndexError:
-                try: # match name and full ID
-                    character_info = character_df.loc[name_match & id_match].to_dict('records')[0]
-                except IndexError:
-                    try: # match name, partial ID, and race
-                         character_info = character_df.loc[name_match & partial_id_match & race_match].to_dict('records')[0]
-                    except IndexError:
-                        try: # match name and partial ID
-                            character_info = character_df.loc[name_match & partial_id_match].to_dict('records')[0]
-                        except IndexError:
-                            try: # match name and race
-                                character_info = character_df.loc[name_match & race_match].to_dict('records')[0]
-                            except IndexError:
-                                try: # match just name
-                                    character_info = character_df.loc[name_match].to_dict('records')[0]
-                                except IndexError:
-                                    try: # match just ID
-                                        character_info = character_df.loc[id_match].to_dict('records')[0]
-                                    except IndexError: # treat as generic NPC
-                                        csvprefix = 'fallout4' if self.game in ["Fallout4", "Fallout4VR"] else 'skyrim'
-                                        logging.info(f"Could not find {character_name} in {csvprefix}_characters.csv. Loading as a generic NPC.")
-
-                                        if self.game in ["Fallout4", "Fallout4VR"]:
-                                            character_info = self.FO4_load_unnamed_npc(character_name, character_df, FO4_Voice_folder_and_models_df)
-                                        else:
-                                            character_info = self.skyrim_load_unnamed_npc(character_name, character_df)
-                                        is_generic_npc = True
+            character_info = characters.find(character_name, character_id, character_race)
+            if character_info is None: # treat as generic NPC
+                csvprefix = 'fallout4' if self.game in ["Fallout4", "Fallout4VR"] else 'skyrim'
+                logging.info(f"Could not find {character_name} in {csvprefix}_characters.csv. Loading as a generic NPC.")
+
+                character_info = self.load_unnamed_npc(character_name, voice_resolver)
+                is_generic_npc = True
 
             return character_info, is_generic_npc
         
         character_race = self.load_data_when_available('_mantella_actor_race', '')
         character_race = character_race.split('<')[1].split('Race ')[0]
 
-        character_info, is_generic_npc = find_character_info(character_name, character_id, character_race, character_df)
+        character_info, is_generic_npc = find_character_info(character_name, character_id, character_race)
         
         location = self.load_data_when_available('_mantella_current_location', location)
         if location.lower() == 'none': # location returns none when out in the wild
@@ -453,10 +281,10 @@ class GameStateManager:
         """Add in-game events to player's response"""
 
         # append in-game events to player's response
-        with open(f'{self.game_path}/_mantella_in_game_events.txt', 'r', encoding='utf-8') as f:
-            in_game_events_lines = f.readlines()[-5:] # read latest 5 events
+        self.event_reader.poll()
+        in_game_events = self.event_reader.drain(latest=5) # latest 5 events
 
-        message.add_event(in_game_events_lines)
+        message.add_event([event.text for event in in_game_events])
 
         is_in_combat = self.load_data_when_available('_mantella_actor_is_enemy', '')
         if is_in_combat.lower() == 'true':
@@ -465,12 +293,8 @@ class GameStateManager:
         if message.count_ingame_events() > 0:            
             logging.info(f'In-game events since previous exchange:\n{message.get_ingame_events_text()}')
 
-        # once the events are shared with the NPC, clear the file
-        self.write_game_info('_mantella_in_game_events', '')
-
         # append the time to player's response
-        with open(f'{self.game_path}/_mantella_in_game_time.txt', 'r') as f:
-            in_game_time = f.readline().strip()
+        in_game_time = self.read_game_info('_mantella_in_game_time', encoding=None)
         
         # only pass the in-game time if it has changed
         if (in_game_time != self.prev_game_time) and (in_game_time != ''):
@@ -490,77 +314,20 @@ class GameStateManager:
     @utils.time_it
     def end_conversation(self):
         logging.info('Conversation ended.')
+        cache_hits, cache_misses = self.get_read_stats()
+        logging.debug(f'_mantella_ file reads so far: {cache_hits} answered from memory, {cache_misses} from disk')
 
         self.write_game_info('_mantella_in_game_events', '')
+        self.event_reader.reset()
         self.write_game_info('_mantella_end_conversation', 'True')
-        time.sleep(5) # wait a few seconds for everything to register
+        # the goodbye line is done once the game has lowered the say line flag of whichever NPC said it
+        # (_mantella_say_line for the first NPC, _mantella_say_line_N for the others)
+        say_line_files = ['_mantella_say_line'] + [f'_mantella_say_line_{i}' for i in range(2, self.SAY_LINE_FILE_COUNT + 1)]
+        deadline = time.monotonic() + self.END_CONVERSATION_TIMEOUT
+        try:
+            for say_line_file in say_line_files:
+                self.wait_for(say_line_file, lambda text: text.lower() in ('false', ''), timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            logging.warning(f'The game did not finish the last voiceline within {self.END_CONVERSATION_TIMEOUT} seconds')
 
         return None
-        
-_male_voice_models = {
-    'ArgonianRace': 'Male Argonian',
-    'BretonRace': 'Male Even Toned',
-    'DarkElfRace': 'Male Dark Elf Commoner',
-    'HighElfRace': 'Male Elf Haughty',
-    'ImperialRace': 'Male Even Toned',
-    'KhajiitRace': 'Male Khajit',
-    'NordRace': 'Male Nord',
-    'OrcRace': 'Male Orc',
-    'RedguardRace': 'Male Even Toned',
-    'WoodElfRace': 'Male Young Eager',
-}
-_female_voice_models = {
-    'ArgonianRace': 'Female Argonian',
-    'BretonRace': 'Female Even Toned',
-    'DarkElfRace': 'Female Dark Elf Commoner',
-    'HighElfRace': 'Female Elf Haughty',
-    'ImperialRace': 'Female Even Toned',
-    'KhajiitRace': 'Female Khajit',
-    'NordRace': 'Female Nord',
-    'OrcRace': 'Female Orc',
-    'RedguardRace': 'Female Sultry',
-    'WoodElfRace': 'Female Young Eager',
-}
-
-_FO4_male_voice_models = {
-    'AssaultronRace':	'robot_assaultron',
-    'DLC01RoboBrainRace':	'robot_mrgutsy',
-    'DLC02HandyRace':	'robot_mrhandy',
-    'DLC02FeralGhoulRace':	'maleghoul',
-    'DLC03_SynthGen2RaceDiMa':	'dima',
-    'DLC03RoboBrainRace':	'robot_mrgutsy',
-    'EyeBotRace':	'robot_assaultron',
-    'GhoulRace':	'maleghoul',
-    'FeralGhoulRace':	'maleghoul',
-    'FeralGhoulGlowingRace':	'maleghoul',
-    'HumanRace':	'maleboston',
-    'ProtectronRace':	'robot_assaultron',
-    'SupermutantBehemothRace':	'supermutant03',
-    'SuperMutantRace':	'supermutant',
-    'SynthGen1Race':	'gen1synth01',
-    'SynthGen2Race':	'gen1synth01',
-    'TurretBubbleRace':	'Dima',
-    'TurretTripodRace':	'Dima',
-    'TurretWorkshopRace':	'Dima',
-}
-_FO4_female_voice_models = {
-    'AssaultronRace':	'robotcompanionfemalprocessed',
-    'DLC01RoboBrainRace':	'robotcompanionfemaledefault',
-    'DLC02HandyRace':	'robotcompanionfemaledefault',
-    'DLC02FeralGhoulRace':	'femaleghoul',
-    'DLC03_SynthGen2RaceDiMa':	'robotcompanionfemaledefault',
-    'DLC03RoboBrainRace':	'robotcompanionfemaledefault',
-    'EyeBotRace':	'robotcompanionfemalprocessed',
-    'GhoulRace':	'femaleghoul',
-    'FeralGhoulRace':	'femaleghoul',
-    'FeralGhoulGlowingRace':	'femaleghoul',
-    'HumanRace':	'femaleboston',
-    'ProtectronRace':	'robotcompanionfemalprocessed',
-    'SupermutantBehemothRace':	'supermutant03',
-    'SuperMutantRace':	'supermutant',
-    'SynthGen1Race':	'robotcompanionfemalprocessed',
-    'SynthGen2Race':	'robotcompanionfemalprocessed',
-    'TurretBubbleRace':	'Dima',
-    'TurretTripodRace':	'Dima',
-    'TurretWorkshopRace':	'Dima',
-}
\ No newline at end of file
@@ -4,6 +4,7 @@ from openai import OpenAI, AsyncOpenAI, RateLimitError
 import logging
 import time
 import tiktoken
+import src.llm.tokenizer as tokenizer
 import requests
 from src.llm.message_thread import message_thread
 from src.llm.messages import message
@@ -12,6 +13,9 @@ from src.config_loader import ConfigLoader
 class openai_client:
     """Joint setup for sync and async access to the LLMs
     """
+    # how often a rate limited request is sent before giving up
+    RATE_LIMIT_ATTEMPTS = 4
+
     def __init__(self, config: ConfigLoader, secret_key_file: str) -> None:
         def auto_resolve_endpoint(model_name, endpoints):
             # attempt connection to Kobold
@@ -103,7 +107,7 @@ If you are running a model locally, please ensure the service (Kobold / Text gen
         if endpoint != 'none':
             chosenmodel = 'gpt-3.5-turbo'
         try:
-            self.__encoding = tiktoken.encoding_for_model(chosenmodel)
+            self.__encoding: tiktoken.Encoding = tokenizer.get_encoding_for_model(chosenmodel, fallback=False)
         except:
             logging.error('Error loading model. If you are using an alternative to OpenAI, please find the setting `llm_api` in MantellaSoftware/config.ini and follow the instructions to change this setting')
             raise
@@ -222,11 +226,18 @@ If you are running a model locally, please ensure the service (Kobold / Text gen
         sync_client = self.generate_sync_client()        
         chat_completion = None
         logging.info('Getting LLM response...')
-        try:
-            chat_completion = sync_client.chat.completions.create(model=self.model_name, messages=messages.get_openai_messages(), max_tokens=1_000)
-        except RateLimitError:
-            logging.warning('Could not connect to LLM API, retrying in 5 seconds...') #Do we really retry here?
-            time.sleep(5)
+        retry_backoff = utils.Backoff(initial=1, maximum=8)
+        for attempt in range(self.RATE_LIMIT_ATTEMPTS):
+            try:
+                chat_completion = sync_client.chat.completions.create(model=self.model_name, messages=messages.get_openai_messages(), max_tokens=1_000)
+                break
+            except RateLimitError:
+                if attempt == self.RATE_LIMIT_ATTEMPTS - 1:
+                    logging.warning(f'LLM API still rate limited after {self.RATE_LIMIT_ATTEMPTS} attempts')
+                    break
+                delay = retry_backoff.next_delay()
+                logging.warning(f'LLM API rate limited, retrying in {delay} seconds...')
+                time.sleep(delay)
 
         sync_client.close()
 
@@ -241,10 +252,7 @@ If you are running a model locally, please ensure the service (Kobold / Text gen
     def num_tokens_from_messages(messages: message_thread | list[message], model="gpt-3.5-turbo") -> int:
         """Returns the number of tokens used by a list of messages
         """
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = tokenizer.get_encoding_for_model(model)
         
         messages_to_check = []
         if isinstance(messages, message_thread):
@@ -268,10 +276,7 @@ If you are running a model locally, please ensure the service (Kobold / Text gen
     @staticmethod
     def num_tokens_from_message(message_to_measure: message | str, encoding: tiktoken.Encoding | None, model="gpt-3.5-turbo") -> int:
         if not encoding:
-            try:
-                encoding = tiktoken.encoding_for_model(model)
-            except KeyError:
-                encoding = tiktoken.get_encoding("cl100k_base")
+            encoding = tokenizer.get_encoding_for_model(model)
         
         text: str = ""
         if isinstance(message_to_measure, message):
@@ -0,0 +1,130 @@
+import argparse
+import functools
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import tiktoken
+import tiktoken.load
+import tiktoken.model
+
+TOKENIZER_FOLDER = 'data/tokenizers'
+DEFAULT_MODEL = 'gpt-3.5-turbo'
+DEFAULT_ENCODING = 'cl100k_base'
+# the encodings to bundle with Mantella, see download_encodings
+BUNDLED_ENCODINGS = ['cl100k_base', 'o200k_base']
+
+# where tiktoken downloads each encoding from, which is also what it names its cached copy after
+ENCODING_URLS = {
+    'cl100k_base': 'https://openaipublic.blob.core.windows.net/encodings/cl100k_base.tiktoken',
+    'p50k_base': 'https://openaipublic.blob.core.windows.net/encodings/p50k_base.tiktoken',
+    'p50k_edit': 'https://openaipublic.blob.core.windows.net/encodings/p50k_base.tiktoken',
+    'r50k_base': 'https://openaipublic.blob.core.windows.net/encodings/r50k_base.tiktoken',
+    'o200k_base': 'https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken',
+}
+
+_cache_lock = threading.Lock()
+_cache_folder: str | None = None
+
+
+def get_cache_folder(tokenizer_folder: str = TOKENIZER_FOLDER) -> str:
+    """Points tiktoken at a cache folder inside Mantella (unless TIKTOKEN_CACHE_DIR is already set) and fills it with the bundled encodings
+
+    tiktoken otherwise downloads every encoding to the system's temp folder the first time it is used, which fails without network access.
+    Bundled encodings are `<encoding name>.tiktoken` files in `tokenizer_folder`, copied to the name tiktoken looks for in its cache.
+    """
+    global _cache_folder
+    with _cache_lock:
+        if _cache_folder is None:
+            if not os.environ.get('TIKTOKEN_CACHE_DIR'):
+                os.environ['TIKTOKEN_CACHE_DIR'] = os.path.abspath(os.path.join(tokenizer_folder, 'cache'))
+            _cache_folder = os.environ['TIKTOKEN_CACHE_DIR']
+
+            for encoding_name, url in ENCODING_URLS.items():
+                bundled_file = os.path.join(tokenizer_folder, f'{encoding_name}.tiktoken')
+                cached_file = os.path.join(_cache_folder, get_cache_file_name(url))
+                if os.path.exists(bundled_file) and not os.path.exists(cached_file):
+                    try:
+                        os.makedirs(_cache_folder, exist_ok=True)
+                        shutil.copyfile(bundled_file, cached_file)
+                    except OSError as e:
+                        logging.warning(f'Could not copy {bundled_file} to the tokenizer cache: {e}')
+        return _cache_folder
+
+
+def get_cache_file_name(url: str) -> str:
+    """The name tiktoken gives its cached copy of the encoding downloaded from `url` (see tiktoken.load.read_file_cached)"""
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def download_encodings(encoding_names: list[str] = BUNDLED_ENCODINGS, tokenizer_folder: str = TOKENIZER_FOLDER):
+    """Downloads encodings to `tokenizer_folder` as the `<encoding name>.tiktoken` files get_cache_folder bundles
+
+    Run `python -m src.llm.tokenizer` before packaging a release, so Mantella can count tokens on PCs without internet access.
+    """
+    os.makedirs(tokenizer_folder, exist_ok=True)
+    for encoding_name in encoding_names:
+        bundled_file = os.path.join(tokenizer_folder, f'{encoding_name}.tiktoken')
+        contents = tiktoken.load.read_file(ENCODING_URLS[encoding_name])
+        with open(f'{bundled_file}.tmp', 'wb') as f:
+            f.write(contents)
+        os.replace(f'{bundled_file}.tmp', bundled_file)
+        logging.info(f'Downloaded the {encoding_name} tokenizer to {bundled_file}')
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding_name(model: str) -> str:
+    """The name of the encoding used by `model`
+
+    Raises:
+        KeyError: if tiktoken does not know the model
+    """
+    if model in tiktoken.model.MODEL_TO_ENCODING:
+        return tiktoken.model.MODEL_TO_ENCODING[model]
+    for model_prefix, encoding_name in tiktoken.model.MODEL_PREFIX_TO_ENCODING.items():
+        if model.startswith(model_prefix):
+            return encoding_name
+    raise KeyError(f'Could not automatically map {model} to a tokeniser')
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = DEFAULT_ENCODING) -> tiktoken.Encoding:
+    """Loads an encoding once, from the bundled files if possible. Every later call returns the same instance."""
+    cache_folder = get_cache_folder()
+    try:
+        encoding = tiktoken.get_encoding(encoding_name)
+    except Exception:
+        logging.error(f'Could not load the {encoding_name} tokenizer. If this PC has no internet access, please copy {encoding_name}.tiktoken to {os.path.abspath(TOKENIZER_FOLDER)}')
+        raise
+    logging.debug(f'Loaded the {encoding_name} tokenizer (cache: {cache_folder})')
+    return encoding
+
+
+def get_encoding_for_model(model: str = DEFAULT_MODEL, fallback: bool = True) -> tiktoken.Encoding:
+    """The shared encoding of `model`, or of DEFAULT_ENCODING if tiktoken does not know the model and `fallback` is set
+
+    Raises:
+        KeyError: if tiktoken does not know the model and `fallback` is not set
+    """
+    try:
+        encoding_name = get_encoding_name(model)
+    except KeyError:
+        if not fallback:
+            raise
+        encoding_name = DEFAULT_ENCODING
+    return get_encoding(encoding_name)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=f'Downloads the tiktoken encodings Mantella bundles to {TOKENIZER_FOLDER}')
+    parser.add_argument('encodings', nargs='*', metavar='encoding',
+                        help=f'the encodings to download, out of {", ".join(ENCODING_URLS)} (default: {" ".join(BUNDLED_ENCODINGS)})')
+    parser.add_argument('--folder', default=TOKENIZER_FOLDER)
+    args = parser.parse_args()
+    unknown_encodings = [encoding_name for encoding_name in args.encodings if encoding_name not in ENCODING_URLS]
+    if unknown_encodings:
+        parser.error(f'unknown encodings: {", ".join(unknown_encodings)}')
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    download_encodings(args.encodings or BUNDLED_ENCODINGS, args.folder)
@@ -20,8 +20,12 @@ from src.llm.messages import assistant_message, message
 from src.llm.message_thread import message_thread
 from src.llm.openai_client import openai_client
 from src.tts import Synthesizer
+from src.game_io.line_queue import SayLineQueue
+from src.game_io.playback_tracker import PlaybackTracker
 
 class ChatManager:
+    ERROR_RESPONSE = "I can't find the right words at the moment."
+
     def __init__(self, game_state_manager, config, tts: Synthesizer, client: openai_client):
         self.loglevel = 28
         self.game = config.game
@@ -60,6 +64,15 @@ class ChatManager:
 
         self.sentence_queue = asyncio.Queue()
 
+        # up to `synthesis_look_ahead` synthesized sentences wait for playback, each in its own numbered output file
+        # (one more is being handed to the game, one more being synthesized, and in Fallout 4 the previous one may still be playing)
+        self.synthesis_look_ahead = max(0, config.synthesis_look_ahead)
+        self.__output_slots: int = self.synthesis_look_ahead + 3
+        self.__next_output_slot: int = 0
+
+        # with a queue depth of 0 lines are handed over one at a time through _mantella_say_line
+        self.say_line_queue: SayLineQueue | None = SayLineQueue(game_state_manager, config.say_line_queue_depth) if config.say_line_queue_depth > 0 else None
+
     def pygame_initialize(self):
         if self.game == "Fallout4" or self.game == "Fallout4VR":
             # Ensure pygame is initialized
@@ -70,10 +83,33 @@ class ChatManager:
             if not pygame.mixer.get_init():
                 pygame.mixer.init(frequency=22050, size=-16, channels=2)  # Adjust these values as necessary
 
+    def presynthesize_sentences(self, sentences: list[str], character: Character):
+        """Has the synthesizer prepare lines the character is likely to say later (eg goodbyes) in the background, for `play_sentence_ingame`"""
+        for sentence in sentences:
+            self.__tts.queue_presynthesis(character.voice_model, sentence, character.in_game_voice_model, character.voice_accent, character.is_in_combat, character.advanced_voice_model)
+
     def play_sentence_ingame(self, sentence: str, character_to_talk: Character):
+        # lines prepared by presynthesize_sentences are taken from the synthesizer's voiceline cache
         audio_file = self.__tts.synthesize(character_to_talk.voice_model, sentence, character_to_talk.in_game_voice_model, character_to_talk.voice_accent, character_to_talk.is_in_combat, character_to_talk.advanced_voice_model)
         self.save_files_to_voice_folders([audio_file, sentence])
 
+    async def synthesize_sentence(self, sentence: str) -> tuple[str, str, Character, int] | None:
+        """Synthesizes a sentence of the active character on a worker thread, into the next numbered output file
+
+        Returns:
+            tuple[str, str, Character, int] | None: the audio file, the sentence, and who says it (which may have changed by the time it plays),
+            or None if it could not be synthesized
+        """
+        character, character_num = self.active_character, self.character_num
+        output_name = f'out_{self.__next_output_slot + 1}'
+        self.__next_output_slot = (self.__next_output_slot + 1) % self.__output_slots
+        try:
+            audio_file = await asyncio.to_thread(self.__tts.synthesize, character.voice_model, ' ' + sentence + ' ', character.in_game_voice_model, character.voice_accent, character.is_in_combat, character.advanced_voice_model, output_name)
+        except Exception as e:
+            logging.error(f"xVASynth Error: {e}")
+            return None
+        return audio_file, sentence, character, character_num
+
     def num_tokens(self, content_to_measure: message | str | message_thread | list[message]) -> int:
         if isinstance(content_to_measure, message_thread) or isinstance(content_to_measure, list):
             return openai_client.num_tokens_from_messages(content_to_measure)
@@ -81,9 +117,11 @@ class ChatManager:
             return openai_client.num_tokens_from_message(content_to_measure, None)
         
     async def get_response(self, messages: message_thread, characters: Characters, radiant_dialogue: bool) -> message_thread:
-        sentence_queue: asyncio.Queue[tuple[str,str] | None] = asyncio.Queue()
+        sentence_queue: asyncio.Queue[tuple[str, str, Character, int] | None] = asyncio.Queue(maxsize=max(1, self.synthesis_look_ahead))
         event: asyncio.Event = asyncio.Event()
         event.set()
+        if self.say_line_queue and self.say_line_queue.is_enabled:
+            self.say_line_queue.reset()
 
         results = await asyncio.gather(
             self.process_response(sentence_queue, messages, characters, radiant_dialogue, event), 
@@ -105,6 +143,7 @@ class ChatManager:
         return duration
     
 
+    @utils.time_it
     def setup_voiceline_save_location(self, in_game_voice_folder):
         """Save voice model folder to Mantella Spell if it does not already exist"""
         self.in_game_voice_model = in_game_voice_folder
@@ -127,16 +166,26 @@ class ChatManager:
 
             self.game_state_manager.write_game_info('_mantella_status', 'Error with Mantella.exe. Please check MantellaSoftware/logging.log')
             logging.warn(f"Unknown NPC detected. This NPC will be able to speak once you restart {self.game}. To learn how to add memory, a background, and a voice model of your choosing to this NPC, see here: https://github.com/art-from-the-machine/Mantella#adding-modded-npcs")
-            time.sleep(5)
+            # the status has been written by the time write_game_info returns, so there is nothing left to wait for
             return True
         return False
 
 
     @utils.time_it
-    def save_files_to_voice_folders(self, queue_output):
-        """Save voicelines and subtitles to the correct game folders"""
+    def save_files_to_voice_folders(self, queue_output, line_slot: tuple[int, int] | None = None):
+        """Save voicelines and subtitles to the correct game folders
 
-        audio_file, subtitle = queue_output
+        Args:
+            queue_output: the audio file and its subtitle, optionally followed by the character saying it and their number (by default the active character)
+            line_slot (tuple[int, int] | None, optional): sequence number and slot from the say line queue. Defaults to None (hand over through _mantella_say_line).
+        """
+
+        audio_file, subtitle, *speaker = queue_output
+        character, character_num = speaker if speaker else (self.active_character, self.character_num)
+        if line_slot:
+            wav_file, lip_file = self.get_voiceline_file_names(line_slot[1])
+        else:
+            wav_file, lip_file = self.wav_file, self.lip_file
 
         if self.add_voicelines_to_all_voice_folders == '1':
             for sub_folder in os.scandir(self.mod_folder):
@@ -144,200 +193,150 @@ class ChatManager:
                     continue
 
                 if self.game != "Fallout4" and self.game != "Fallout4VR":
-                    shutil.copyfile(audio_file, f"{sub_folder.path}/{self.wav_file}")
+                    shutil.copyfile(audio_file, f"{sub_folder.path}/{wav_file}")
 
                 # Copy FaceFX generated LIP file
                 try:
-                    shutil.copyfile(audio_file.replace(".wav", ".lip"), f"{sub_folder.path}/{self.lip_file}")
+                    shutil.copyfile(audio_file.replace(".wav", ".lip"), f"{sub_folder.path}/{lip_file}")
                 except Exception as e:
                     # only warn on failure
                     logging.warning(e)
         else:
             if self.game != "Fallout4" and self.game != "Fallout4VR":
-                shutil.copyfile(audio_file, f"{self.mod_folder}/{self.active_character.in_game_voice_model}/{self.wav_file}")
+                shutil.copyfile(audio_file, f"{self.mod_folder}/{character.in_game_voice_model}/{wav_file}")
 
             # Copy FaceFX generated LIP file
             try:
-                shutil.copyfile(audio_file.replace(".wav", ".lip"), f"{self.mod_folder}/{self.active_character.in_game_voice_model}/{self.lip_file}")
+                shutil.copyfile(audio_file.replace(".wav", ".lip"), f"{self.mod_folder}/{character.in_game_voice_model}/{lip_file}")
             except Exception as e:
                 # only warn on failure
                 logging.warning(e)
 
 
-        logging.info(f"{self.active_character.name} should speak")
-        if self.character_num == 0:
+        logging.info(f"{character.name} should speak")
+        if line_slot:
+            sequence, slot = line_slot
+            self.say_line_queue.publish(sequence, slot, character_num, subtitle.strip())
+            if self.game =="Fallout4" or self.game =="Fallout4VR":
+                self.play_adjusted_volume(audio_file)
+
+        elif character_num == 0:
             self.game_state_manager.write_game_info('_mantella_say_line', subtitle.strip())
             if self.game =="Fallout4" or self.game =="Fallout4VR":
                 self.play_adjusted_volume(audio_file)
 
         else:
-            say_line_file = '_mantella_say_line_'+str(self.character_num+1)
+            say_line_file = '_mantella_say_line_'+str(character_num+1)
             self.game_state_manager.write_game_info(say_line_file, subtitle.strip())
             if self.game =="Fallout4" or self.game =="Fallout4VR":
                 self.play_adjusted_volume(audio_file)
 
+    def get_voiceline_file_names(self, slot: int) -> tuple[str, str]:
+        """Returns the names of the .wav and .lip files the game plays for the given say line queue slot"""
+        wav_file = f'MantellaDi_MantellaDialogu_00001D8B_{slot + 1}.wav'
+        if self.game == "Fallout4" or self.game == "Fallout4VR":
+            lip_file = f'00001ED2_{slot + 1}.lip'
+        else:
+            lip_file = f'MantellaDi_MantellaDialogu_00001D8B_{slot + 1}.lip'
+        return wav_file, lip_file
+
     def play_adjusted_volume(self, wav_file_path):
-        FO4Volume_scale = self.FO4Volume / 100.0  # Normalize to 0.0-1.0
         logging.info("Waiting for _mantella_audio_ready.txt to be set with the audio array in Fallout 4 directory")
-        while True:
-            with open(f'{self.root_mod_folder}/_mantella_audio_ready.txt', 'r', encoding='utf-8') as f:
-                audio_array_str = f.read().strip()
-                #check if a value is entered in the audio array (necessary to prevent Mantella trying to read an empty file)
-                if audio_array_str.lower() != 'false' and audio_array_str:
-                    try:
-                        # Parse the data
-                        npc_distance, playerPosX, playerPosY, game_angle_z, targetPosX, targetPosY = map(float, audio_array_str.split(','))
-                        player_pos = (playerPosX, playerPosY)
-                        target_pos = (targetPosX, targetPosY)
-                        
-                        # Calculate the relative angle
-                        relative_angle = self.calculate_relative_angle(player_pos, target_pos, game_angle_z)
-
-                        # Normalize the relative angle between -180 and 180
-                        normalized_angle = relative_angle % 360
-                        if normalized_angle > 180:
-                            normalized_angle -= 360  # Adjust angles to be within [-180, 180]
-
-                        # Calculate volume scale based on the normalized angle
-                        if normalized_angle >= -90 and normalized_angle <= 90:  # Front half
-                            # Linear scaling: Full volume at 0 degrees, decreasing to 50% volume at 90 degrees to either side
-                            volume_scale_left = 0.5 + normalized_angle / 90 * 0.5
-                            volume_scale_right = 0.5 - normalized_angle / 90 * 0.5
-                        elif normalized_angle > 90 and normalized_angle < 180:
-                            volume_scale_left = 90 / normalized_angle
-                            volume_scale_right = 1- 90 / normalized_angle
-                        elif normalized_angle > -180 and normalized_angle < -90:
-                            volume_scale_left = 1- 90 / abs(normalized_angle)
-                            volume_scale_right = 90 / abs(normalized_angle)
-                        else:  # failsafe if for some reason an unmanaged number is entered
-                            volume_scale_left = 0.5
-                            volume_scale_right = 0.5
-
-                        # Apply the calculated scale differently to left and right channels based on angle direction
-                        #if normalized_angle >= 0:  # Turning right
-                        #    volume_scale_left = volume_scale
-                        #    volume_scale_right = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease right volume as angle increases
-                        #else:  # Turning left
-                        #    volume_scale_right = volume_scale
-                    #    volume_scale_left = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease left volume as angle decreases
-
-                        # Ensure volumes don't drop below a threshold, for example, 0.1, if you want to keep a minimum volume level
-                        min_volume_threshold = 0.1
-                        volume_scale_left = max(volume_scale_left, min_volume_threshold)
-                        volume_scale_right = max(volume_scale_right, min_volume_threshold)
-
-                        if npc_distance > 0:
-                            distance_factor = max(0, 1 - (npc_distance / 4000))
-                        else:
-                            distance_factor=1
-
-                        # Load the WAV file
-                        sound = pygame.mixer.Sound(wav_file_path)
-                        original_audio_array = pygame.sndarray.array(sound)
-                        
-                        if original_audio_array.ndim == 1:  # Mono sound
-                            # Duplicate the mono data to create a stereo effect
-                            audio_data_stereo = np.stack((original_audio_array, original_audio_array), axis=-1)
-                        else:
-                            audio_data_stereo = original_audio_array
-                        
-                        # Adjust volume for each channel according to angle, distance, and config volume
-                        audio_data_stereo[:, 0] = (audio_data_stereo[:, 0] * volume_scale_left * distance_factor * FO4Volume_scale).astype(np.int16)  # Left channel
-                        audio_data_stereo[:, 1] = (audio_data_stereo[:, 1] * volume_scale_right * distance_factor * FO4Volume_scale).astype(np.int16)  # Right channel
-                        
-                        # Convert back to pygame sound object
-                        adjusted_sound = pygame.sndarray.make_sound(audio_data_stereo)
-                        
-                        # Play the adjusted stereo audio
-                        play_obj = adjusted_sound.play()
-                        
-                        while play_obj.get_busy():  # Wait until playback is done
-                            pygame.time.delay(100)
-                        del play_obj
-                        self.game_state_manager.write_game_info('_mantella_audio_ready', 'false')
-                        break
-
-                    except ValueError:
-                        asyncio.sleep(0.1)
-                        with open(f'{self.root_mod_folder}/_mantella_audio_ready.txt', 'r', encoding='utf-8') as f:
-                            audio_array_str = f.read().strip()
-                            #check if a value is entered in the audio array (necessary to prevent Mantella trying to read an empty file)
-                            if audio_array_str.lower() != 'false' and audio_array_str:
-                                try:
-                                    # Parse the data
-                                    npc_distance, playerPosX, playerPosY, game_angle_z, targetPosX, targetPosY = map(float, audio_array_str.split(','))
-                                    player_pos = (playerPosX, playerPosY)
-                                    target_pos = (targetPosX, targetPosY)
-                                    
-                                    # Calculate the relative angle
-                                    relative_angle = self.calculate_relative_angle(player_pos, target_pos, game_angle_z)
-
-                                    # Normalize the relative angle between -180 and 180
-                                    normalized_angle = relative_angle % 360
-                                    if normalized_angle > 180:
-                                        normalized_angle -= 360  # Adjust angles to be within [-180, 180]
-
-                                    # Calculate volume scale based on the normalized angle
-                                    if normalized_angle >= -90 and normalized_angle <= 90:  # Front half
-                                        # Linear scaling: Full volume at 0 degrees, decreasing to 50% volume at 90 degrees to either side
-                                        volume_scale_left = 0.5 + normalized_angle / 90 * 0.5
-                                        volume_scale_right = 0.5 - normalized_angle / 90 * 0.5
-                                    elif normalized_angle > 90 and normalized_angle < 180:
-                                        volume_scale_left = 90 / normalized_angle
-                                        volume_scale_right = 1- 90 / normalized_angle
-                                    elif normalized_angle > -180 and normalized_angle < -90:
-                                        volume_scale_left = 1- 90 / abs(normalized_angle)
-                                        volume_scale_right = 90 / abs(normalized_angle)
-                                    else:  # failsafe if for some reason an unmanaged number is entered
-                                        volume_scale_left = 0.5
-                                        volume_scale_right = 0.5
-
-                                    # Apply the calculated scale differently to left and right channels based on angle direction
-                                    #if normalized_angle >= 0:  # Turning right
-                                    #    volume_scale_left = volume_scale
-                                    #    volume_scale_right = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease right volume as angle increases
-                                    #else:  # Turning left
-                                    #    volume_scale_right = volume_scale
-                                    #    volume_scale_left = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease left volume as angle decreases
-
-                                    # Ensure volumes don't drop below a threshold, for example, 0.1, if you want to keep a minimum volume level
-                                    min_volume_threshold = 0.1
-                                    volume_scale_left = max(volume_scale_left, min_volume_threshold)
-                                    volume_scale_right = max(volume_scale_right, min_volume_threshold)
-
-                                    if npc_distance > 0:
-                                        distance_factor = max(0, 1 - (npc_distance / 4000))
-                                    else:
-                                        distance_factor=1
+        # wake up as soon as the game has written the audio array rather than rereading the file in a tight loop
+        audio_array_str = self.game_state_manager.wait_for('_mantella_audio_ready', self.__is_audio_array_set)
+        try:
+            self.__play_with_audio_array(wav_file_path, audio_array_str)
+        except ValueError:
+            # the array may have been read while the game was still writing it, so give the game a moment to finish and try once more
+            try:
+                audio_array_str = self.game_state_manager.wait_for('_mantella_audio_ready', lambda text: self.__is_audio_array_set(text) and text != audio_array_str, timeout=0.1)
+            except TimeoutError:
+                pass
+            try:
+                self.__play_with_audio_array(wav_file_path, audio_array_str)
+            except ValueError:
+                logging.error("Error processing audio array from _mantella_audio_ready.txt")
+
+    @staticmethod
+    def __is_audio_array_set(audio_array_str: str) -> bool:
+        #check if a value is entered in the audio array (necessary to prevent Mantella trying to read an empty file)
+        return audio_array_str.lower() != 'false' and audio_array_str != ''
+
+    def __play_with_audio_array(self, wav_file_path, audio_array_str):
+        """Play the voiceline with its volume adjusted to the NPC's direction and distance given by the game's audio array"""
+        FO4Volume_scale = self.FO4Volume / 100.0  # Normalize to 0.0-1.0
+
+        # Parse the data
+        npc_distance, playerPosX, playerPosY, game_angle_z, targetPosX, targetPosY = map(float, audio_array_str.split(','))
+        player_pos = (playerPosX, playerPosY)
+        target_pos = (targetPosX, targetPosY)
+        
+        # Calculate the relative angle
+        relative_angle = self.calculate_relative_angle(player_pos, target_pos, game_angle_z)
+
+        # Normalize the relative angle between -180 and 180
+        normalized_angle = relative_angle % 360
+        if normalized_angle > 180:
+            normalized_angle -= 360  # Adjust angles to be within [-180, 180]
+
+        # Calculate volume scale based on the normalized angle
+        if normalized_angle >= -90 and normalized_angle <= 90:  # Front half
+            # Linear scaling: Full volume at 0 degrees, decreasing to 50% volume at 90 degrees to either side
+            volume_scale_left = 0.5 + normalized_angle / 90 * 0.5
+            volume_scale_right = 0.5 - normalized_angle / 90 * 0.5
+        elif normalized_angle > 90 and normalized_angle < 180:
+            volume_scale_left = 90 / normalized_angle
+            volume_scale_right = 1- 90 / normalized_angle
+        elif normalized_angle > -180 and normalized_angle < -90:
+            volume_scale_left = 1- 90 / abs(normalized_angle)
+            volume_scale_right = 90 / abs(normalized_angle)
+        else:  # failsafe if for some reason an unmanaged number is entered
+            volume_scale_left = 0.5
+            volume_scale_right = 0.5
+
+        # Apply the calculated scale differently to left and right channels based on angle direction
+        #if normalized_angle >= 0:  # Turning right
+        #    volume_scale_left = volume_scale
+        #    volume_scale_right = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease right volume as angle increases
+        #else:  # Turning left
+        #    volume_scale_right = volume_scale
+        #    volume_scale_left = 1 - abs(normalized_angle) / 90 * 0.5  # Decrease left volume as angle decreases
+
+        # Ensure volumes don't drop below a threshold, for example, 0.1, if you want to keep a minimum volume level
+        min_volume_threshold = 0.1
+        volume_scale_left = max(volume_scale_left, min_volume_threshold)
+        volume_scale_right = max(volume_scale_right, min_volume_threshold)
+
+        if npc_distance > 0:
+            distance_factor = max(0, 1 - (npc_distance / 4000))
+        else:
+            distance_factor=1
+
+        # Load the WAV file
+        sound = pygame.mixer.Sound(wav_file_path)
+        original_audio_array = pygame.sndarray.array(sound)
+        
+        if original_audio_array.ndim == 1:  # Mono sound
+            # Duplicate the mono data to create a stereo effect
+            audio_data_stereo = np.stack((original_audio_array, original_audio_array), axis=-1)
+        else:
+            audio_data_stereo = original_audio_array
+        
+        # Adjust volume for each channel according to angle, distance, and config volume
+        audio_data_stereo[:, 0] = (audio_data_stereo[:, 0] * volume_scale_left * distance_factor * FO4Volume_scale).astype(np.int16)  # Left channel
+        audio_data_stereo[:, 1] = (audio_data_stereo[:, 1] * volume_scale_right * distance_factor * FO4Volume_scale).astype(np.int16)  # Right channel
+        
+        # Convert back to pygame sound object
+        adjusted_sound = pygame.sndarray.make_sound(audio_data_stereo)
+        
+        # Play the adjusted stereo audio
+        play_obj = adjusted_sound.play()
+        
+        while play_obj.get_busy():  # Wait until playback is done
+            pygame.time.delay(100)
+        del play_obj
+        self.game_state_manager.write_game_info('_mantella_audio_ready', 'false')
 
-                                    # Load the WAV file
-                                    sound = pygame.mixer.Sound(wav_file_path)
-                                    original_audio_array = pygame.sndarray.array(sound)
-                                    
-                                    if original_audio_array.ndim == 1:  # Mono sound
-                                        # Duplicate the mono data to create a stereo effect
-                                        audio_data_stereo = np.stack((original_audio_array, original_audio_array), axis=-1)
-                                    else:
-                                        audio_data_stereo = original_audio_array
-                                    
-                                    # Adjust volume for each channel according to angle, distance, and config volume
-                                    audio_data_stereo[:, 0] = (audio_data_stereo[:, 0] * volume_scale_left * distance_factor * FO4Volume_scale).astype(np.int16)  # Left channel
-                                    audio_data_stereo[:, 1] = (audio_data_stereo[:, 1] * volume_scale_right * distance_factor * FO4Volume_scale).astype(np.int16)  # Right channel
-                                    
-                                    # Convert back to pygame sound object
-                                    adjusted_sound = pygame.sndarray.make_sound(audio_data_stereo)
-                                    
-                                    # Play the adjusted stereo audio
-                                    play_obj = adjusted_sound.play()
-                                    
-                                    while play_obj.get_busy():  # Wait until playback is done
-                                        pygame.time.delay(100)
-                                    del play_obj
-                                    self.game_state_manager.write_game_info('_mantella_audio_ready', 'false')
-                                    break
-                                except ValueError:
-                                    logging.error("Error processing audio array from _mantella_audio_ready.txt")
-                                    break
 
     def convert_game_angle_to_trig_angle(self, game_angle):
         #Used for Mantella Fallout to play directional audio
@@ -408,9 +407,10 @@ class ChatManager:
                 continue
 
 
-    async def send_audio_to_external_software(self, queue_output):
+    async def send_audio_to_external_software(self, queue_output, line_slot: tuple[int, int] | None = None):
         logging.debug(f"Dialogue to play: {queue_output[0]}")
-        self.save_files_to_voice_folders(queue_output)
+        # copying the voiceline (and playing it in Fallout 4) blocks, so keep it off the event loop to let the LLM keep streaming
+        await asyncio.to_thread(self.save_files_to_voice_folders, queue_output, line_slot)
         
         
         # Remove the played audio file
@@ -419,45 +419,39 @@ class ChatManager:
         # Remove the played audio file
         #os.remove(audio_file)
 
-    async def send_response(self, sentence_queue: asyncio.Queue[tuple[str,str]|None], event: asyncio.Event):
+    async def send_response(self, sentence_queue: asyncio.Queue[tuple[str, str, Character, int]|None], event: asyncio.Event):
         """Send response from sentence queue generated by `process_response()`"""
 
+        playback_tracker: PlaybackTracker | None = None
         while True:
             queue_output = await sentence_queue.get()
             if queue_output is None:
                 logging.info('End of sentences')
+                if self.say_line_queue:
+                    # the conversation only moves on once the game has played every queued line
+                    await self.say_line_queue.wait_until_played()
                 break
 
+            if self.say_line_queue and self.say_line_queue.is_enabled:
+                # stage the line in the next free slot and carry on with the next one without waiting for playback
+                line_slot = await self.say_line_queue.acquire_slot()
+                # None if the game stopped acknowledging lines, in which case it is handed over through _mantella_say_line below
+                if line_slot:
+                    await self.send_audio_to_external_software(queue_output, line_slot)
+                    event.set()
+                    continue
+
             # send the audio file to the external software and wait for it to finish playing
             await self.send_audio_to_external_software(queue_output)
             event.set()
 
             #if Fallout4 is running the audio will be sync by checking if say line is set to false because the Mantella can internally check if an audio file has finished playing
             if self.game =="Fallout4" or self.game == "Fallout4VR":
-                with open(f'{self.root_mod_folder}/_mantella_actor_count.txt', 'r', encoding='utf-8') as f:
-                        mantellaactorcount = f.read().strip() 
-                # Outer loop to continuously check the files
-                while True:
-                    all_false = True  # Flag to check if all files have 'false'
-
-                    # Iterate through the number of files indicated by mantellaactorcount
-                    for i in range(1, int(mantellaactorcount) + 1):
-                        file_name = f'{self.root_mod_folder}/_mantella_say_line'
-                        if i != 1:
-                            file_name += f'_{i}'  # Append the file number for files 2 and above
-                        file_name += '.txt'
-
-                        with open(file_name, 'r', encoding='utf-8') as f:
-                            content = f.read().strip()
-                            if content.lower() != 'false':
-                                all_false = False  # Set the flag to False if any file is not 'false'
-                                break  # Break the for loop and continue the while loop
-
-                    if all_false:
-                        break  # Break the outer loop if all files are 'false'
-
-                    # Wait for a short period before checking the files again
-                    await asyncio.sleep(0.1)  # Adjust the sleep duration as needed
+                if not playback_tracker:
+                    # the actors in the conversation do not change during a response, so the count is only read once
+                    mantellaactorcount = await self.game_state_manager.read_game_info_async('_mantella_actor_count')
+                    playback_tracker = PlaybackTracker.for_actor_count(self.game_state_manager.transport, int(mantellaactorcount))
+                await playback_tracker.wait()
 
             #if Skyrim's running then estimate audio duration to sync lip files
             else:
@@ -516,7 +510,7 @@ class ChatManager:
         return sentence
 
 
-    async def process_response(self, sentence_queue: asyncio.Queue[tuple[str,str] |None], messages : message_thread, characters: Characters, radiant_dialogue: bool, event:asyncio.Event) -> message_thread:
+    async def process_response(self, sentence_queue: asyncio.Queue[tuple[str, str, Character, int] |None], messages : message_thread, characters: Characters, radiant_dialogue: bool, event:asyncio.Event) -> message_thread:
         """Stream response from LLM one sentence at a time"""
 
         sentence = ''
@@ -527,6 +521,7 @@ class ChatManager:
         #Added from xTTS implementation
         accumulated_sentence = ''
         current_action = ''
+        retry_backoff = utils.Backoff(initial=1, maximum=10)
         
         while True:
             try:
@@ -614,13 +609,11 @@ class ChatManager:
 
                                 if self.active_character:
                                     # Generate the audio and return the audio file path
-                                    try:
-                                        audio_file = self.__tts.synthesize(self.active_character.voice_model, ' ' + sentence + ' ', self.active_character.in_game_voice_model, self.active_character.voice_accent, self.active_character.is_in_combat, self.active_character.advanced_voice_model)
-                                    except Exception as e:
-                                        logging.error(f"xVASynth Error: {e}")
+                                    queue_output = await self.synthesize_sentence(sentence)
 
-                                    # Put the audio file path in the sentence_queue
-                                    await sentence_queue.put([audio_file, sentence])
+                                    # Put the audio file path in the sentence_queue, which waits while `synthesis_look_ahead` sentences are already waiting to play
+                                    if queue_output:
+                                        await sentence_queue.put(queue_output)
 
                                     # Append current_action to full_reply before appending the accumulated sentence
                                     if current_action != '':
@@ -637,13 +630,14 @@ class ChatManager:
                                         sentence = remaining_content
                                     remaining_content = ''
 
-                                    # clear the event for the next iteration
-                                    event.clear()
-                                    # wait for the event to be set before generating the next line
-                                    await event.wait()
+                                    if self.synthesis_look_ahead == 0:
+                                        # clear the event for the next iteration
+                                        event.clear()
+                                        # wait for the event to be set before generating the next line
+                                        await event.wait()
 
-                                    end_conversation = self.game_state_manager.load_data_when_available('_mantella_end_conversation', '')
-                                    radiant_dialogue_update = self.game_state_manager.load_data_when_available('_mantella_radiant_dialogue', '')
+                                    end_conversation = await self.game_state_manager.load_data_when_available_async('_mantella_end_conversation', '')
+                                    radiant_dialogue_update = await self.game_state_manager.load_data_when_available_async('_mantella_radiant_dialogue', '')
                                     # stop processing LLM response if:
                                     # max_response_sentences reached (and the conversation isn't radiant / multi-NPC)
                                     # conversation has switched from radiant to multi NPC (this allows the player to "interrupt" radiant dialogue and include themselves in the conversation)
@@ -656,12 +650,16 @@ class ChatManager:
                     logging.error(f"Invalid API key. Please ensure you have selected the right model for your service (OpenAI / OpenRouter) via the 'model' setting in MantellaSoftware/config.ini. If you are instead trying to connect to a local model, please ensure the service is running.")
                 else:
                     logging.error(f"LLM API Error: {e}")
-                error_response = "I can't find the right words at the moment."
-                self.play_sentence_ingame(error_response, self.active_character)
+                error_response = self.ERROR_RESPONSE
+                # queued like any other sentence, so it plays after the lines already queued and synthesis stays off the event loop
+                queue_output = await self.synthesize_sentence(error_response)
+                if queue_output:
+                    await sentence_queue.put(queue_output)
                 # audio_file = self.__tts.synthesize(self.active_character.voice_model, None, error_response)
                 # self.save_files_to_voice_folders([audio_file, error_response])
-                logging.log(self.loglevel, 'Retrying connection to API...')
-                time.sleep(5)
+                delay = retry_backoff.next_delay()
+                logging.log(self.loglevel, f'Retrying connection to API in {delay} seconds...')
+                await asyncio.sleep(delay)
 
         #Added from xTTS implementation
         # Check if there is any accumulated sentence at the end
@@ -669,8 +667,9 @@ class ChatManager:
             # Generate the audio and return the audio file path
             try:
                 #Added from xTTS implementation
-                audio_file = self.__tts.synthesize(self.active_character.voice_model, ' ' + accumulated_sentence + ' ', self.active_character.in_game_voice_model, self.active_character.voice_accent, self.active_character.is_in_combat, self.active_character.advanced_voice_model)
-                await sentence_queue.put([audio_file, accumulated_sentence])
+                queue_output = await self.synthesize_sentence(accumulated_sentence)
+                if queue_output:
+                    await sentence_queue.put(queue_output)
                 
                 # Append current_action to full_reply before appending the accumulated sentence
                 if current_action != '':
@@ -680,12 +679,13 @@ class ChatManager:
                     full_reply += accumulated_sentence
                 
                 accumulated_sentence = ''
-                # clear the event for the next iteration
-                event.clear()
-                # wait for the event to be set before generating the next line
-                await event.wait()
-                end_conversation = self.game_state_manager.load_data_when_available('_mantella_end_conversation', '')
-                radiant_dialogue_update = self.game_state_manager.load_data_when_available('_mantella_radiant_dialogue', '')
+                if self.synthesis_look_ahead == 0:
+                    # clear the event for the next iteration
+                    event.clear()
+                    # wait for the event to be set before generating the next line
+                    await event.wait()
+                end_conversation = await self.game_state_manager.load_data_when_available_async('_mantella_end_conversation', '')
+                radiant_dialogue_update = await self.game_state_manager.load_data_when_available_async('_mantella_radiant_dialogue', '')
             except Exception as e:
                 accumulated_sentence = ''
                 logging.error(f"xVASynth Error: {e}")
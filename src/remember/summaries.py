@@ -1,7 +1,8 @@
 import json
 import logging
-import os
 import time
+import os
+import src.utils as utils
 from src.llm.openai_client import openai_client
 from src.llm.message_thread import message_thread
 from src.llm.messages import user_message
@@ -34,14 +35,11 @@ class summaries(remembering):
         """
         result = ""
         for character in npcs_in_conversation.get_all_characters():
-            if os.path.exists(character.conversation_history_file) and os.path.exists(character.conversation_summary_file):
-                with open(character.conversation_summary_file, 'r', encoding='utf-8') as f:
-                    previous_conversation_summaries = f.read()
-                    character.conversation_summary = previous_conversation_summaries
-                    if len(npcs_in_conversation) == 1 and len(previous_conversation_summaries) > 0:
-                        result = f"Below is a summary for each of your previous conversations:\n\n{previous_conversation_summaries}"
-                    elif len(npcs_in_conversation) > 1 and len(previous_conversation_summaries) > 0:
-                        result += f"{character.name}: {previous_conversation_summaries}"
+            previous_conversation_summaries = character.load_conversation_summary()
+            if len(npcs_in_conversation) == 1 and len(previous_conversation_summaries) > 0:
+                result = f"Below is a summary for each of your previous conversations:\n\n{previous_conversation_summaries}"
+            elif len(npcs_in_conversation) > 1 and len(previous_conversation_summaries) > 0:
+                result += f"{character.name}: {previous_conversation_summaries}"
         return result
 
     def save_conversation_state(self, messages: message_thread, npcs_in_conversation: Characters, is_reload=False):
@@ -64,6 +62,7 @@ class summaries(remembering):
                     language=self.__language_name,
                     game=self.__game
                 )
+        retry_backoff = utils.Backoff(initial=1, maximum=30)
         while True:
             try:
                 if len(messages) > 5:
@@ -72,8 +71,9 @@ class summaries(remembering):
                     logging.info(f"Conversation summary not saved. Not enough dialogue spoken.")
                 break
             except:
-                logging.error('Failed to summarize conversation. Retrying...')
-                time.sleep(5)
+                delay = retry_backoff.next_delay()
+                logging.error(f'Failed to summarize conversation. Retrying in {delay} seconds...')
+                time.sleep(delay)
                 continue
         return ""
 
@@ -92,6 +92,7 @@ class summaries(remembering):
             conversation_summaries = previous_conversation_summaries + new_summary
             with open(npc.conversation_summary_file, 'w', encoding='utf-8') as f:
                 f.write(conversation_summaries)
+            npc.set_conversation_summary(conversation_summaries)
         else:
             conversation_summaries = previous_conversation_summaries
             
@@ -102,6 +103,7 @@ class summaries(remembering):
         # if summaries token limit is reached, summarize the summaries
         if count_tokens_summaries > summary_limit:
             logging.info(f'Token limit of conversation summaries reached ({count_tokens_summaries} / {summary_limit} tokens). Creating new summary file...')
+            retry_backoff = utils.Backoff(initial=1, maximum=30)
             while True:
                 try:
                     prompt = self.__resummarize_prompt.format(
@@ -112,8 +114,9 @@ class summaries(remembering):
                     long_conversation_summary = self.summarize_conversation(conversation_summaries, prompt, npc.name)
                     break
                 except:
-                    logging.error('Failed to summarize conversation. Retrying...')
-                    time.sleep(5)
+                    delay = retry_backoff.next_delay()
+                    logging.error(f'Failed to summarize conversation. Retrying in {delay} seconds...')
+                    time.sleep(delay)
                     continue
 
             # Split the file path and increment the number by 1
@@ -126,7 +129,7 @@ class summaries(remembering):
             with open(new_conversation_summary_file, 'w', encoding='utf-8') as f:
                 f.write(long_conversation_summary)
             
-            npc.conversation_summary_file = npc.get_latest_conversation_summary_file_path()
+            npc.set_conversation_summary(long_conversation_summary, new_conversation_summary_file)
 
     def summarize_conversation(self, text_to_summarize: str, prompt: str, npc_name: str) -> str:
         summary = ''
@@ -1,15 +1,16 @@
 import logging
-from typing import Hashable
 import src.color_formatter as cf
 import src.utils as utils
-import pandas as pd
+import src.data_cache as data_cache
+from src.character_store import CharacterStore
+from src.data_table import DataTable, read_csv
 import sys
 import os
 
 import src.config_loader as config_loader
-from src.llm.openai_client import openai_client
 
-def initialise(config_file, logging_file, secret_key_file, character_df_files, language_file, FO4_XVASynth_file) -> tuple[config_loader.ConfigLoader, pd.DataFrame, dict[Hashable, str], openai_client]:
+def initialise(config_file, logging_file) -> config_loader.ConfigLoader:
+    """Sets up the working directory and logging, and loads the config. Everything else is loaded by the functions below, which can run in parallel"""
     
     def set_cwd_to_exe_dir():
         if getattr(sys, 'frozen', False): # if exe and not Python script
@@ -63,53 +64,75 @@ def initialise(config_file, logging_file, secret_key_file, character_df_files, l
         #logging.log(28, "Large Language Model related")
         #logging.log(29, "Text-To-Speech related")
 
-    def get_character_df(file_name) -> pd.DataFrame:
-        encoding = utils.get_file_encoding(file_name)
-        character_df = pd.read_csv(file_name, engine='python', encoding=encoding)
-        character_df = character_df.loc[character_df['voice_model'].notna()]
-
-        return character_df
-    
-    def get_voice_folders_and_models(file_name):
-        encoding = utils.get_file_encoding(file_name)
-        FO4_Voice_folder_and_models_df = pd.read_csv(file_name, engine='python', encoding=encoding)
-
-        return FO4_Voice_folder_and_models_df
-    
-    def get_language_info(file_name) -> dict[Hashable, str]:
-        language_df = pd.read_csv(file_name)
-        try:
-            language_info: dict[Hashable, str] = language_df.loc[language_df['alpha2']==config.language].to_dict('records')[0]
-            return language_info
-        except:
-            logging.error(f"Could not load language '{config.language}'. Please set a valid language in config.ini\n")
-            return {}
-
     set_cwd_to_exe_dir()
     setup_logging(logging_file)
     config = config_loader.ConfigLoader(config_file)
 
     # clean up old instances of exe runtime files
     utils.cleanup_mei(config.remove_mei_folders)
-    
-    # Determine which game we're running for and select the appropriate character file
 
+    return config
+
+
+def is_fallout4(config: config_loader.ConfigLoader) -> bool:
     formatted_game_name = config.game.lower().replace(' ', '').replace('_', '')
-    if formatted_game_name in ("fallout4", "fallout4vr"):
+    return formatted_game_name in ("fallout4", "fallout4vr")
+
+
+def load_character_store(config: config_loader.ConfigLoader, character_df_files) -> CharacterStore:
+    # Determine which game we're running for and select the appropriate character file
+    if is_fallout4(config):
         character_df_file = character_df_files[1] 
-        FO4_Voice_folder_and_models_df = get_voice_folders_and_models(FO4_XVASynth_file)
     else :
         character_df_file = character_df_files[0]  # if not Fallout assume Skyrim
-        FO4_Voice_folder_and_models_df=''
 
     try:
-        character_df = get_character_df(character_df_file)
+        return get_character_store(character_df_file)
     except:
+        # this runs on a Startup thread, so main.py asks the user to press Enter once Startup has reported the error
         logging.error(f'Unable to read / open {character_df_file}. If you have recently edited this file, please try reverting to a previous version. This error is normally due to using special characters, or saving the CSV in an incompatible format.')
-        input("Press Enter to exit.")
+        raise
 
-    language_info = get_language_info(language_file)
-    
-    client = openai_client(config, secret_key_file)
 
-    return config, character_df, language_info, client, FO4_Voice_folder_and_models_df
+def load_FO4_voice_folders_and_models(config: config_loader.ConfigLoader, FO4_XVASynth_file) -> DataTable | None:
+    if is_fallout4(config):
+        return get_voice_folders_and_models(FO4_XVASynth_file)
+    return None
+
+
+def load_language_info(config: config_loader.ConfigLoader, language_file) -> dict[str, str]:
+    return get_language_info(language_file, config.language)
+
+
+def read_character_store(file_name) -> CharacterStore:
+    encoding = utils.get_file_encoding(file_name)
+    columns, rows = read_csv(file_name, encoding)
+    rows = [row for row in rows if row.get('voice_model') is not None]
+    for row in rows:
+        row['advanced_voice_model'] = row.get('advanced_voice_model') or ''
+
+    return CharacterStore(columns, rows, CharacterStore.get_text_file(file_name))
+
+
+def read_voice_folders_and_models(file_name) -> DataTable:
+    encoding = utils.get_file_encoding(file_name)
+    columns, rows = read_csv(file_name, encoding)
+
+    return DataTable(columns, rows)
+
+
+def get_character_store(file_name) -> CharacterStore:
+    return data_cache.load_cached(file_name, read_character_store, is_valid=CharacterStore.open_text)
+
+
+def get_voice_folders_and_models(file_name) -> DataTable:
+    return data_cache.load_cached(file_name, read_voice_folders_and_models)
+
+
+def get_language_info(file_name, language) -> dict[str, str]:
+    _, languages = read_csv(file_name)
+    for language_info in languages:
+        if language_info['alpha2'] == language:
+            return language_info
+    logging.error(f"Could not load language '{language}'. Please set a valid language in config.ini\n")
+    return {}
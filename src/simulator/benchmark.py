@@ -0,0 +1,65 @@
+import argparse
+import logging
+import statistics
+from src.game_io.transport import FileTransport, SocketTransport
+from src.simulator.game_simulator import GameSimulator, SimulatedNpc, TurnMetrics
+from src.simulator.stub_servers import StubLLMServer, StubXVASynthServer
+
+
+def summarize(turns: list[TurnMetrics]) -> str:
+    def describe(name: str, values: list[float]) -> str:
+        if not values:
+            return f'{name}: n/a'
+        return f'{name}: median {statistics.median(values):.3f}s, min {min(values):.3f}s, max {max(values):.3f}s'
+
+    lines = [
+        describe('turn latency', [turn.turn_latency for turn in turns if turn.turn_latency is not None]),
+        describe('time to first audio', [turn.time_to_first_audio for turn in turns if turn.time_to_first_audio is not None]),
+        f'files changed per turn: {statistics.mean(turn.files_changed for turn in turns):.1f}',
+        f'lines spoken per turn: {statistics.mean(turn.lines_spoken for turn in turns):.1f}',
+    ]
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="""Plays the game's side of conversations against a running Mantella and reports turn latency,
+        time to first audio and file traffic. Start Mantella with microphone_enabled = 0, the game folder set to `game_folder`
+        (or ipc_transport = socket), llm_api set to the stub LLM's URL + /v1 and tts_service = xvasynth.""")
+    parser.add_argument('game_folder', nargs='?', help='Mantella\'s game folder (not needed with --socket)')
+    parser.add_argument('--socket', type=int, metavar='PORT', help='connect to Mantella\'s socket transport on this port instead of using the game folder')
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--conversations', type=int, default=1)
+    parser.add_argument('--npc', default='Lydia')
+    parser.add_argument('--npc-id', default='667')
+    parser.add_argument('--llm-port', type=int, default=8765)
+    parser.add_argument('--no-stubs', action='store_true', help='use the real LLM / TTS services Mantella is configured with')
+    parser.add_argument('--say-line-queue-depth', type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stubs = []
+    if not args.no_stubs:
+        stubs = [StubLLMServer(port=args.llm_port).start(), StubXVASynthServer().start()]
+
+    if args.socket:
+        transport = SocketTransport(port=args.socket, listen=False)
+    else:
+        transport = FileTransport(args.game_folder)
+    simulator = GameSimulator(transport, say_line_queue_depth=args.say_line_queue_depth).start()
+    npc = SimulatedNpc(args.npc, args.npc_id, race='NordRace', sex='Female', voice_model='FemaleEvenToned')
+    player_lines = [f'Tell me something about this place, number {i + 1}.' for i in range(args.turns)]
+    events = ['The player picked up an iron sword'] + [''] * (args.turns - 1)
+
+    turns: list[TurnMetrics] = []
+    try:
+        for _ in range(args.conversations):
+            turns += simulator.run_conversation(npc, player_lines, events)
+    finally:
+        simulator.stop()
+        transport.close()
+        for stub in stubs:
+            stub.stop()
+
+    for turn in turns:
+        print(turn)
+    print(summarize(turns))
@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+import time
+from src.game_io.stand_in_game import StandInGame
+from src.game_io.transport import GameTransport, FileTransport
+
+
+class SimulatedNpc:
+    """The data the Mantella spell / MCM writes about an NPC when it is selected"""
+    def __init__(self, name: str, ref_id: str, race: str = 'NordRace', sex: str = 'Male', voice_model: str = 'MaleNord', relationship: str = '0', is_enemy: bool = False) -> None:
+        self.name: str = name
+        self.ref_id: str = ref_id
+        self.race: str = race
+        self.sex: str = sex
+        self.voice_model: str = voice_model
+        self.relationship: str = relationship
+        self.is_enemy: bool = is_enemy
+
+
+class TurnMetrics:
+    """Timings of a single exchange, measured from the game's side"""
+    def __init__(self, player_line: str) -> None:
+        self.player_line: str = player_line
+        self.time_to_first_audio: float | None = None
+        self.turn_latency: float | None = None
+        self.lines_spoken: int = 0
+        self.files_changed: int = 0
+
+    def __repr__(self) -> str:
+        first_audio = 'n/a' if self.time_to_first_audio is None else f'{self.time_to_first_audio:.3f}s'
+        latency = 'n/a' if self.turn_latency is None else f'{self.turn_latency:.3f}s'
+        return f'TurnMetrics(first audio {first_audio}, turn {latency}, {self.lines_spoken} lines, {self.files_changed} files changed)'
+
+
+class GameSimulator:
+    """Plays the game's side of a whole conversation, so main.py can run without Skyrim / Fallout 4.
+    Requires microphone_enabled = 0, as the player's lines are typed in through _mantella_text_input.
+
+    NPCs are selected by writing their actor data, voicelines are acknowledged after roughly the time it would take to speak them,
+    and in-game events are appended like the game does.
+    """
+    def __init__(self, transport: GameTransport, seconds_per_word: float = 0.3, min_line_duration: float = 0.5, say_line_queue_depth: int = 0) -> None:
+        self.__transport: GameTransport = transport
+        self.__seconds_per_word: float = seconds_per_word
+        self.__min_line_duration: float = min_line_duration
+        self.__lock: threading.Lock = threading.Lock()
+        self.__lines_spoken: int = 0
+        self.__first_line_at: float | None = None
+        self.__actor_count: int = 0
+        self.__game: StandInGame = StandInGame(transport, line_duration=self.__estimate_line_duration, say_line_queue_depth=say_line_queue_depth, on_line=self.__on_line)
+
+    @property
+    def transport(self) -> GameTransport:
+        return self.__transport
+
+    def start(self) -> 'GameSimulator':
+        self.__game.start()
+        return self
+
+    def stop(self):
+        self.__game.stop()
+
+    def select_npc(self, npc: SimulatedNpc, location: str = 'Whiterun', in_game_time: str = '14', is_radiant: bool = False):
+        """Adds `npc` to the conversation, the way casting the Mantella spell on them does"""
+        self.__actor_count += 1
+        # _mantella_character_selection is lowered first and stays lowered until Mantella has read the actor,
+        # and the ID is written last, as Mantella starts loading the character as soon as it appears
+        self.__transport.write_many({
+            '_mantella_character_selection': 'False',
+            '_mantella_current_actor': npc.name,
+            '_mantella_actor_race': f'<{npc.race}',
+            '_mantella_actor_sex': npc.sex,
+            '_mantella_actor_voice': f'<{npc.voice_model}',
+            '_mantella_actor_relationship': npc.relationship,
+            '_mantella_actor_is_enemy': str(npc.is_enemy),
+            '_mantella_actor_is_in_combat': str(npc.is_enemy),
+            '_mantella_current_location': location,
+            '_mantella_in_game_time': in_game_time,
+            '_mantella_radiant_dialogue': str(is_radiant),
+            '_mantella_end_conversation': 'False',
+        })
+        self.__transport.write_many({
+            '_mantella_current_actor_id': npc.ref_id,
+            '_mantella_actor_count': str(self.__actor_count),
+        })
+
+    def inject_event(self, event: str):
+        """Appends an in-game event, e.g. 'The player picked up a bottle of mead'"""
+        self.__transport.write('_mantella_in_game_events', self.__transport.read_all('_mantella_in_game_events') + event + '\n')
+
+    def wait_for_player_turn(self, timeout: float | None = 60):
+        """Waits until Mantella asks for the player's input"""
+        self.__transport.wait_for('_mantella_text_input_enabled', lambda text: text.lower() == 'true', timeout)
+
+    def say(self, player_line: str, timeout: float | None = 120, folder_to_scan: str | None = None) -> TurnMetrics:
+        """Types `player_line` in once it is the player's turn and waits until it is the player's turn again
+
+        Args:
+            player_line (str): what the player says
+            timeout (float | None, optional): seconds to wait for each step at most. Defaults to 120.
+            folder_to_scan (str | None, optional): counts the files in this folder that changed during the turn. Defaults to the game folder of a FileTransport.
+        """
+        metrics = TurnMetrics(player_line)
+        self.wait_for_player_turn(timeout)
+        if folder_to_scan is None and isinstance(self.__transport, FileTransport):
+            folder_to_scan = self.__transport.directory
+        before = self.__snapshot(folder_to_scan)
+        with self.__lock:
+            self.__lines_spoken = 0
+            self.__first_line_at = None
+
+        start = time.perf_counter()
+        self.__transport.write('_mantella_text_input', player_line)
+        # Mantella clears the input and disables it while the NPC answers
+        self.__transport.wait_for('_mantella_text_input_enabled', lambda text: text.lower() != 'true', timeout)
+        try:
+            self.wait_for_player_turn(timeout)
+            metrics.turn_latency = time.perf_counter() - start
+        except TimeoutError:
+            logging.warning(f'Mantella did not answer "{player_line}" within {timeout} seconds')
+
+        with self.__lock:
+            metrics.lines_spoken = self.__lines_spoken
+            if self.__first_line_at is not None:
+                metrics.time_to_first_audio = self.__first_line_at - start
+        after = self.__snapshot(folder_to_scan)
+        metrics.files_changed = sum(1 for file_name, signature in after.items() if before.get(file_name) != signature)
+        return metrics
+
+    def end_conversation(self):
+        self.__actor_count = 0
+        self.__transport.write('_mantella_end_conversation', 'True')
+
+    def run_conversation(self, npc: SimulatedNpc, player_lines: list[str], events: list[str] | None = None, timeout: float | None = 120) -> list[TurnMetrics]:
+        """Selects `npc`, has the player say each of `player_lines` (injecting the matching entry of `events` before it) and ends the conversation"""
+        self.select_npc(npc)
+        turns = []
+        for i, player_line in enumerate(player_lines):
+            if events and i < len(events) and events[i]:
+                self.inject_event(events[i])
+            turns.append(self.say(player_line, timeout))
+        self.end_conversation()
+        return turns
+
+    def __estimate_line_duration(self, subtitle: str) -> float:
+        return max(self.__min_line_duration, len(subtitle.split()) * self.__seconds_per_word)
+
+    def __on_line(self, key: str, subtitle: str):
+        with self.__lock:
+            self.__lines_spoken += 1
+            if self.__first_line_at is None:
+                self.__first_line_at = time.perf_counter()
+
+    @staticmethod
+    def __snapshot(folder: str | None) -> dict[str, tuple[int, int]]:
+        if not folder:
+            return {}
+        snapshot = {}
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith('_mantella_') and entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
@@ -0,0 +1,51 @@
+import argparse
+import logging
+import time
+from src.game_io.recording import load_recording
+from src.game_io.transport import GameTransport, FileTransport
+
+
+def replay(recording: list[dict], transport: GameTransport, speed: float = 1.0, timeout: float = 30) -> list[float]:
+    """Plays the game's side of a recorded session against a running Mantella.
+
+    Every game value is sent once Mantella has written what it wrote before that value in the recording (with the same delay
+    as in the recording, divided by `speed`), so the replay follows Mantella's pace instead of the recorded wall clock.
+
+    Returns:
+        list[float]: for every Mantella value in the recording, how much later (in seconds) it arrived after the previous value than in the recording
+    """
+    last_time = 0.0
+    previous_done = time.monotonic()
+    lags = []
+    for entry in recording:
+        key, value = entry['key'], entry['value']
+        gap = (entry['t'] - last_time) / speed
+        if entry['source'] == 'mantella':
+            try:
+                transport.wait_for(key, lambda text, expected=value.split('\n', 1)[0].strip(): text == expected, timeout)
+            except TimeoutError:
+                logging.warning(f'Mantella did not set {key} to "{value}" within {timeout} seconds, carrying on')
+            lags.append(time.monotonic() - previous_done - gap)
+        else:
+            time.sleep(max(0, previous_done + gap - time.monotonic()))
+            if entry.get('append'):
+                transport.write(key, transport.read_all(key) + value)
+            else:
+                transport.write(key, value)
+        last_time = entry['t']
+        previous_done = time.monotonic()
+    return lags
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replays the game side of a session recorded with ipc_record_file into a game folder')
+    parser.add_argument('recording')
+    parser.add_argument('game_folder')
+    parser.add_argument('--speed', type=float, default=1.0)
+    args = parser.parse_args()
+
+    transport = FileTransport(args.game_folder)
+    lags = replay(load_recording(args.recording), transport, args.speed)
+    if lags:
+        print(f'{len(lags)} values from Mantella, on average {sum(lags) / len(lags) * 1000:.1f} ms later than recorded (max {max(lags) * 1000:.1f} ms)')
+    transport.close()
@@ -0,0 +1,144 @@
+import json
+import logging
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubServer:
+    """Runs a ThreadingHTTPServer with the given handler on a background thread"""
+    def __init__(self, handler: type[BaseHTTPRequestHandler], host: str, port: int) -> None:
+        self.__server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), handler)
+        self.__server.stub = self
+        self.__thread: threading.Thread = threading.Thread(target=self.__server.serve_forever, name=type(self).__name__, daemon=True)
+        self.requests: int = 0
+
+    @property
+    def url(self) -> str:
+        host, port = self.__server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.__thread.start()
+        logging.info(f'{type(self).__name__} listening on {self.url}')
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        logging.debug(f'{type(self.server.stub).__name__}: {format % args}')
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        self.server.stub.requests += 1
+        return json.loads(body) if body else {}
+
+    def _send_json(self, data: dict, status: int = 200):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubLLMServer(_StubServer):
+    """OpenAI compatible chat completions endpoint that streams a fixed reply word by word.
+    Point `llm_api` in config.ini to `{url}/v1` to use it.
+    """
+    def __init__(self, reply: str = 'Well met, traveler. The roads are dangerous these days. Stay close to the guards.', first_token_delay: float = 0.3, token_delay: float = 0.02, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.reply: str = reply
+        self.first_token_delay: float = first_token_delay
+        self.token_delay: float = token_delay
+        super().__init__(_StubLLMHandler, host, port)
+
+
+class _StubLLMHandler(_StubHandler):
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json({'object': 'list', 'data': [{'id': 'stub', 'object': 'model', 'owned_by': 'stub'}]})
+        else:
+            self._send_json({'error': 'not found'}, 404)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json({'error': 'not found'}, 404)
+            return
+        request = self._read_json()
+        stub: StubLLMServer = self.server.stub
+        time.sleep(stub.first_token_delay)
+        model = request.get('model', 'stub')
+
+        if not request.get('stream'):
+            self._send_json({
+                'id': 'stub', 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': stub.reply}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        words = stub.reply.split(' ')
+        for i, word in enumerate(words):
+            content = word if i == 0 else ' ' + word
+            self.__send_chunk(model, {'content': content}, None)
+            time.sleep(stub.token_delay)
+        self.__send_chunk(model, {}, 'stop')
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def __send_chunk(self, model: str, delta: dict, finish_reason: str | None):
+        chunk = {'id': 'stub', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': model,
+                 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}]}
+        self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+        self.wfile.flush()
+
+
+class StubXVASynthServer(_StubServer):
+    """Stands in for the xVASynth server on port 8008: answers the model / vocoder calls and writes a silent .wav
+    to the requested `outfile`, lasting roughly as long as the line would take to say
+    """
+    def __init__(self, synthesis_delay: float = 0.1, seconds_per_word: float = 0.3, sample_rate: int = 22050, host: str = '127.0.0.1', port: int = 8008) -> None:
+        self.synthesis_delay: float = synthesis_delay
+        self.seconds_per_word: float = seconds_per_word
+        self.sample_rate: int = sample_rate
+        super().__init__(_StubXVASynthHandler, host, port)
+
+    def write_silence(self, file_path: str, text: str):
+        duration = max(0.2, len(text.split()) * self.seconds_per_word)
+        with wave.open(file_path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b'\0\0' * int(duration * self.sample_rate))
+
+
+class _StubXVASynthHandler(_StubHandler):
+    # every reply has a Content-Length, so connections can be kept alive between requests
+    protocol_version = 'HTTP/1.1'
+    # headers and body are sent separately, which Nagle's algorithm would hold back on a kept-alive connection until the client ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._send_json({})
+
+    def do_POST(self):
+        request = self._read_json()
+        stub: StubXVASynthServer = self.server.stub
+        if self.path == '/synthesize':
+            time.sleep(stub.synthesis_delay)
+            stub.write_silence(request['outfile'], request.get('sequence', ''))
+        elif self.path == '/synthesize_batch':
+            for line in request.get('linesBatch', []):
+                time.sleep(stub.synthesis_delay)
+                stub.write_silence(line[4], line[0])
+        self._send_json({})
@@ -0,0 +1,49 @@
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+import requests
+from src.simulator.stub_servers import StubXVASynthServer
+from src.tts_transport import TTSTransport
+
+
+def run(send, url: str, output_folder: str, lines: int) -> list[float]:
+    """Sends `lines` synthesis requests one after another, like the voicelines of a conversation, and returns their latencies"""
+    latencies = []
+    for i in range(lines):
+        data = {'sequence': 'Well met, traveler.', 'outfile': os.path.join(output_folder, f'{i}.wav'), 'pluginsContext': '{}'}
+        start = time.perf_counter()
+        send(url, json=data)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def describe(name: str, latencies: list[float]) -> str:
+    return f'{name}: median {statistics.median(latencies) * 1000:.2f}ms, mean {statistics.mean(latencies) * 1000:.2f}ms, max {max(latencies) * 1000:.2f}ms'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="""Compares the per request overhead of one-off requests.post calls with TTSTransport's
+        keep-alive connections, against a stub xVASynth server that answers immediately.""")
+    parser.add_argument('--lines', type=int, default=500)
+    parser.add_argument('--port', type=int, default=0, help='port of the stub xVASynth server (default: any free port)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stub = StubXVASynthServer(synthesis_delay=0, seconds_per_word=0.01, port=args.port).start()
+    transport = TTSTransport('xVASynth')
+    try:
+        with tempfile.TemporaryDirectory() as output_folder:
+            url = f'{stub.url}/synthesize'
+            one_off = run(requests.post, url, output_folder, args.lines)
+            pooled = run(transport.post, url, output_folder, args.lines)
+    finally:
+        transport.close()
+        stub.stop()
+
+    print(describe('requests.post', one_off))
+    print(describe('TTSTransport', pooled))
+    for endpoint, metrics in transport.metrics.items():
+        print(f'{endpoint}: {metrics}')
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+
+class Startup:
+    """Starts Mantella's components on a thread pool, each one as soon as the components it depends on are ready.
+
+    Components are added with the names of the components they need, whose results are passed to them in that order, eg:
+        startup.add('synthesizer', tts.Synthesizer, 'config', 'character_store')
+    Once every component has started (or one has failed), a timeline of when each one started and finished is logged.
+    """
+    def __init__(self, max_workers: int = 8) -> None:
+        self.__max_workers: int = max_workers
+        self.__components: dict[str, tuple[Callable[..., Any], tuple[str, ...]]] = {}
+        self.__results: dict[str, Any] = {}
+        # component -> (start, end) in seconds since run() was called
+        self.__timeline: dict[str, tuple[float, float]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def add(self, name: str, start: Callable[..., Any], *dependencies: str) -> 'Startup':
+        if name in self.__components:
+            raise ValueError(f'Component {name} was added twice')
+        self.__components[name] = (start, dependencies)
+        return self
+
+    def run(self) -> dict[str, Any]:
+        """Starts every component
+
+        Returns:
+            dict[str, Any]: the result of each component by name
+
+        Raises:
+            the error of the first component that failed, once the components that were already running have finished
+        """
+        self.__check_dependencies()
+        started_at = time.perf_counter()
+        pending = dict(self.__components)
+        running: dict[Future, str] = {}
+        failure: tuple[str, BaseException] | None = None
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers, thread_name_prefix='Startup') as executor:
+            while pending or running:
+                if failure is None:
+                    for name, (start, dependencies) in list(pending.items()):
+                        if all(dependency in self.__results for dependency in dependencies):
+                            del pending[name]
+                            arguments = [self.__results[dependency] for dependency in dependencies]
+                            running[executor.submit(self.__start, name, start, arguments, started_at)] = name
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.__results[name] = future.result()
+                    except BaseException as e:
+                        if failure is None:
+                            failure = (name, e)
+
+        total_time = time.perf_counter() - started_at
+        self.__log_timeline(total_time)
+        if failure is not None:
+            logging.error(f'Failed to start {failure[0]}')
+            raise failure[1]
+        logging.info(f'Mantella ready in {round(total_time, 2)} seconds')
+        return dict(self.__results)
+
+    def __start(self, name: str, start: Callable[..., Any], arguments: list, started_at: float) -> Any:
+        start_time = time.perf_counter() - started_at
+        try:
+            return start(*arguments)
+        finally:
+            with self.__lock:
+                self.__timeline[name] = (start_time, time.perf_counter() - started_at)
+
+    def __check_dependencies(self):
+        for name, (_, dependencies) in self.__components.items():
+            for dependency in dependencies:
+                if dependency not in self.__components:
+                    raise ValueError(f'Component {name} depends on {dependency}, which was not added')
+
+        # a component can only start once everything it depends on has, so a cycle would never start
+        remaining = dict(self.__components)
+        while remaining:
+            ready = [name for name, (_, dependencies) in remaining.items() if all(dependency not in remaining for dependency in dependencies)]
+            if not ready:
+                raise ValueError(f'Components {", ".join(remaining)} depend on each other')
+            for name in ready:
+                del remaining[name]
+
+    def __log_timeline(self, total_time: float):
+        lines = [f'Startup took {round(total_time, 2)} seconds:']
+        for name, (start_time, end_time) in sorted(self.__timeline.items(), key=lambda item: item[1][0]):
+            lines.append(f'  {name}: {round(start_time, 2)}s -> {round(end_time, 2)}s ({round(end_time - start_time, 2)}s)')
+        not_started = [name for name in self.__components if name not in self.__timeline]
+        if not_started:
+            lines.append(f'  not started: {", ".join(not_started)}')
+        logging.debug('\n'.join(lines))
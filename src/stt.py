@@ -5,7 +5,6 @@ import src.utils as utils
 import requests
 import json
 import io
-import time
 
 class Transcriber:
     def __init__(self, game_state_manager, config, api_key: str):
@@ -150,15 +149,12 @@ class Transcriber:
         else:
             self.game_state_manager.write_game_info('_mantella_text_input', '')
             self.game_state_manager.write_game_info('_mantella_text_input_enabled', 'True')
-            text = ''
-            while text == '':
-                with open(f'{self.game_path}/_mantella_end_conversation.txt', 'r', encoding='utf-8') as f:
-                    if f.readline().strip().lower() == 'true':
-                        return self.end_conversation_keyword
-                with open(f'{self.game_path}/_mantella_text_input.txt', 'r', encoding='utf-8') as f:
-                    text = f.readline().strip()
-                # decrease stress on CPU while waiting for file to populate
-                time.sleep(0.01)
+            text_file_name, text = self.game_state_manager.wait_for_any({
+                '_mantella_end_conversation': lambda text: text.lower() == 'true',
+                '_mantella_text_input': lambda text: text != '',
+            })
+            if text_file_name == '_mantella_end_conversation':
+                return self.end_conversation_keyword
             self.game_state_manager.write_game_info('_mantella_text_input', '')
             self.game_state_manager.write_game_info('_mantella_text_input_enabled', 'False')
 
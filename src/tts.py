@@ -1,7 +1,7 @@
 import requests
 from requests.exceptions import ConnectionError
 import time
-import winsound
+import threading
 import logging
 import src.utils as utils
 import os
@@ -10,11 +10,20 @@ import numpy as np
 import re
 import sys
 from pathlib import Path
+from urllib.parse import urlsplit
 import json
-from subprocess import Popen, PIPE, STDOUT, DEVNULL, STARTUPINFO,STARTF_USESHOWWINDOW
+from subprocess import Popen, PIPE, STDOUT, DEVNULL
 import io
 import subprocess
 import csv
+from src.character_store import CharacterStore
+from src.tts_transport import TTSTransport
+from src.voiceline_cache import VoicelineCache
+from src.voice_catalog import VoiceCatalog
+# only needed for playing debug audio and hiding FaceFX's console window on Windows
+if sys.platform == 'win32':
+    import winsound
+    from subprocess import STARTUPINFO, STARTF_USESHOWWINDOW
 
 class TTSServiceFailure(Exception):
     pass
@@ -23,7 +32,11 @@ class VoiceModelNotFound(Exception):
     pass
 
 class Synthesizer:
-    def __init__(self, config, character_df):
+    PRESYNTHESIS_IDLE_DELAY = 1.0
+    PRESYNTHESIS_POLL_INTERVAL = 0.2
+    MAX_PRESYNTHESIS_JOBS = 64
+
+    def __init__(self, config, character_store: CharacterStore):
         self.loglevel = 29
         self.xvasynth_path = config.xvasynth_path
         self.facefx_path = config.facefx_path
@@ -44,6 +57,7 @@ class Synthesizer:
         self.xtts_accent = config.xtts_accent
         self.official_model_list = ["main","v2.0.3","v2.0.2","v2.0.1","v2.0.0"]
 
+        self.xvasynth_health_url = 'http://127.0.0.1:8008/'
         self.synthesize_url = 'http://127.0.0.1:8008/synthesize'
         self.synthesize_batch_url = 'http://127.0.0.1:8008/synthesize_batch'
         self.loadmodel_url = 'http://127.0.0.1:8008/loadModel'
@@ -54,12 +68,23 @@ class Synthesizer:
         self.xtts_set_tts_settings = f'{self.xtts_url}/set_tts_settings'
         self.xtts_get_models_list = f'{self.xtts_url}/get_models_list'
         self.xtts_get_speakers_list = f'{self.xtts_url}/speakers_list'
-        
-        character_df['advanced_voice_model'] = character_df['advanced_voice_model'].fillna('').apply(str)
-        character_df['voice_model'] = character_df['voice_model'].fillna('').apply(str)
 
-        self.advanced_voice_model_data = list(set(character_df['advanced_voice_model'].tolist()))
-        self.voice_model_data = list(set(character_df['voice_model'].tolist()))
+        # keep-alive connections to the TTS service, with timeouts so that a hung server cannot block the conversation forever
+        connect_timeout = TTSTransport.CONNECT_TIMEOUT
+        self.http = TTSTransport(self.tts_service, {
+            urlsplit(self.xvasynth_health_url).path: (connect_timeout, 2),
+            urlsplit(self.synthesize_url).path: (connect_timeout, 60),
+            urlsplit(self.synthesize_batch_url).path: (connect_timeout, 300),
+            urlsplit(self.loadmodel_url).path: (connect_timeout, 120),
+            urlsplit(self.xtts_synthesize_url).path: (connect_timeout, 120),
+            urlsplit(self.xtts_switch_model).path: (connect_timeout, 300),
+            urlsplit(self.xtts_set_tts_settings).path: (connect_timeout, 10),
+            urlsplit(self.xtts_get_models_list).path: (connect_timeout, 10),
+            urlsplit(self.xtts_get_speakers_list).path: (connect_timeout, 10),
+        })
+        
+        self.advanced_voice_model_data = list(set(character_store.column('advanced_voice_model')))
+        self.voice_model_data = list(set(character_store.column('voice_model')))
         
         # voice models path (renaming Fallout4VR to Fallout4 to allow for filepath completion)
         if config.game == "Fallout4" or config.game == "Fallout4VR":
@@ -67,6 +92,15 @@ class Synthesizer:
         #(renaming SkyrimVR to Skyrim to allow for filepath completion)
         else: 
             self.game = "Skyrim"
+
+        self.model_path = f"{self.xvasynth_path}/resources/app/models/{self.game}/"
+        # output wav / lip files path
+        self.output_path = utils.resolve_path()+'/data'
+        # the metadata of xVASynth's voice models, read in the background while xVASynth starts
+        self.voice_catalog = VoiceCatalog(self.model_path, f"{self.output_path}/voice_models/{self.game}.cache")
+        if self.tts_service != 'xtts':
+            self.voice_catalog.start()
+
         # check if xvasynth is running; otherwise try to run it
         if self.tts_service == 'xtts':
             logging.log(self.loglevel, f'Connecting to XTTS...')
@@ -83,10 +117,7 @@ class Synthesizer:
             if not self.facefx_path :
                 self.facefx_path = self.xvasynth_path + "/resources/app/plugins/lip_fuz"
 
-
-        self.model_path = f"{self.xvasynth_path}/resources/app/models/{self.game}/"
-        # output wav / lip files path
-        self.output_path = utils.resolve_path()+'/data'
+        self.voiceline_cache = VoicelineCache(f"{self.output_path}/voicelines/cache", config.voiceline_cache_size * 1_000_000)
 
         self.language = config.language
 
@@ -100,14 +131,25 @@ class Synthesizer:
 
         # last active voice model
         self.last_voice = ''
+        # voice model xVASynth has confirmed loading, unlike last_voice which is only the last one requested
+        self.loaded_voice = ''
 
         self.model_type = ''
         self.base_speaker_emb = ''
+
+        # synthesis is not thread safe (the loaded voice model, the files in data/voicelines), so it runs one line at a time
+        self.__synthesis_lock: threading.Lock = threading.Lock()
+        self.__foreground_lock: threading.Lock = threading.Lock()
+        self.__foreground_waiting: int = 0
+        self.__idle_since: float = time.monotonic()
+        self.__presynthesis_jobs: list[tuple] = []
+        self.__presynthesis_condition: threading.Condition = threading.Condition()
+        self.__presynthesis_thread: threading.Thread | None = None
        
 
     def _get_available_models(self):
         # Code to request and return the list of available models
-        response = requests.get(self.xtts_get_models_list)
+        response = self.http.get(self.xtts_get_models_list)
         if response.status_code == 200:
             # Convert each element in the response to lowercase and remove spaces
             return [model.lower().replace(' ', '') for model in response.json()]
@@ -116,7 +158,7 @@ class Synthesizer:
             
     def _get_available_speakers(self):
         # Code to request and return the list of available models
-        response = requests.get(self.xtts_get_speakers_list)
+        response = self.http.get(self.xtts_get_speakers_list)
         return response.json() if response.status_code == 200 else []
     
     def get_first_available_official_model(self):
@@ -148,22 +190,101 @@ class Synthesizer:
         # Write the 16-bit audio data back to a file
         sf.write(output_file, data_16bit, samplerate, subtype='PCM_16')
 
-    def synthesize(self, voice, voiceline, in_game_voice, voice_accent, aggro=0, advanced_voice_model=None):
-        if self.tts_service == 'xtts':
-            selected_voice = None
-            speaker_type = None
-    
-            # Determine the most suitable voice model to use
-            if advanced_voice_model and self._voice_exists(advanced_voice_model, 'advanced'):
-                selected_voice = advanced_voice_model
-                speaker_type = 'advanced_voice_model'
-            elif voice and self._voice_exists(voice, 'regular'):
-                selected_voice = voice
-                speaker_type = 'voice_model'
-            elif in_game_voice and self._voice_exists(in_game_voice, 'regular'):
-                selected_voice = in_game_voice
-                speaker_type = 'game_voice_folder'
-            voice = selected_voice
+    def synthesize(self, voice, voiceline, in_game_voice, voice_accent, aggro=0, advanced_voice_model=None, output_name='out'):
+        """Synthesizes a voiceline (and its lip file) to data/voicelines/{output_name}.wav and returns the path of the .wav"""
+        with self.__foreground_lock:
+            self.__foreground_waiting += 1
+        try:
+            with self.__synthesis_lock:
+                try:
+                    return self._synthesize_voiceline(voice, voiceline, in_game_voice, voice_accent, aggro, advanced_voice_model, final_voiceline_file_name=output_name)
+                finally:
+                    self.__idle_since = time.monotonic()
+        finally:
+            with self.__foreground_lock:
+                self.__foreground_waiting -= 1
+
+    def queue_presynthesis(self, voice, voiceline, in_game_voice, voice_accent, aggro=0, advanced_voice_model=None):
+        """Synthesizes a line into the voiceline cache from a background thread, so that `synthesize` can later reuse it
+
+        This is low priority work: a line is only synthesized once the synthesizer has been idle for PRESYNTHESIS_IDLE_DELAY seconds,
+        and only in the voice model that is already loaded, so it never makes the TTS service switch voice models.
+        Lines in other voices wait until their voice model is loaded for the conversation.
+        """
+        if not self.voiceline_cache.is_enabled:
+            return
+        job = (voice, voiceline, in_game_voice, voice_accent, aggro, advanced_voice_model)
+        with self.__presynthesis_condition:
+            if job in self.__presynthesis_jobs:
+                return
+            self.__presynthesis_jobs.append(job)
+            if len(self.__presynthesis_jobs) > self.MAX_PRESYNTHESIS_JOBS:
+                # lines for NPCs who left before their voice model was ever loaded
+                self.__presynthesis_jobs.pop(0)
+            if self.__presynthesis_thread is None:
+                self.__presynthesis_thread = threading.Thread(target=self.__presynthesize, name='Presynthesis', daemon=True)
+                self.__presynthesis_thread.start()
+            self.__presynthesis_condition.notify()
+
+    def __presynthesize(self):
+        while True:
+            with self.__presynthesis_condition:
+                while not self.__presynthesis_jobs:
+                    self.__presynthesis_condition.wait()
+            time.sleep(self.PRESYNTHESIS_POLL_INTERVAL)
+            if self.__foreground_waiting or time.monotonic() - self.__idle_since < self.PRESYNTHESIS_IDLE_DELAY:
+                continue
+            if not self.__synthesis_lock.acquire(blocking=False):
+                continue
+            try:
+                with self.__presynthesis_condition:
+                    job = next((job for job in self.__presynthesis_jobs if self._select_voice(job[0], job[2], job[5])[0] == self.last_voice), None)
+                    if job is not None:
+                        self.__presynthesis_jobs.remove(job)
+                if job is not None:
+                    voice, voiceline, in_game_voice, voice_accent, aggro, advanced_voice_model = job
+                    self._synthesize_voiceline(voice, voiceline, in_game_voice, voice_accent, aggro, advanced_voice_model, final_voiceline_file_name='presynthesized', is_presynthesis=True)
+            except Exception as e:
+                logging.debug(f'Failed to synthesize voiceline ahead of time: {e}')
+            finally:
+                self.__synthesis_lock.release()
+
+    def _select_voice(self, voice, in_game_voice, advanced_voice_model=None):
+        """The voice to synthesize with, and (for XTTS) which of the NPC's voices it is"""
+        if self.tts_service != 'xtts':
+            return voice, None
+        # Determine the most suitable voice model to use
+        if advanced_voice_model and self._voice_exists(advanced_voice_model, 'advanced'):
+            return advanced_voice_model, 'advanced_voice_model'
+        elif voice and self._voice_exists(voice, 'regular'):
+            return voice, 'voice_model'
+        elif in_game_voice and self._voice_exists(in_game_voice, 'regular'):
+            return in_game_voice, 'game_voice_folder'
+        return None, None
+
+    def _synthesize_voiceline(self, voice, voiceline, in_game_voice, voice_accent, aggro=0, advanced_voice_model=None, final_voiceline_file_name='out', is_presynthesis=False):
+        voice, speaker_type = self._select_voice(voice, in_game_voice, advanced_voice_model)
+
+        # "out" is the file name used by XTTS
+        final_voiceline_folder = f"{self.output_path}/voicelines"
+        final_voiceline_file =  f"{final_voiceline_folder}/{final_voiceline_file_name}.wav"
+
+        try:
+            if os.path.exists(final_voiceline_file):
+                os.remove(final_voiceline_file)
+            if os.path.exists(final_voiceline_file.replace(".wav", ".lip")):
+                os.remove(final_voiceline_file.replace(".wav", ".lip"))
+        except:
+            logging.warning("Failed to remove spoken voicelines")
+
+        # lines spoken before in the same voice (eg goodbyes) are reused without loading the voice model or calling the TTS service
+        cache_key = self.get_voiceline_cache_key(voice, voiceline, voice_accent, aggro)
+        if is_presynthesis and cache_key in self.voiceline_cache:
+            return None
+        if self.voiceline_cache.is_enabled and self.voiceline_cache.get(cache_key, final_voiceline_file):
+            logging.log(22, f'Reusing synthesized voiceline: {voiceline.strip()}')
+            self._play_in_debug_mode(final_voiceline_file)
+            return final_voiceline_file
                 
         if voice != self.last_voice:
             self.change_voice(voice, voice_accent)
@@ -179,18 +300,6 @@ class Synthesizer:
             for phrase in phrases:
                 voiceline_file = f"{self.output_path}/voicelines/{utils.clean_text(phrase)[:150]}.wav"
                 voiceline_files.append(voiceline_file)
-
-        final_voiceline_file_name = 'out' # "out" is the file name used by XTTS
-        final_voiceline_folder = f"{self.output_path}/voicelines"
-        final_voiceline_file =  f"{final_voiceline_folder}/{final_voiceline_file_name}.wav"
-
-        try:
-            if os.path.exists(final_voiceline_file):
-                os.remove(final_voiceline_file)
-            if os.path.exists(final_voiceline_file.replace(".wav", ".lip")):
-                os.remove(final_voiceline_file.replace(".wav", ".lip"))
-        except:
-            logging.warning("Failed to remove spoken voicelines")
     
         # Synthesize voicelines
         if self.tts_service == 'xtts':
@@ -206,6 +315,12 @@ class Synthesizer:
                     for i, voiceline_file in enumerate(voiceline_files):
                         self._synthesize_line(phrases[i], voiceline_files[i])
                 self.merge_audio_files(voiceline_files, final_voiceline_file)
+                for voiceline_file in voiceline_files:
+                    # the phrases are only needed to build the merged voiceline
+                    try:
+                        os.remove(voiceline_file)
+                    except OSError:
+                        pass
         if not os.path.exists(final_voiceline_file):
             logging.error(f'xVASynth failed to generate voiceline at: {Path(final_voiceline_file)}')
             raise FileNotFoundError()
@@ -247,11 +362,48 @@ class Synthesizer:
         except Exception as e:
             logging.warning(e)
 
-        # if Debug Mode is on, play the audio file
-        if (self.debug_mode == '1') & (self.play_audio_from_script == '1'):
-            winsound.PlaySound(final_voiceline_file, winsound.SND_FILENAME)
+        # only complete voicelines in the requested voice are kept: XTTS takes the voice with every request,
+        # but xVASynth speaks in whichever model is loaded, which is still the previous one if loading the new one failed
+        is_requested_voice = self.tts_service == 'xtts' or self.loaded_voice == voice
+        if is_requested_voice and os.path.exists(final_voiceline_file.replace(".wav", ".lip")):
+            self.voiceline_cache.put(cache_key, final_voiceline_file)
+        if not is_presynthesis:
+            self._play_in_debug_mode(final_voiceline_file)
         return final_voiceline_file
 
+    def get_voiceline_cache_key(self, voice, voiceline, voice_accent=None, aggro=0) -> str:
+        """The key a voiceline is cached under, made from every setting that changes how it sounds"""
+        language = self.language
+        if self.tts_service == 'xtts' and self.xtts_accent == 1 and voice_accent != None:
+            # change_voice switches to the NPC's accent
+            language = voice_accent
+        return VoicelineCache.get_key(
+            tts_service=self.tts_service, game=self.game, voice=voice, voice_model=self._get_voice_model_version(voice),
+            voiceline=voiceline.strip(), language=language, aggro=aggro, pace=self.pace, use_sr=self.use_sr, use_cleanup=self.use_cleanup
+        )
+
+    def _get_voice_model_version(self, voice):
+        """What identifies the model `voice` is synthesized with, so voicelines cached before the model was updated or replaced are not reused"""
+        if self.tts_service == 'xtts':
+            # the model change_voice switches to: the voice's own fine-tuned model if there is one, else an official model
+            voice = f"{voice.lower().replace(' ', '')}"
+            if voice in self.available_models:
+                return voice
+            elif self.last_model not in self.official_model_list:
+                return self.get_first_available_official_model()
+            return self.last_model
+
+        if self.game == "Fallout4" or self.game == "Fallout4VR":
+            XVASynthAcronym="f4_"
+        else:
+            XVASynthAcronym="sk_"
+        return self.voice_catalog.get_signature(f"{XVASynthAcronym}{voice.lower().replace(' ', '')}")
+
+    def _play_in_debug_mode(self, voiceline_file):
+        # if Debug Mode is on, play the audio file
+        if (self.debug_mode == '1') & (self.play_audio_from_script == '1') and sys.platform == 'win32':
+            winsound.PlaySound(voiceline_file, winsound.SND_FILENAME)
+
     def _group_sentences(self, voiceline_sentences, max_length=150):
         """
         Splits sentences into separate voicelines based on their length (max=max_length)
@@ -354,8 +506,11 @@ class Synthesizer:
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                requests.post(self.synthesize_url, json=data)
+                self.http.post(self.synthesize_url, json=data)
                 break  # Exit the loop if the request is successful
+            except requests.exceptions.ReadTimeout:
+                logging.error(f"xVASynth did not finish synthesizing within {self.http.get_timeout(self.synthesize_url)[1]} seconds. Skipping voiceline.")
+                break
             except ConnectionError as e:
                 if attempt < max_attempts - 1:  # Not the last attempt
                     logging.warning(f"Connection error while synthesizing voiceline. Restarting xVASynth server... ({attempt})")
@@ -390,7 +545,7 @@ class Synthesizer:
                 'speaker_wav': voice_path,
                 'language': self.language,
             }
-            return requests.post(self.xtts_synthesize_url, json=data)
+            return self.http.post(self.xtts_synthesize_url, json=data)
 
         response = get_voiceline(voice.lower())
         if response and response.status_code == 200:
@@ -468,8 +623,11 @@ class Synthesizer:
         max_attempts = 3
         for attempt in range(max_attempts):
             try:
-                requests.post(self.synthesize_batch_url, json=data)
+                self.http.post(self.synthesize_batch_url, json=data)
                 break  # Exit the loop if the request is successful
+            except requests.exceptions.ReadTimeout:
+                logging.error(f"xVASynth did not finish synthesizing within {self.http.get_timeout(self.synthesize_batch_url)[1]} seconds. Skipping voiceline: {linesBatch}")
+                break
             except ConnectionError as e:
                 if attempt < max_attempts - 1:  # Not the last attempt
                     logging.warning(f"Connection error while synthesizing voiceline. Restarting xVASynth server... ({attempt})")
@@ -487,9 +645,12 @@ class Synthesizer:
                 logging.error(f'Could not connect to xVASynth after {self.times_checked} attempts. Ensure that xVASynth is running and restart Mantella.')
                 raise TTSServiceFailure()
 
-            # contact local xVASynth server; ~2 second timeout
-            response = requests.get('http://127.0.0.1:8008/')
+            # contact local xVASynth server; 2 second timeout
+            response = self.http.get(self.xvasynth_health_url)
             response.raise_for_status()  # If the response contains an HTTP error status code, raise an exception
+        except requests.exceptions.ReadTimeout:
+            # the server accepted the connection, so it is alive
+            return
         except requests.exceptions.RequestException as err:
             if ('Connection aborted' in err.__str__()):
                 # So it is alive
@@ -511,7 +672,7 @@ class Synthesizer:
                 raise TTSServiceFailure()
 
             # contact local xVASynth server; ~2 second timeout
-            response = requests.post(self.xtts_set_tts_settings, json=tts_data_dict)
+            response = self.http.post(self.xtts_set_tts_settings, json=tts_data_dict)
             response.raise_for_status() 
             
         except requests.exceptions.RequestException as err:
@@ -546,11 +707,11 @@ class Synthesizer:
             server_ready = False
             for _ in range(120):  # try for up to 10 seconds
                 try:
-                    response = requests.post(self.xtts_set_tts_settings, json=tts_data_dict)
+                    response = self.http.post(self.xtts_set_tts_settings, json=tts_data_dict)
                     if response.status_code == 200:
                         server_ready = True
                         break
-                except ConnectionError:
+                except (ConnectionError, requests.exceptions.Timeout):
                     pass  # Server not up yet
                 time.sleep(1)
         
@@ -582,7 +743,7 @@ class Synthesizer:
             # Sending a POST request to the API endpoint
             logging.log(self.loglevel, f'Attempting to connect to xTTS...')
             tts_data_dict = json.loads(self.xtts_data.replace('\n', ''))
-            response = requests.post(self.xtts_set_tts_settings, json=tts_data_dict)
+            response = self.http.post(self.xtts_set_tts_settings, json=tts_data_dict)
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             # Log the error
@@ -600,18 +761,19 @@ class Synthesizer:
             # Format the voice string to match the model naming convention
             voice = f"{voice.lower().replace(' ', '')}"
             if voice in self.available_models and voice != self.last_model :
-                requests.post(self.xtts_switch_model, json={"model_name": voice})
+                self.http.post(self.xtts_switch_model, json={"model_name": voice})
                 self.last_model = voice
             elif self.last_model not in self.official_model_list and voice != self.last_model :
                 voice = self.get_first_available_official_model()
                 voice = f"{voice.lower().replace(' ', '')}"
-                requests.post(self.xtts_switch_model, json={"model_name": voice})
+                self.http.post(self.xtts_switch_model, json={"model_name": voice})
                 self.last_model = voice
 
             if (self.xtts_accent == 1) and (voice_accent != None):
                 self.language = voice_accent
             
         else :
+            self.loaded_voice = ''
             #this is a game check for Fallout4/Skyrim to correctly search the XVASynth voice models for the right game.
             if self.game == "Fallout4" or self.game == "Fallout4VR":
                 XVASynthAcronym="f4_"
@@ -621,21 +783,13 @@ class Synthesizer:
                 XVASynthModNexusLink = "https://www.nexusmods.com/skyrimspecialedition/mods/44184?tab=files"
             voice_path = f"{self.model_path}{XVASynthAcronym}{voice.lower().replace(' ', '')}"
 
-            if not os.path.exists(voice_path+'.json'):
+            voice_model = self.voice_catalog.get(f"{XVASynthAcronym}{voice.lower().replace(' ', '')}")
+            if voice_model is None:
                 logging.error(f"Voice model does not exist in location '{voice_path}'. Please ensure that the correct path has been set in config.ini (xvasynth_folder) and that the model has been downloaded from https://www.nexusmods.com/skyrimspecialedition/mods/44184?tab=files (Ctrl+F for 'sk_{voice.lower().replace(' ', '')}').")
                 raise VoiceModelNotFound()
 
-            with open(voice_path+'.json', 'r', encoding='utf-8') as f:
-                voice_model_json = json.load(f)
-
-            try:
-                base_speaker_emb = voice_model_json['games'][0]['base_speaker_emb']
-                base_speaker_emb = str(base_speaker_emb).replace('[','').replace(']','')
-            except:
-                base_speaker_emb = None
-
-            self.base_speaker_emb = base_speaker_emb
-            self.model_type = voice_model_json.get('modelType')
+            self.base_speaker_emb = voice_model.base_speaker_emb
+            self.model_type = voice_model.model_type
         
             model_change = {
                 'outputs': None,
@@ -648,7 +802,7 @@ class Synthesizer:
             #For some reason older 1.0 model will load in a way where they only emit high pitched static noise about 20-30% of the time, this series of run_backupmodel calls below 
             #are here to prevent the static issues by loading the model by following a sequence of model versions of 
             # 3.0 -> 1.1  (will fail to load) -> 3.0 -> 1.1 -> make a dummy voice sample with _synthesize_line -> 1.0 (will fail to load) -> 3.0 -> 1.0 again
-            if voice_model_json.get('modelVersion') == 1.0:
+            if voice_model.model_version == 1.0:
                 logging.log(self.loglevel, '1.0 model detected running following sequence to bypass voice model issues : 3.0 -> 1.1  (will fail to load) -> 3.0 -> 1.1 -> make a dummy voice sample with _synthesize_line -> 1.0 (will fail to load) -> 3.0 -> 1.0 again')
                 if self.game == "Fallout4" or self.game == "Fallout4VR":
                     backup_voice='piper'
@@ -664,8 +818,9 @@ class Synthesizer:
                     backup_voice='malenord'
                     self.run_backup_model(backup_voice)
             try:
-                requests.post(self.loadmodel_url, json=model_change)
+                response = self.http.post(self.loadmodel_url, json=model_change)
                 self.last_voice = voice
+                self.loaded_voice = voice if response.ok else ''
                 logging.log(self.loglevel, f'Target model {voice} loaded.')
             except:
                 logging.error(f'Target model {voice} failed to load.')
@@ -676,8 +831,9 @@ class Synthesizer:
                     backup_voice='malenord'
                 self.run_backup_model(backup_voice)
                 try:
-                    requests.post(self.loadmodel_url, json=model_change)
+                    response = self.http.post(self.loadmodel_url, json=model_change)
                     self.last_voice = voice
+                    self.loaded_voice = voice if response.ok else ''
                     logging.log(self.loglevel, f'Voice model {voice} loaded.')
                 except:
                     logging.error(f'model {voice} failed to load try restarting Mantella')
@@ -701,20 +857,12 @@ class Synthesizer:
             XVASynthModNexusLink = "https://www.nexusmods.com/skyrimspecialedition/mods/44184?tab=files"
             #voice='malenord'
         voice_path = f"{self.model_path}{XVASynthAcronym}{voice.lower().replace(' ', '')}"
-        if not os.path.exists(voice_path+'.json'):
+        voice_model = self.voice_catalog.get(f"{XVASynthAcronym}{voice.lower().replace(' ', '')}")
+        if voice_model is None:
             logging.error(f"Voice model does not exist in location '{voice_path}'. Please ensure that the correct path has been set in config.ini (xvasynth_folder) and that the model has been downloaded from {XVASynthModNexusLink} (Ctrl+F for '{XVASynthAcronym}{voice.lower().replace(' ', '')}').")
             raise VoiceModelNotFound()
 
-        with open(voice_path+'.json', 'r', encoding='utf-8') as f:
-            voice_model_json = json.load(f)
-
-        try:
-            base_speaker_emb = voice_model_json['games'][0]['base_speaker_emb']
-            base_speaker_emb = str(base_speaker_emb).replace('[','').replace(']','')
-        except:
-            base_speaker_emb = None
-
-        backup_model_type = voice_model_json.get('modelType')
+        backup_model_type = voice_model.model_type
         
         backup_model_change = {
             'outputs': None,
@@ -725,7 +873,7 @@ class Synthesizer:
             'pluginsContext': '{}',
         }
         try:
-            requests.post(self.loadmodel_url, json=backup_model_change)
+            self.http.post(self.loadmodel_url, json=backup_model_change)
             logging.log(self.loglevel, f'Backup model {voice} loaded.')
         except:
             logging.error(f"Backup model {voice} failed to load")
@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class EndpointMetrics:
+    """Latency of the requests sent to one endpoint, in seconds"""
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.failures: int = 0
+        self.total_time: float = 0
+        self.max_time: float = 0
+        self.last_time: float = 0
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0
+
+    def add(self, elapsed: float, failed: bool):
+        self.count += 1
+        self.failures += failed
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.last_time = elapsed
+
+    def __str__(self) -> str:
+        return f'{self.count} requests ({self.failures} failed), mean {self.mean_time:.3f}s, max {self.max_time:.3f}s, last {self.last_time:.3f}s'
+
+
+class TTSTransport:
+    """Sends the HTTP requests of a TTS service (xVASynth or XTTS) over a pool of keep-alive connections.
+
+    Every request has a connect and a read timeout, so a TTS server that hangs fails the request instead of the conversation.
+    Timeouts can be set per endpoint (the path of the URL), eg loading a voice model takes far longer than a health check.
+    The latency of every request is recorded per endpoint, see `metrics`.
+    """
+    CONNECT_TIMEOUT = 3.05
+    READ_TIMEOUT = 60
+
+    def __init__(self, name: str, timeouts: dict[str, tuple[float, float]] | None = None, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT, pool_size: int = 4) -> None:
+        self.__name: str = name
+        self.__timeouts: dict[str, tuple[float, float]] = timeouts or {}
+        self.__default_timeout: tuple[float, float] = (connect_timeout, read_timeout)
+        self.__session: requests.Session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.__session.mount('http://', adapter)
+        self.__session.mount('https://', adapter)
+        self.__metrics: dict[str, EndpointMetrics] = {}
+        self.__metrics_lock: threading.Lock = threading.Lock()
+
+    @property
+    def metrics(self) -> dict[str, EndpointMetrics]:
+        """The latency of the requests sent so far, by endpoint"""
+        with self.__metrics_lock:
+            return dict(self.__metrics)
+
+    def get_timeout(self, url: str) -> tuple[float, float]:
+        return self.__timeouts.get(urlsplit(url).path, self.__default_timeout)
+
+    def get(self, url: str, timeout: float | tuple[float, float] | None = None, **kwargs) -> requests.Response:
+        return self.request('GET', url, timeout, **kwargs)
+
+    def post(self, url: str, json=None, timeout: float | tuple[float, float] | None = None, **kwargs) -> requests.Response:
+        return self.request('POST', url, timeout, json=json, **kwargs)
+
+    def request(self, method: str, url: str, timeout: float | tuple[float, float] | None = None, **kwargs) -> requests.Response:
+        """Sends a request, raising the same requests exceptions as `requests.request` (including requests.exceptions.Timeout)"""
+        endpoint = urlsplit(url).path
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = self.__session.request(method, url, timeout=timeout or self.get_timeout(url), **kwargs)
+            failed = not response.ok
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.__metrics_lock:
+                self.__metrics.setdefault(endpoint, EndpointMetrics()).add(elapsed, failed)
+            logging.debug(f'{self.__name} {method} {endpoint} took {elapsed:.3f}s{" (failed)" if failed else ""}')
+
+    def log_metrics(self):
+        for endpoint, metrics in sorted(self.metrics.items()):
+            logging.debug(f'{self.__name} {endpoint}: {metrics}')
+
+    def close(self):
+        self.__session.close()
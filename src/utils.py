@@ -18,6 +18,23 @@ def time_it(func):
     return wrapper
 
 
+class Backoff:
+    """Delays between retries that double from `initial` up to `maximum` seconds, instead of a fixed wait"""
+    def __init__(self, initial: float = 0.5, maximum: float = 8.0, factor: float = 2.0) -> None:
+        self.__initial: float = initial
+        self.__maximum: float = maximum
+        self.__factor: float = factor
+        self.__next_delay: float = initial
+
+    def next_delay(self) -> float:
+        delay = self.__next_delay
+        self.__next_delay = min(self.__next_delay * self.__factor, self.__maximum)
+        return delay
+
+    def reset(self):
+        self.__next_delay = self.__initial
+
+
 def clean_text(text):
     # Remove all punctuation from the sentence
     text_cleaned = text.translate(str.maketrans('', '', string.punctuation))
@@ -0,0 +1,138 @@
+import json
+import logging
+import os
+import threading
+import src.data_cache as data_cache
+
+
+class VoiceModelInfo:
+    """What xVASynth needs to know about a voice model to load it and synthesize with it, as read from its .json file"""
+    def __init__(self, path: str, model_type: str | None, model_version, base_speaker_emb: str | None) -> None:
+        # the model's path without extension, as sent to xVASynth's loadModel
+        self.path: str = path
+        self.model_type: str | None = model_type
+        self.model_version = model_version
+        # the speaker embedding as the comma separated string expected by synthesize's base_emb
+        self.base_speaker_emb: str | None = base_speaker_emb
+
+    @staticmethod
+    def from_json_file(json_file: str) -> 'VoiceModelInfo':
+        with open(json_file, 'r', encoding='utf-8') as f:
+            voice_model_json = json.load(f)
+
+        try:
+            base_speaker_emb = voice_model_json['games'][0]['base_speaker_emb']
+            base_speaker_emb = str(base_speaker_emb).replace('[','').replace(']','')
+        except:
+            base_speaker_emb = None
+
+        return VoiceModelInfo(os.path.splitext(json_file)[0], voice_model_json.get('modelType'), voice_model_json.get('modelVersion'), base_speaker_emb)
+
+
+class VoiceCatalog:
+    """The metadata of every xVASynth voice model in `model_folder` (eg xVASynth/resources/app/models/Skyrim/), by model name (eg sk_malenord).
+
+    The folder is scanned once on a background thread (see `start`), so switching voices never has to read the models' .json files.
+    What was read is saved to `cache_file` with the mtime and size of each .json file, so later scans only parse the models that
+    were added or changed since. Models downloaded while Mantella is running are read the first time they are asked for.
+    """
+    # version of the saved catalog (including VoiceModelInfo's attributes), see data_cache.read_cache
+    CACHE_VERSION = 1
+
+    def __init__(self, model_folder: str, cache_file: str) -> None:
+        self.__model_folder: str = model_folder
+        self.__cache_file: str = cache_file
+        # model name -> ((mtime_ns, size) of its .json, metadata)
+        self.__models: dict[str, tuple[tuple[int, int], VoiceModelInfo]] = {}
+        self.__lock: threading.Lock = threading.Lock()
+        self.__scanned: threading.Event = threading.Event()
+        self.__scan_thread: threading.Thread | None = None
+
+    def start(self):
+        """Scans the models folder on a background thread. `get` waits for the scan to finish."""
+        if self.__scan_thread is None:
+            self.__scan_thread = threading.Thread(target=self.scan, name='VoiceCatalog', daemon=True)
+            self.__scan_thread.start()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            return len(self.__models)
+
+    def get(self, model_name: str) -> VoiceModelInfo | None:
+        """The metadata of the voice model `model_name` (eg sk_malenord), or None if it is not in the models folder"""
+        model = self.__get_model(model_name)
+        return model[1] if model is not None else None
+
+    def get_signature(self, model_name: str) -> tuple[int, int] | None:
+        """The (mtime_ns, size) of the voice model's .json file, which changes when the model is updated or replaced"""
+        model = self.__get_model(model_name)
+        return model[0] if model is not None else None
+
+    def __get_model(self, model_name: str) -> tuple[tuple[int, int], VoiceModelInfo] | None:
+        if self.__scan_thread is None:
+            self.scan()
+        self.__scanned.wait()
+        with self.__lock:
+            model = self.__models.get(model_name)
+        if model is not None:
+            return model
+
+        # downloaded since the folder was scanned
+        json_file = os.path.join(self.__model_folder, f'{model_name}.json')
+        try:
+            stat = os.stat(json_file)
+            info = VoiceModelInfo.from_json_file(json_file)
+        except OSError:
+            return None
+        except ValueError as e:
+            logging.warning(f'Could not read voice model {json_file}: {e}')
+            return None
+        model = ((stat.st_mtime_ns, stat.st_size), info)
+        with self.__lock:
+            self.__models[model_name] = model
+        return model
+
+    def scan(self):
+        """Reads the metadata of every voice model in the models folder, only parsing the .json files that changed since the cache was saved"""
+        try:
+            cached = self.__read_cache()
+            models: dict[str, tuple[tuple[int, int], VoiceModelInfo]] = {}
+            parsed = 0
+            try:
+                with os.scandir(self.__model_folder) as entries:
+                    json_files = [entry for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+            except OSError as e:
+                logging.warning(f'Could not list the voice models in {self.__model_folder}: {e}')
+                json_files = []
+
+            for entry in json_files:
+                model_name = entry.name[:-len('.json')]
+                stat = entry.stat()
+                signature = (stat.st_mtime_ns, stat.st_size)
+                model = cached.get(model_name)
+                if model is None or model[0] != signature:
+                    try:
+                        model = (signature, VoiceModelInfo.from_json_file(entry.path))
+                    except (OSError, ValueError) as e:
+                        logging.warning(f'Could not read voice model {entry.path}: {e}')
+                        continue
+                    parsed += 1
+                models[model_name] = model
+
+            with self.__lock:
+                self.__models = models
+            if parsed or len(models) != len(cached):
+                self.__write_cache(models)
+            logging.debug(f'Found {len(models)} voice models in {self.__model_folder} ({parsed} read from their .json files)')
+        finally:
+            self.__scanned.set()
+
+    def __read_cache(self) -> dict[str, tuple[tuple[int, int], VoiceModelInfo]]:
+        cached = data_cache.read_cache(self.__cache_file, self.CACHE_VERSION)
+        # the cache is only valid for the models folder it was built from (xvasynth_folder may have changed)
+        if cached is None or cached.get('model_folder') != os.path.abspath(self.__model_folder):
+            return {}
+        return cached['models']
+
+    def __write_cache(self, models: dict[str, tuple[tuple[int, int], VoiceModelInfo]]):
+        data_cache.write_cache(self.__cache_file, {'model_folder': os.path.abspath(self.__model_folder), 'models': models}, self.CACHE_VERSION)
@@ -0,0 +1,221 @@
+import logging
+from src.character_store import CharacterStore
+from src.data_table import DataTable
+
+
+# voice type form IDs of the vanilla Skyrim voice models
+# Female Dark Elf Commoner, Female Vampire, Male Bandit, Male Dark Elf Cynical (other than 18469), Male Vampire and Male Warlock are missing, as I couldn't find their IDs
+SKYRIM_VOICE_MODEL_IDS = {
+    '0002992B': 'Dragon',
+    '2470000': 'Male Dark Elf Commoner',
+    '18469': 'Male Dark Elf Cynical',
+    '00013AEF': 'Female Argonian',
+    '00013AE3': 'Female Commander',
+    '00013ADE': 'Female Commoner',
+    '00013AE4': 'Female Condescending',
+    '00013AE5': 'Female Coward',
+    '00013AF3': 'Female Dark Elf',
+    '00013AF1': 'Female Elf Haughty',
+    '00013ADD': 'Female Even Toned',
+    '00013AED': 'Female Khajiit',
+    '00013AE7': 'Female Nord',
+    '00013AE2': 'Female Old Grumpy',
+    '00013AE1': 'Female Old Kindly',
+    '00013AEB': 'Female Orc',
+    '00013BC3': 'Female Shrill',
+    '00012AE0': 'Female Sultry',
+    '00013ADC': 'Female Young Eager',
+    '00013AEE': 'Male Argonian',
+    '00013ADA': 'Male Brute',
+    '00013AD8': 'Male Commander',
+    '00013AD3': 'Male Commoner',
+    '000EA266': 'Male Commoner Accented',
+    '00013AD9': 'Male Condescending',
+    '00013ADB': 'Male Coward',
+    '00013AF2': 'Male Dark Elf Commoner',
+    '00013AD4': 'Male Drunk',
+    '00013AF0': 'Male Elf Haughty',
+    '00013AD2': 'Male Even Toned',
+    '000EA267': 'Male Even Toned Accented',
+    '000AA8D3': 'Male Guard', # not in csv
+    '00013AEC': 'Male Khajiit',
+    '00013AE6': 'Male Nord',
+    '000E5003': 'Male Nord Commander',
+    '00013AD7': 'Male Old Grumpy',
+    '00013AD6': 'Male Old Kindly',
+    '00013AEA': 'Male Orc',
+    '00013AD5': 'Male Sly Cynical',
+    '0001B55F': 'Male Soldier',
+    '00012AD1': 'Male Young Eager',
+}
+
+MALE_VOICE_MODELS = {
+    'ArgonianRace': 'Male Argonian',
+    'BretonRace': 'Male Even Toned',
+    'DarkElfRace': 'Male Dark Elf Commoner',
+    'HighElfRace': 'Male Elf Haughty',
+    'ImperialRace': 'Male Even Toned',
+    'KhajiitRace': 'Male Khajit',
+    'NordRace': 'Male Nord',
+    'OrcRace': 'Male Orc',
+    'RedguardRace': 'Male Even Toned',
+    'WoodElfRace': 'Male Young Eager',
+}
+FEMALE_VOICE_MODELS = {
+    'ArgonianRace': 'Female Argonian',
+    'BretonRace': 'Female Even Toned',
+    'DarkElfRace': 'Female Dark Elf Commoner',
+    'HighElfRace': 'Female Elf Haughty',
+    'ImperialRace': 'Female Even Toned',
+    'KhajiitRace': 'Female Khajit',
+    'NordRace': 'Female Nord',
+    'OrcRace': 'Female Orc',
+    'RedguardRace': 'Female Sultry',
+    'WoodElfRace': 'Female Young Eager',
+}
+
+FO4_MALE_VOICE_MODELS = {
+    'AssaultronRace':	'robot_assaultron',
+    'DLC01RoboBrainRace':	'robot_mrgutsy',
+    'DLC02HandyRace':	'robot_mrhandy',
+    'DLC02FeralGhoulRace':	'maleghoul',
+    'DLC03_SynthGen2RaceDiMa':	'dima',
+    'DLC03RoboBrainRace':	'robot_mrgutsy',
+    'EyeBotRace':	'robot_assaultron',
+    'GhoulRace':	'maleghoul',
+    'FeralGhoulRace':	'maleghoul',
+    'FeralGhoulGlowingRace':	'maleghoul',
+    'HumanRace':	'maleboston',
+    'ProtectronRace':	'robot_assaultron',
+    'SupermutantBehemothRace':	'supermutant03',
+    'SuperMutantRace':	'supermutant',
+    'SynthGen1Race':	'gen1synth01',
+    'SynthGen2Race':	'gen1synth01',
+    'TurretBubbleRace':	'Dima',
+    'TurretTripodRace':	'Dima',
+    'TurretWorkshopRace':	'Dima',
+}
+FO4_FEMALE_VOICE_MODELS = {
+    'AssaultronRace':	'robotcompanionfemalprocessed',
+    'DLC01RoboBrainRace':	'robotcompanionfemaledefault',
+    'DLC02HandyRace':	'robotcompanionfemaledefault',
+    'DLC02FeralGhoulRace':	'femaleghoul',
+    'DLC03_SynthGen2RaceDiMa':	'robotcompanionfemaledefault',
+    'DLC03RoboBrainRace':	'robotcompanionfemaledefault',
+    'EyeBotRace':	'robotcompanionfemalprocessed',
+    'GhoulRace':	'femaleghoul',
+    'FeralGhoulRace':	'femaleghoul',
+    'FeralGhoulGlowingRace':	'femaleghoul',
+    'HumanRace':	'femaleboston',
+    'ProtectronRace':	'robotcompanionfemalprocessed',
+    'SupermutantBehemothRace':	'supermutant03',
+    'SuperMutantRace':	'supermutant',
+    'SynthGen1Race':	'robotcompanionfemalprocessed',
+    'SynthGen2Race':	'robotcompanionfemalprocessed',
+    'TurretBubbleRace':	'Dima',
+    'TurretTripodRace':	'Dima',
+    'TurretWorkshopRace':	'Dima',
+}
+
+# Fallout 4 voice types whose xVASynth models do not work, and the voice type to use instead
+FO4_VOICE_SUBSTITUTES = {
+    'DLC01RobotCompanionMaleDefault': ('robot_assaultron', 'robot_assaultron'),
+    'DLC01RobotCompanionMaleProcessed': ('robot_assaultron', 'robot_assaultron'),
+    'SynthGen1Male02': ('gen1synth01', '000BBBF0'),
+    'SynthGen1Male03': ('gen1synth01', '000BBBF0'),
+}
+
+
+def normalize_form_id(form_id: str) -> str:
+    """Form IDs are compared in lower case without leading zeros, as the game sometimes drops them"""
+    return form_id.strip().lower().lstrip('0')
+
+
+def _first_by_key(pairs) -> dict:
+    """Maps each lower case key to the value of its first (key, value) pair, skipping empty keys"""
+    mapping = {}
+    for key, value in pairs:
+        if key:
+            mapping.setdefault(str(key).lower(), value)
+    return mapping
+
+
+class VoiceResolver:
+    """Picks the voice model and voice folder of generic NPCs, which are not in the character CSV.
+
+    Every table is built once at startup, so resolving a voice is a handful of dict lookups. In order, a voice is matched by:
+    the voice type's form ID / the voice type's folder name / the NPC's race and sex
+    """
+    def __init__(self, game: str, character_stores: list[CharacterStore], FO4_voice_folders_and_models: DataTable | None = None) -> None:
+        self.__is_fallout4: bool = game in ("Fallout4", "Fallout4VR")
+        if self.__is_fallout4:
+            voices = FO4_voice_folders_and_models
+            voice_ids = voices.column('voice_ID') if voices else []
+            voice_folders = voices.column('voice_file_name') if voices else []
+            voice_models = voices.column('voice_model') if voices else []
+            voice_matches = [(model or '', folder or '') for model, folder in zip(voice_models, voice_folders)]
+            # FO4_Voice_folder_XVASynth_matches.csv by form ID and by voice folder -> (voice model, voice folder)
+            self.__ids: dict[str, tuple[str, str]] = _first_by_key((normalize_form_id(voice_id) if voice_id else None, match) for voice_id, match in zip(voice_ids, voice_matches))
+            self.__folders: dict[str, tuple[str, str]] = _first_by_key((folder, match) for folder, match in zip(voice_folders, voice_matches))
+            self.__voice_model_folders: dict[str, str] = _first_by_key(zip(voice_models, voice_folders))
+            self.__male_voices, self.__female_voices = FO4_MALE_VOICE_MODELS, FO4_FEMALE_VOICE_MODELS
+            self.__default_male_voice, self.__default_female_voice = 'maleboston', 'femaleboston'
+        else:
+            self.__ids = {normalize_form_id(voice_id): (voice_model, '') for voice_id, voice_model in SKYRIM_VOICE_MODEL_IDS.items()}
+            self.__folders = {}
+            self.__voice_model_folders = None
+            self.__male_voices, self.__female_voices = MALE_VOICE_MODELS, FEMALE_VOICE_MODELS
+            self.__default_male_voice, self.__default_female_voice = 'Male Nord', 'Female Nord'
+        self.set_characters(character_stores)
+
+    def set_characters(self, character_stores: list[CharacterStore]):
+        """(Re)builds the tables that come from the character CSVs, given in order of precedence"""
+        character_folder_column = 'fallout4_voice_folder' if self.__is_fallout4 else 'skyrim_voice_folder'
+        character_folders = [folder for store in character_stores for folder in store.column(character_folder_column)]
+        character_models = [voice_model for store in character_stores for voice_model in store.column('voice_model')]
+
+        # voice folder -> voice model of the first character using it
+        self.__character_folders: dict[str, str] = _first_by_key(zip(character_folders, character_models))
+        # voice model -> voice folder, Fallout 4 takes these from FO4_Voice_folder_XVASynth_matches.csv instead
+        self.__model_folders: dict[str, str] = self.__voice_model_folders if self.__is_fallout4 else _first_by_key(zip(character_models, character_folders))
+
+    def get_race_voice_model(self, race: str, is_female: bool) -> str:
+        if is_female:
+            return self.__female_voices.get(race, self.__default_female_voice)
+        return self.__male_voices.get(race, self.__default_male_voice)
+
+    def resolve(self, voice_id: str, voice_folder: str, race: str, sex: str) -> tuple[str, str]:
+        """Finds the voice model and voice folder for a generic NPC
+
+        Args:
+            voice_id (str): the form ID of the NPC's voice type
+            voice_folder (str): the name of the NPC's voice type, which is also its voice folder
+            race (str): the NPC's race, eg NordRace
+            sex (str): '1' for female NPCs
+
+        Returns:
+            tuple[str, str]: the voice model and the voice folder
+        """
+        if self.__is_fallout4 and voice_folder in FO4_VOICE_SUBSTITUTES:
+            voice_folder, voice_id = FO4_VOICE_SUBSTITUTES[voice_folder]
+
+        voice_model, matched_folder = self.__ids.get(normalize_form_id(voice_id), ('', ''))
+        if matched_folder:
+            logging.info(f"Matched voice model with ID to {matched_folder}")
+        elif self.__is_fallout4:
+            logging.info("No matching voice ID found. Attempting voice_file_name match.")
+            voice_model, matched_folder = self.__folders.get(voice_folder.lower(), ('', ''))
+
+        if voice_model == '':
+            # search for voice model in the character CSV
+            voice_model = self.__character_folders.get(voice_folder.lower()) or ''
+        if voice_model == '': # guess voice model based on sex and race
+            voice_model = self.get_race_voice_model(race, sex == '1')
+
+        if not matched_folder:
+            # the voice folder listed with this voice model
+            matched_folder = self.__model_folders.get(voice_model.lower())
+        if not matched_folder:
+            # Fallout 4 voices without a match keep an empty folder, Skyrim assumes it is simply the voice model name without spaces
+            matched_folder = '' if self.__is_fallout4 else voice_model.replace(' ','')
+        return voice_model, matched_folder
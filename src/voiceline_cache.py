@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+
+class VoicelineCache:
+    """Keeps synthesized voicelines (.wav) and their lip files (.lip), so a line spoken before in the same voice is copied instead of synthesized again.
+
+    Files are named after a hash of everything that affects how the line sounds (see `get_key`). Once the cache holds more than
+    `max_size` bytes, the least recently spoken lines are removed first. As hits update the file's mtime, this order survives restarts.
+    A `max_size` of 0 disables the cache.
+    """
+    def __init__(self, folder: str, max_size: int) -> None:
+        self.__folder: str = folder
+        self.__max_size: int = max_size
+        # key -> bytes used by its .wav and .lip, least recently used first
+        self.__entries: OrderedDict[str, int] = OrderedDict()
+        self.__size: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        if self.is_enabled:
+            self.__load_entries()
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.__max_size > 0
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        with self.__lock:
+            return key in self.__entries
+
+    @staticmethod
+    def get_key(**parts) -> str:
+        """A key for a voiceline made from everything that affects how it sounds, eg the TTS service, voice model, text and language"""
+        return hashlib.blake2b(json.dumps(parts, sort_keys=True, ensure_ascii=False).encode('utf-8'), digest_size=16).hexdigest()
+
+    def get(self, key: str, wav_file: str) -> bool:
+        """Copies the cached voiceline to `wav_file` (and its lip file next to it, if there is one)
+
+        Returns:
+            bool: False if the voiceline is not cached
+        """
+        with self.__lock:
+            if key not in self.__entries:
+                return False
+            cached_wav, cached_lip = self.__get_paths(key)
+            try:
+                shutil.copyfile(cached_wav, wav_file)
+                if os.path.exists(cached_lip):
+                    shutil.copyfile(cached_lip, os.path.splitext(wav_file)[0] + '.lip')
+                os.utime(cached_wav)
+            except OSError as e:
+                logging.warning(f'Could not reuse cached voiceline {cached_wav}: {e}')
+                self.__remove(key)
+                return False
+            self.__entries.move_to_end(key)
+            return True
+
+    def put(self, key: str, wav_file: str):
+        """Stores a voiceline that has just been synthesized to `wav_file`, with its lip file if FaceFX created one"""
+        if not self.is_enabled:
+            return
+        with self.__lock:
+            cached_wav, cached_lip = self.__get_paths(key)
+            lip_file = os.path.splitext(wav_file)[0] + '.lip'
+            try:
+                os.makedirs(self.__folder, exist_ok=True)
+                if os.path.exists(cached_lip):
+                    os.remove(cached_lip)
+                if os.path.exists(lip_file):
+                    shutil.copyfile(lip_file, cached_lip)
+                # the .wav is copied last, as it marks the entry as complete when the cache is loaded again
+                shutil.copyfile(wav_file, cached_wav)
+            except OSError as e:
+                logging.warning(f'Could not cache voiceline {wav_file}: {e}')
+                return
+            self.__size -= self.__entries.pop(key, 0)
+            self.__entries[key] = self.__get_size(key)
+            self.__size += self.__entries[key]
+            while self.__size > self.__max_size and len(self.__entries) > 1:
+                self.__remove(next(iter(self.__entries)))
+
+    def __get_paths(self, key: str) -> tuple[str, str]:
+        return os.path.join(self.__folder, f'{key}.wav'), os.path.join(self.__folder, f'{key}.lip')
+
+    def __get_size(self, key: str) -> int:
+        return sum(os.path.getsize(path) for path in self.__get_paths(key) if os.path.exists(path))
+
+    def __remove(self, key: str):
+        self.__size -= self.__entries.pop(key, 0)
+        for path in self.__get_paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.debug(f'Could not remove cached voiceline {path}: {e}')
+
+    def __load_entries(self):
+        try:
+            with os.scandir(self.__folder) as entries:
+                file_names = {entry.name: entry for entry in entries}
+        except FileNotFoundError:
+            return
+        wav_files = [(entry.stat().st_mtime_ns, name[:-len('.wav')]) for name, entry in file_names.items() if name.endswith('.wav')]
+        for name in file_names:
+            # lip files whose .wav was never written (eg Mantella was closed while caching)
+            if name.endswith('.lip') and name[:-len('.lip')] + '.wav' not in file_names:
+                self.__remove(name[:-len('.lip')])
+        for _, key in sorted(wav_files):
+            self.__entries[key] = self.__get_size(key)
+            self.__size += self.__entries[key]
+        while self.__size > self.__max_size and self.__entries:
+            self.__remove(next(iter(self.__entries)))
+        logging.debug(f'Loaded {len(self.__entries)} cached voicelines ({round(self.__size / 1_000_000, 1)} MB)')
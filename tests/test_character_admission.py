@@ -0,0 +1,126 @@
+import threading
+import time
+import pytest
+import src.character_admission as character_admission
+from src.character_admission import CharacterAdmission
+from src.game_io.transport import FileTransport
+from src.game_manager import GameStateManager
+
+
+class ActorReadingGameStateManager(GameStateManager):
+    """Reads the selected actor like load_game_state does, without looking them up in the character CSVs"""
+    def load_game_state(self, debug_mode, debug_character_name, characters, character_name, character_id, location, in_game_time, voice_resolver):
+        character_id = self.load_data_when_available('_mantella_current_actor_id', '')
+        character_info = {'name': self.read_game_info('_mantella_current_actor'), 'id': character_id}
+        return character_info, 'Whiterun', '12', False
+
+
+class LoadedCharacter(dict):
+    """The character info of an admitted actor, instead of a Character with a conversation folder"""
+    def __init__(self, character_info: dict, *args) -> None:
+        super().__init__(character_info)
+
+    def preload(self):
+        pass
+
+
+@pytest.fixture
+def game_folder(tmp_path, monkeypatch):
+    monkeypatch.setattr(character_admission, 'Character', LoadedCharacter)
+    monkeypatch.setattr(CharacterAdmission, 'NEXT_ACTOR_TIMEOUT', 0.5)
+    return tmp_path
+
+
+@pytest.fixture
+def admission(game_folder):
+    game_state_manager = ActorReadingGameStateManager(str(game_folder), 'Skyrim', FileTransport(str(game_folder)))
+    yield CharacterAdmission(game_state_manager, None, None, 'English', 'Skyrim')
+    game_state_manager.transport.close()
+
+
+@pytest.fixture
+def game(game_folder):
+    transport = FileTransport(str(game_folder))
+    yield transport
+    transport.close()
+
+
+def select_actor(game: FileTransport, name: str, actor_id: str):
+    """Hands over an actor the way the Mantella spell does, lowering _mantella_character_selection until Mantella has read them"""
+    game.write_many({'_mantella_character_selection': 'False', '_mantella_current_actor': name, '_mantella_current_actor_id': actor_id})
+
+
+def select_actors_in_turn(game: FileTransport, actors: list[tuple[str, str]]) -> threading.Thread:
+    def run():
+        for i, (name, actor_id) in enumerate(actors):
+            if i > 0:
+                game.wait_for('_mantella_character_selection', lambda text: text.lower() == 'true', timeout=5)
+            select_actor(game, name, actor_id)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def admit(admission: CharacterAdmission, count: int) -> list[dict]:
+    characters, _, _ = admission.admit(count, '0', 'None', '', '', '', '')
+    return characters
+
+
+def test_admits_actors_that_share_a_name_and_id(admission, game):
+    thread = select_actors_in_turn(game, [('Whiterun Guard', '65300'), ('Whiterun Guard', '65300')])
+
+    start = time.monotonic()
+    characters = admit(admission, 2)
+
+    assert characters == [{'name': 'Whiterun Guard', 'id': '65300'}, {'name': 'Whiterun Guard', 'id': '65300'}]
+    assert time.monotonic() - start < CharacterAdmission.NEXT_ACTOR_TIMEOUT
+    thread.join()
+
+
+def test_admits_different_actors(admission, game):
+    thread = select_actors_in_turn(game, [('Lydia', '655971'), ('Faendal', '77703'), ('Camilla Valerius', '77702')])
+
+    characters = admit(admission, 3)
+
+    assert [character['name'] for character in characters] == ['Lydia', 'Faendal', 'Camilla Valerius']
+    thread.join()
+
+
+def test_waits_for_the_id_the_game_writes_after_the_name(admission, game):
+    select_actor(game, 'Lydia', '655971')
+    assert admit(admission, 1) == [{'name': 'Lydia', 'id': '655971'}]
+
+    def select_faendal():
+        game.wait_for('_mantella_character_selection', lambda text: text.lower() == 'true', timeout=5)
+        game.write_many({'_mantella_character_selection': 'False', '_mantella_current_actor': 'Faendal'})
+        time.sleep(0.1)
+        game.write('_mantella_current_actor_id', '77703')
+    thread = threading.Thread(target=select_faendal, daemon=True)
+    thread.start()
+
+    assert admit(admission, 1) == [{'name': 'Faendal', 'id': '77703'}]
+    thread.join()
+    # the late ID is not mistaken for yet another actor
+    assert admit(admission, 1) == []
+
+
+def test_does_not_admit_the_same_actor_twice_when_the_next_one_never_comes(admission, game):
+    select_actor(game, 'Whiterun Guard', '65300')
+
+    assert admit(admission, 2) == [{'name': 'Whiterun Guard', 'id': '65300'}]
+    # the game still has not sent anyone else when the conversation loop asks again
+    assert admit(admission, 1) == []
+
+    select_actor(game, 'Whiterun Guard', '65300')
+    assert admit(admission, 1) == [{'name': 'Whiterun Guard', 'id': '65300'}]
+
+
+def test_reset_reads_the_first_actor_of_the_next_conversation_straight_away(admission, game):
+    select_actor(game, 'Lydia', '655971')
+    assert admit(admission, 1) == [{'name': 'Lydia', 'id': '655971'}]
+
+    # the same NPC starts the next conversation, after Mantella has reset the _mantella_ files
+    admission.reset()
+    start = time.monotonic()
+    assert admit(admission, 1) == [{'name': 'Lydia', 'id': '655971'}]
+    assert time.monotonic() - start < CharacterAdmission.NEXT_ACTOR_TIMEOUT
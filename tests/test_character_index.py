@@ -0,0 +1,100 @@
+import pytest
+from src.character_index import CharacterIndex
+from src.character_store import CharacterStore
+from src.data_table import read_csv
+
+CHARACTERS_CSV = '''name,voice_model,race,gender,ref_id,base_id
+Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E
+Lydia,FemaleCommoner,Imperial,Female,0B1240,0B1234
+Curie,FemaleEvenToned,Robot,Female,102FA3,102FA2
+Curie,FemaleEvenToned,Human,Female,27A7E2,102FA2
+Ulfric Stormcloak,MaleUlfric,Nord,Male,01414C,01414D
+Farengar Secret-Fire,MaleYoungEager,Nord,Male,013BBE,013BBF
+Guard,MaleGuard,Nord,Male,0F0001,
+Guard,MaleGuard,Imperial,Male,0F0002,0F0003
+,MaleCommoner,,Male,0F0004,0F0005
+'''
+
+
+def find_character_info_cascade(character_name: str, character_id: str, character_race: str, rows: list[dict]) -> dict | None:
+    """How load_game_state matched characters before CharacterIndex: one pandas column mask after another over the CSV,
+    where `astype(str)` turned every empty cell into 'nan'
+    """
+    full_id_len = 6
+    full_id_search = character_id[-full_id_len:]
+    partial_id_len = 3
+    partial_id_search = character_id[-partial_id_len:]
+
+    as_text = lambda value: 'nan' if value is None else str(value)
+    name_match = lambda row: as_text(row['name']).lower() == character_name.lower()
+    id_match = lambda row: as_text(row['base_id']).lower()[-full_id_len:] == full_id_search
+    partial_id_match = lambda row: as_text(row['base_id']).lower()[-partial_id_len:] == partial_id_search
+    race_match = lambda row: as_text(row['race']).lower() == character_race.lower()
+
+    for matches in (
+        (name_match, id_match, race_match), # match name, full ID, race (needed for Fallout 4 NPCs like Curie)
+        (name_match, id_match), # match name and full ID
+        (name_match, partial_id_match, race_match), # match name, partial ID, and race
+        (name_match, partial_id_match), # match name and partial ID
+        (name_match, race_match), # match name and race
+        (name_match,), # match just name
+        (id_match,), # match just ID
+    ):
+        for row in rows:
+            if all(match(row) for match in matches):
+                return row
+    return None
+
+
+@pytest.fixture(scope='module')
+def characters(tmp_path_factory):
+    file_name = tmp_path_factory.mktemp('data') / 'skyrim_characters.csv'
+    file_name.write_text(CHARACTERS_CSV, encoding='utf-8')
+    return read_csv(str(file_name))
+
+
+@pytest.fixture(scope='module')
+def character_index(characters):
+    columns, rows = characters
+    return CharacterIndex(CharacterStore(columns, rows))
+
+
+@pytest.mark.parametrize('character_name, character_id, character_race, expected_ref_id', [
+    # exact name, base ID and race
+    ('Lydia', '000a2c8e', 'Nord', '0A2C94'),
+    ('Lydia', '000b1234', 'Imperial', '0B1240'),
+    ('Curie', '00102fa2', 'Human', '27A7E2'),
+    # name and base ID, race differs
+    ('Lydia', '000b1234', 'Nord', '0B1240'),
+    # name and the last digits of the base ID
+    ('Lydia', '00ff1234', 'Breton', '0B1240'),
+    # name only, the first row with that name wins
+    ('Lydia', '00999999', 'Breton', '0A2C94'),
+    ('Ulfric Stormcloak', '', '', '01414C'),
+    # name and race only
+    ('Lydia', '00999999', 'Imperial', '0B1240'),
+    # ID only, with the load order prefix of the plugin the NPC comes from
+    ('Housecarl', '0a0a2c8e', 'Nord', '0A2C94'),
+    ('Stormcloak Leader', 'fe01414d', 'Nord', '01414C'),
+    # names and races in a different case than the CSV
+    ('lYDIA', '000a2c8e', 'NORD', '0A2C94'),
+    ('farengar secret-fire', '00999999', 'nord', '013BBE'),
+    # empty base ID: an NPC without an ID does not match it, so the race decides
+    ('Guard', '', 'Imperial', '0F0002'),
+    ('Guard', '', 'Nord', '0F0001'),
+    ('Guard', '00999999', 'Breton', '0F0001'),
+    # empty name and race, which were 'nan' to the old lookup
+    ('', '000f0005', '', '0F0004'),
+    ('nan', '00999999', 'nan', '0F0004'),
+    ('None', '00999999', 'None', None),
+    # no match (a generic NPC)
+    ('Whiterun Guard', '00999999', 'Nord', None),
+    ('', '', '', None),
+])
+def test_find_matches_cascade(characters, character_index, character_name, character_id, character_race, expected_ref_id):
+    _, rows = characters
+    expected = find_character_info_cascade(character_name, character_id, character_race, rows)
+    actual = character_index.find(character_name, character_id, character_race)
+
+    assert actual == expected
+    assert (actual or {}).get('ref_id') == expected_ref_id
@@ -0,0 +1,82 @@
+import os
+from src.character_profiles import CharacterProfileCache, get_file_signature
+
+
+class CountingLoader:
+    def __init__(self, value) -> None:
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_a_value_is_loaded_once_while_its_signature_matches():
+    cache = CharacterProfileCache()
+    load = CountingLoader(['Lydia met the player in Whiterun.'])
+
+    assert cache.get('Lydia - 0A2C94', 'summary', (1, 10), load) == ['Lydia met the player in Whiterun.']
+    assert cache.get('Lydia - 0A2C94', 'summary', (1, 10), load) == ['Lydia met the player in Whiterun.']
+    assert load.calls == 1
+
+
+def test_a_changed_signature_loads_the_value_again():
+    cache = CharacterProfileCache()
+    cache.get('Lydia - 0A2C94', 'summary', (1, 10), CountingLoader('old'))
+
+    load = CountingLoader('edited outside of Mantella')
+    assert cache.get('Lydia - 0A2C94', 'summary', (2, 30), load) == 'edited outside of Mantella'
+    assert load.calls == 1
+
+
+def test_the_least_recently_used_npc_is_evicted():
+    cache = CharacterProfileCache(max_profiles=2)
+    cache.set('Lydia', 'summary', None, 'Lydia')
+    cache.set('Faendal', 'summary', None, 'Faendal')
+    # talking to Lydia again makes Faendal the least recently used
+    cache.get('Lydia', 'summary', None, CountingLoader('reloaded'))
+    cache.set('Camilla Valerius', 'summary', None, 'Camilla')
+
+    assert len(cache) == 2
+    assert cache.get('Lydia', 'summary', None, CountingLoader('reloaded')) == 'Lydia'
+    assert cache.get('Camilla Valerius', 'summary', None, CountingLoader('reloaded')) == 'Camilla'
+    load = CountingLoader('reloaded')
+    assert cache.get('Faendal', 'summary', None, load) == 'reloaded'
+    assert load.calls == 1
+    assert len(cache) == 2
+
+
+def test_invalidate_forgets_single_values_or_the_whole_npc():
+    cache = CharacterProfileCache()
+    cache.set('Lydia', 'summary', None, 'summary')
+    cache.set('Lydia', 'messages', None, 'messages')
+
+    cache.invalidate('Lydia', 'summary')
+    assert cache.get('Lydia', 'summary', None, CountingLoader('reloaded')) == 'reloaded'
+    assert cache.get('Lydia', 'messages', None, CountingLoader('reloaded')) == 'messages'
+
+    cache.invalidate('Lydia')
+    assert len(cache) == 0
+    cache.invalidate('Faendal')
+
+
+def test_clear_forgets_every_npc():
+    cache = CharacterProfileCache()
+    cache.set('Lydia', 'summary', None, 'Lydia')
+    cache.set('Faendal', 'summary', None, 'Faendal')
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_file_signature_changes_with_the_file(tmp_path):
+    summary_file = tmp_path / 'Lydia_summary_1.txt'
+    assert get_file_signature(str(summary_file)) is None
+
+    summary_file.write_text('Lydia met the player in Whiterun.', encoding='utf-8')
+    signature = get_file_signature(str(summary_file))
+    assert signature == (os.stat(summary_file).st_mtime_ns, os.stat(summary_file).st_size)
+
+    summary_file.write_text('Lydia met the player in Whiterun. They fought a dragon.', encoding='utf-8')
+    assert get_file_signature(str(summary_file)) != signature
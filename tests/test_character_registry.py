@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+import pytest
+from src.character_registry import CharacterRegistry
+from src.character_store import CharacterStore
+
+COLUMNS = ['name', 'voice_model', 'race', 'gender', 'ref_id', 'base_id', 'bio']
+OVERLAY_HEADER = ','.join(COLUMNS) + '\n'
+
+
+def character(name: str, race: str, base_id: str, bio: str) -> dict:
+    return {'name': name, 'voice_model': 'FemaleEvenToned', 'race': race, 'gender': 'Female', 'ref_id': base_id, 'base_id': base_id, 'bio': bio}
+
+
+@pytest.fixture
+def base_store():
+    return CharacterStore(COLUMNS, [
+        character('Lydia', 'Nord', '0A2C8E', 'Lydia is a housecarl.'),
+        character('Camilla Valerius', 'Imperial', '01348A', 'Camilla is a merchant.'),
+    ])
+
+
+@pytest.fixture
+def overlay_folder(tmp_path):
+    return tmp_path / 'overlays'
+
+
+@pytest.fixture
+def registry(base_store, overlay_folder):
+    registry = CharacterRegistry(base_store, str(overlay_folder), scan_interval=0.05)
+    yield registry
+    registry.stop()
+
+
+def write_overlay(overlay_folder, file_name: str, *rows: str, mtime_ns: int | None = None):
+    file_path = overlay_folder / file_name
+    file_path.write_text(OVERLAY_HEADER + ''.join(f'{row}\n' for row in rows), encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def bio(registry: CharacterRegistry, name: str, base_id: str, race: str) -> str | None:
+    match = registry.find(name, base_id, race)
+    return None if match is None else match['bio']
+
+
+def test_finds_characters_of_the_base_csv(registry):
+    assert bio(registry, 'Lydia', '000a2c8e', 'Nord') == 'Lydia is a housecarl.'
+    assert registry.find('Faendal', '0001a6d5', 'Bosmer') is None
+
+
+def test_an_overlay_adds_and_replaces_characters(registry, overlay_folder):
+    write_overlay(overlay_folder, 'my_npcs.csv',
+                  'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.',
+                  'Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E,Lydia is a housecarl who hates dragons.')
+    assert registry.scan()
+
+    assert bio(registry, 'Faendal', '0001a6d5', 'Bosmer') == 'Faendal is a hunter.'
+    assert bio(registry, 'Lydia', '000a2c8e', 'Nord') == 'Lydia is a housecarl who hates dragons.'
+    assert bio(registry, 'Camilla Valerius', '0001348a', 'Imperial') == 'Camilla is a merchant.'
+
+
+def test_an_unchanged_overlay_is_not_reloaded(registry, overlay_folder):
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.', mtime_ns=time.time_ns() - 10_000_000_000)
+
+    assert registry.scan()
+    assert not registry.scan()
+
+
+def test_a_more_precise_base_match_beats_an_overlay(registry, overlay_folder):
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Lydia,FemaleEvenToned,Breton,Female,0B0001,0B0002,Another Lydia.')
+    registry.scan()
+
+    assert bio(registry, 'Lydia', '000a2c8e', 'Nord') == 'Lydia is a housecarl.'
+    assert bio(registry, 'Lydia', '000b0002', 'Breton') == 'Another Lydia.'
+
+
+def test_later_overlays_win(registry, overlay_folder):
+    write_overlay(overlay_folder, 'a.csv', 'Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E,From a.')
+    write_overlay(overlay_folder, 'b.csv', 'Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E,From b.')
+    registry.scan()
+
+    assert bio(registry, 'Lydia', '000a2c8e', 'Nord') == 'From b.'
+    assert registry.find_value('name', 'lydia', 'bio') == 'From b.'
+
+
+def test_an_edited_overlay_is_picked_up(registry, overlay_folder):
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.')
+    registry.scan()
+
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a rival.')
+    assert registry.scan()
+    assert bio(registry, 'Faendal', '0001a6d5', 'Bosmer') == 'Faendal is a rival.'
+
+
+def test_a_same_size_edit_in_the_same_mtime_tick_is_picked_up(registry, overlay_folder):
+    saved_at = time.time_ns()
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.', mtime_ns=saved_at)
+    registry.scan()
+
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a farmer.', mtime_ns=saved_at)
+    registry.scan()
+    assert bio(registry, 'Faendal', '0001a6d5', 'Bosmer') == 'Faendal is a farmer.'
+
+
+def test_a_removed_overlay_restores_the_base_csv(registry, overlay_folder):
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E,Edited.')
+    registry.scan()
+
+    os.remove(overlay_folder / 'my_npcs.csv')
+    assert registry.scan()
+    assert bio(registry, 'Lydia', '000a2c8e', 'Nord') == 'Lydia is a housecarl.'
+
+
+def test_listeners_get_the_reloaded_stores_from_the_background_scan(registry, base_store, overlay_folder):
+    reloaded = threading.Event()
+    stores = []
+    def on_reload(new_stores):
+        stores[:] = new_stores
+        reloaded.set()
+    registry.add_listener(on_reload)
+    registry.start()
+
+    write_overlay(overlay_folder, 'my_npcs.csv', 'Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.')
+    assert reloaded.wait(5)
+
+    assert len(stores) == 2 and stores[-1] is base_store
+    assert registry.stores == stores
+    assert bio(registry, 'Faendal', '0001a6d5', 'Bosmer') == 'Faendal is a hunter.'
@@ -0,0 +1,115 @@
+import os
+import pytest
+import src.data_cache as data_cache
+import src.setup as setup
+
+CHARACTERS_CSV = '''name,voice_model,race,gender,ref_id,base_id,bio
+Lydia,FemaleEvenToned,Nord,Female,0A2C94,0A2C8E,Lydia is a housecarl.
+Faendal,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Faendal is a hunter.
+'''
+
+
+class CountingParser:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, file_name: str) -> list[str]:
+        self.calls += 1
+        with open(file_name, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    file_path = tmp_path / 'skyrim_characters.csv'
+    file_path.write_text(CHARACTERS_CSV, encoding='utf-8')
+    return file_path
+
+
+def set_mtime(file_path, mtime_ns: int):
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_an_unchanged_file_is_loaded_from_the_cache(csv_file):
+    parse = CountingParser()
+    first = data_cache.load_cached(str(csv_file), parse)
+
+    assert data_cache.load_cached(str(csv_file), parse) == first
+    assert parse.calls == 1
+    assert os.path.exists(data_cache.get_cache_path(str(csv_file)))
+
+
+def test_the_cache_is_rebuilt_when_the_file_changes(csv_file):
+    parse = CountingParser()
+    data_cache.load_cached(str(csv_file), parse)
+
+    csv_file.write_text(CHARACTERS_CSV.replace('Faendal', 'Sven'), encoding='utf-8')
+    assert 'Sven,MaleYoungEager,Bosmer,Male,01A6D6,01A6D5,Sven is a hunter.' in data_cache.load_cached(str(csv_file), parse)
+    assert parse.calls == 2
+
+
+def test_a_same_size_edit_is_caught_by_the_hash(csv_file):
+    parse = CountingParser()
+    data_cache.load_cached(str(csv_file), parse)
+    mtime_ns = os.stat(csv_file).st_mtime_ns
+
+    csv_file.write_text(CHARACTERS_CSV.replace('Bosmer', 'Breton'), encoding='utf-8')
+    set_mtime(csv_file, mtime_ns + 1_000_000_000)
+    assert 'Faendal,MaleYoungEager,Breton,Male,01A6D6,01A6D5,Faendal is a hunter.' in data_cache.load_cached(str(csv_file), parse)
+    assert parse.calls == 2
+
+
+def test_a_touched_but_unchanged_file_is_not_parsed_again(csv_file):
+    parse = CountingParser()
+    data_cache.load_cached(str(csv_file), parse)
+
+    set_mtime(csv_file, os.stat(csv_file).st_mtime_ns + 1_000_000_000)
+    data_cache.load_cached(str(csv_file), parse)
+    data_cache.load_cached(str(csv_file), parse)
+    assert parse.calls == 1
+    assert data_cache.read_cache(data_cache.get_cache_path(str(csv_file)))['mtime_ns'] == os.stat(csv_file).st_mtime_ns
+
+
+def test_an_unreadable_cache_is_rebuilt(csv_file):
+    parse = CountingParser()
+    data_cache.load_cached(str(csv_file), parse)
+    with open(data_cache.get_cache_path(str(csv_file)), 'wb') as f:
+        f.write(b'not a pickle')
+
+    assert data_cache.load_cached(str(csv_file), parse) == CHARACTERS_CSV.splitlines()
+    assert parse.calls == 2
+
+
+def test_rejected_cached_data_is_rebuilt(csv_file):
+    parse = CountingParser()
+    data_cache.load_cached(str(csv_file), parse)
+
+    data_cache.load_cached(str(csv_file), parse, is_valid=lambda data: False)
+    assert parse.calls == 2
+
+
+def test_a_cache_of_another_version_is_ignored(tmp_path):
+    cache_path = str(tmp_path / 'caches' / 'voices.cache')
+    data_cache.write_cache(cache_path, {'models': ['sk_malenord']}, version=1)
+
+    assert data_cache.read_cache(cache_path, version=1) == {'models': ['sk_malenord'], 'version': 1}
+    assert data_cache.read_cache(cache_path, version=2) is None
+    assert data_cache.read_cache(str(tmp_path / 'missing.cache')) is None
+
+
+def test_character_store_picks_up_an_edited_csv(csv_file):
+    characters = setup.get_character_store(str(csv_file))
+    assert characters.find_value('name', 'Faendal', 'bio') == 'Faendal is a hunter.'
+
+    csv_file.write_text(CHARACTERS_CSV.replace('Faendal is a hunter.', 'Faendal is a hunter from Valenwood.'), encoding='utf-8')
+    characters = setup.get_character_store(str(csv_file))
+    assert characters.find_value('name', 'Faendal', 'bio') == 'Faendal is a hunter from Valenwood.'
+    assert characters.find_value('name', 'Lydia', 'bio') == 'Lydia is a housecarl.'
+
+
+def test_character_store_is_rebuilt_when_its_text_file_is_missing(csv_file):
+    setup.get_character_store(str(csv_file))
+    os.remove(csv_file.parent / 'skyrim_characters.csv.text')
+
+    characters = setup.get_character_store(str(csv_file))
+    assert characters.find_value('name', 'Lydia', 'bio') == 'Lydia is a housecarl.'
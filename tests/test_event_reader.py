@@ -0,0 +1,73 @@
+import pytest
+from src.game_io.event_reader import InGameEventReader
+from src.game_io.transport import FileTransport
+
+
+@pytest.fixture
+def events_file(tmp_path):
+    return tmp_path / '_mantella_in_game_events.txt'
+
+
+@pytest.fixture
+def reader(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield InGameEventReader(transport)
+    transport.close()
+
+
+def append(events_file, text: str):
+    with open(events_file, 'a', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+def texts(events) -> list[str]:
+    return [event.text for event in events]
+
+
+def test_returns_the_last_event_before_its_line_is_ended(reader, events_file):
+    append(events_file, 'a\nb')
+    assert texts(reader.poll()) == ['a', 'b']
+
+    append(events_file, '\nc')
+    assert texts(reader.poll()) == ['c']
+    assert texts(reader.drain()) == ['a', 'b', 'c']
+
+
+def test_replaces_the_last_event_when_the_game_adds_to_its_line(reader, events_file):
+    append(events_file, 'The player picked up')
+    assert texts(reader.poll()) == ['The player picked up']
+
+    append(events_file, ' an iron sword\nThe player equipped an iron sword')
+    assert texts(reader.poll()) == ['The player picked up an iron sword', 'The player equipped an iron sword']
+    assert texts(reader.drain()) == ['The player picked up an iron sword', 'The player equipped an iron sword']
+
+
+def test_offsets_point_at_each_event(reader, events_file):
+    append(events_file, 'a\nbb')
+    append(events_file, '\ncc\n')
+    reader.poll()
+
+    assert [(event.text, event.offset) for event in reader.drain()] == [('a', 0), ('bb', 2), ('cc', 5)]
+
+
+def test_nothing_new_returns_nothing(reader, events_file):
+    append(events_file, 'a')
+    assert texts(reader.poll()) == ['a']
+    assert reader.poll() == []
+    assert texts(reader.drain()) == ['a']
+
+
+def test_reads_from_the_start_once_the_file_was_cleared(reader, events_file):
+    append(events_file, 'The player picked up a bottle of mead\n')
+    assert texts(reader.poll()) == ['The player picked up a bottle of mead']
+
+    events_file.write_text('x', encoding='utf-8')
+    assert texts(reader.poll()) == ['x']
+
+
+def test_drain_keeps_the_latest_events(reader, events_file):
+    append(events_file, '1\n2\n3\n4\n5\n6\n7')
+    reader.poll()
+
+    assert texts(reader.drain(latest=5)) == ['3', '4', '5', '6', '7']
+    assert reader.drain() == []
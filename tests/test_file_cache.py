@@ -0,0 +1,75 @@
+import os
+import time
+import pytest
+from src.game_io.file_cache import ControlFileCache
+
+
+@pytest.fixture
+def control_file(tmp_path):
+    return tmp_path / '_mantella_say_line.txt'
+
+
+def write(file_path, text: str, mtime_ns: int):
+    file_path.write_text(text, encoding='utf-8')
+    os.utime(file_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reads_the_stripped_first_line(control_file):
+    control_file.write_text(' True \nsecond line', encoding='utf-8')
+    assert ControlFileCache().read(str(control_file)) == 'True'
+
+
+def test_a_missing_file_reads_as_empty(control_file):
+    assert ControlFileCache().read(str(control_file)) == ''
+
+
+def test_an_unchanged_file_is_only_read_once(control_file):
+    write(control_file, 'True', time.time_ns() - 10_000_000_000)
+    cache = ControlFileCache()
+
+    assert [cache.read(str(control_file)) for _ in range(3)] == ['True'] * 3
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_a_changed_file_is_read_again(control_file):
+    written_at = time.time_ns() - 10_000_000_000
+    write(control_file, 'False', written_at)
+    cache = ControlFileCache()
+    assert cache.read(str(control_file)) == 'False'
+
+    write(control_file, 'True', written_at + 1_000_000_000)
+    assert cache.read(str(control_file)) == 'True'
+
+
+def test_a_same_size_rewrite_within_the_racy_window_is_not_missed(control_file):
+    # both writes land in the same mtime tick and have the same size, so only the racy window tells them apart
+    written_at = time.time_ns()
+    write(control_file, 'True', written_at)
+    cache = ControlFileCache(racy_window=60)
+    assert cache.read(str(control_file)) == 'True'
+
+    write(control_file, 'Fals', written_at)
+    assert cache.read(str(control_file)) == 'Fals'
+    assert cache.hits == 0
+
+
+def test_a_same_size_rewrite_after_the_racy_window_is_trusted(control_file):
+    written_at = time.time_ns() - 10_000_000_000
+    write(control_file, 'True', written_at)
+    cache = ControlFileCache(racy_window=0.05)
+    assert cache.read(str(control_file)) == 'True'
+    assert cache.read(str(control_file)) == 'True'
+    assert cache.hits == 1
+
+
+def test_invalidate_forgets_the_content(control_file):
+    written_at = time.time_ns() - 10_000_000_000
+    write(control_file, 'True', written_at)
+    cache = ControlFileCache()
+    cache.read(str(control_file))
+
+    # a rewrite the stat cannot see
+    write(control_file, 'Fals', written_at)
+    assert cache.read(str(control_file)) == 'True'
+    cache.invalidate(str(control_file))
+    assert cache.read(str(control_file)) == 'Fals'
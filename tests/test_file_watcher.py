@@ -0,0 +1,111 @@
+import asyncio
+import sys
+import threading
+import time
+import pytest
+from src.game_io.file_watcher import FileWatcher, InotifyWatcher, PollingWatcher, create_watcher
+
+WATCHERS = [PollingWatcher]
+if sys.platform.startswith('linux'):
+    WATCHERS.append(InotifyWatcher)
+
+
+@pytest.fixture(params=WATCHERS, ids=lambda watcher_class: watcher_class.__name__)
+def watcher(request, tmp_path):
+    watcher = request.param(str(tmp_path))
+    yield watcher
+    watcher.stop()
+
+
+def write_later(file_path, text: str, delay: float = 0.1) -> threading.Timer:
+    timer = threading.Timer(delay, file_path.write_text, (text,), {'encoding': 'utf-8'})
+    timer.start()
+    return timer
+
+
+def test_create_watcher_returns_a_working_watcher(tmp_path):
+    watcher = create_watcher(str(tmp_path))
+    try:
+        assert isinstance(watcher, FileWatcher)
+        assert watcher.directory == str(tmp_path)
+    finally:
+        watcher.stop()
+
+
+def test_a_missing_file_reads_as_empty(watcher):
+    assert watcher.wait_for('_mantella_say_line.txt', lambda text: text == '', timeout=1) == ''
+
+
+def test_wait_for_returns_straight_away_if_the_file_already_matches(watcher, tmp_path):
+    (tmp_path / '_mantella_actor_count.txt').write_text('2\nignored', encoding='utf-8')
+    assert watcher.wait_for('_mantella_actor_count.txt', lambda text: text == '2', timeout=0) == '2'
+
+
+def test_wait_for_wakes_up_on_the_write(watcher, tmp_path):
+    (tmp_path / '_mantella_say_line.txt').write_text('False', encoding='utf-8')
+    timer = write_later(tmp_path / '_mantella_say_line.txt', 'True')
+
+    start = time.monotonic()
+    assert watcher.wait_for('_mantella_say_line.txt', lambda text: text.lower() == 'true', timeout=5) == 'True'
+    assert time.monotonic() - start < 1
+    timer.join()
+
+
+def test_wait_for_times_out(watcher, tmp_path):
+    (tmp_path / '_mantella_say_line.txt').write_text('False', encoding='utf-8')
+    with pytest.raises(TimeoutError):
+        watcher.wait_for('_mantella_say_line.txt', lambda text: text.lower() == 'true', timeout=0.2)
+
+
+def test_wait_for_any_returns_the_file_that_matched(watcher, tmp_path):
+    timer = write_later(tmp_path / '_mantella_end_conversation.txt', 'True')
+
+    file_name, text = watcher.wait_for_any({
+        '_mantella_text_input_enabled.txt': lambda text: text.lower() == 'true',
+        '_mantella_end_conversation.txt': lambda text: text.lower() == 'true',
+    }, timeout=5)
+
+    assert (file_name, text) == ('_mantella_end_conversation.txt', 'True')
+    timer.join()
+
+
+def test_wait_for_async_does_not_block_the_event_loop(watcher, tmp_path):
+    async def wait_while_ticking():
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+        ticker = asyncio.create_task(tick())
+        text = await watcher.wait_for_async('_mantella_say_line.txt', lambda text: text == 'True', timeout=5)
+        ticker.cancel()
+        return text, ticks
+
+    timer = write_later(tmp_path / '_mantella_say_line.txt', 'True', delay=0.2)
+    text, ticks = asyncio.run(wait_while_ticking())
+
+    assert text == 'True'
+    assert ticks > 5
+    timer.join()
+
+
+def test_subscribers_are_told_which_file_changed(watcher, tmp_path):
+    changed = []
+    written = threading.Event()
+    def on_change(file_name):
+        changed.append(file_name)
+        written.set()
+    handle = watcher.subscribe('_mantella_say_line.txt', on_change)
+
+    (tmp_path / '_mantella_say_line.txt').write_text('True', encoding='utf-8')
+    assert written.wait(5)
+    assert set(changed) == {'_mantella_say_line.txt'}
+
+    watcher.unsubscribe(handle)
+    # let a notification that was already being delivered finish
+    time.sleep(0.05)
+    changed.clear()
+    (tmp_path / '_mantella_say_line.txt').write_text('False', encoding='utf-8')
+    time.sleep(0.2)
+    assert changed == []
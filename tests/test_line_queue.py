@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from src.game_io.line_queue import SayLineQueue
+from src.game_io.transport import FileTransport
+from src.game_manager import GameStateManager
+
+
+@pytest.fixture
+def game_state_manager(tmp_path):
+    game_state_manager = GameStateManager(str(tmp_path), 'Skyrim', FileTransport(str(tmp_path)))
+    yield game_state_manager
+    game_state_manager.transport.close()
+
+
+@pytest.fixture
+def game(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield transport
+    transport.close()
+
+
+def test_lines_go_into_slots_in_sequence_order(game_state_manager, game):
+    queue = SayLineQueue(game_state_manager, depth=2, ack_timeout=1)
+
+    async def send_lines():
+        queue.reset()
+        for actor_number, subtitle in enumerate(['Hello.', 'How are you?']):
+            sequence, slot = await queue.acquire_slot()
+            queue.publish(sequence, slot, actor_number, subtitle)
+
+    asyncio.run(send_lines())
+
+    assert game.read(SayLineQueue.slot_file(0)) == '1|0|Hello.'
+    assert game.read(SayLineQueue.slot_file(1)) == '2|1|How are you?'
+    assert queue.last_sequence == 2
+
+
+def test_a_slot_is_reused_once_its_line_was_acknowledged(game_state_manager, game):
+    queue = SayLineQueue(game_state_manager, depth=2, ack_timeout=5)
+
+    async def send_lines():
+        queue.reset()
+        for subtitle in ['One.', 'Two.']:
+            queue.publish(*await queue.acquire_slot(), 0, subtitle)
+        next_slot = asyncio.create_task(queue.acquire_slot())
+        await asyncio.sleep(0.2)
+        assert not next_slot.done()
+
+        game.write(SayLineQueue.ACK_FILE, '1')
+        assert await next_slot == (3, 0)
+        queue.publish(3, 0, 0, 'Three.')
+
+        game.write(SayLineQueue.ACK_FILE, '3')
+        assert await queue.wait_until_played()
+
+    asyncio.run(send_lines())
+    assert queue.is_enabled
+
+
+def test_falls_back_to_the_say_line_flag_if_the_game_never_acknowledges(game_state_manager):
+    queue = SayLineQueue(game_state_manager, depth=1, ack_timeout=0.2)
+
+    async def send_lines():
+        queue.reset()
+        queue.publish(*await queue.acquire_slot(), 0, 'Hello.')
+        return await queue.acquire_slot(), await queue.wait_until_played()
+
+    assert asyncio.run(send_lines()) == (None, False)
+    assert not queue.is_enabled
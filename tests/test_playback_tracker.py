@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from src.game_io.playback_tracker import PlaybackTracker
+from src.game_io.transport import FileTransport
+
+
+@pytest.fixture
+def mantella(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield transport
+    transport.close()
+
+
+@pytest.fixture
+def game(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield transport
+    transport.close()
+
+
+def start_lines(game: FileTransport, actor_count: int):
+    game.write_many({'_mantella_say_line': 'True', **{f'_mantella_say_line_{i}': 'True' for i in range(2, actor_count + 1)}})
+
+
+def test_complete_once_every_actor_has_finished(mantella, game):
+    start_lines(game, 3)
+    tracker = PlaybackTracker.for_actor_count(mantella, 3)
+
+    async def finish_lines():
+        waiting = asyncio.create_task(tracker.wait(timeout=5))
+        for say_line_file in ['_mantella_say_line_3', '_mantella_say_line']:
+            game.write(say_line_file, 'False')
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+        game.write('_mantella_say_line_2', 'False')
+        await waiting
+
+    asyncio.run(finish_lines())
+    assert tracker.is_complete()
+
+
+def test_only_the_actors_in_the_conversation_are_tracked(mantella, game):
+    start_lines(game, 3)
+    game.write_many({'_mantella_say_line': 'False', '_mantella_say_line_2': 'false'})
+
+    assert PlaybackTracker.for_actor_count(mantella, 2).is_complete()
+    assert not PlaybackTracker.for_actor_count(mantella, 3).is_complete()
+
+
+def test_returns_straight_away_if_playback_has_already_finished(mantella, game):
+    game.write('_mantella_say_line', 'False')
+    asyncio.run(asyncio.wait_for(PlaybackTracker.for_actor_count(mantella, 1).wait(), 1))
+
+
+def test_times_out_while_a_line_is_still_playing(mantella, game):
+    start_lines(game, 1)
+    with pytest.raises(TimeoutError):
+        asyncio.run(PlaybackTracker.for_actor_count(mantella, 1).wait(timeout=0.2))
@@ -0,0 +1,22 @@
+import builtins
+import pytest
+import src.setup as setup
+from src.startup import Startup
+
+
+class SkyrimConfig:
+    game = 'Skyrim'
+
+
+def test_an_unreadable_character_csv_fails_startup_without_prompting(tmp_path, monkeypatch):
+    def prompt(*args):
+        raise AssertionError('the Startup thread asked for input')
+    monkeypatch.setattr(builtins, 'input', prompt)
+    missing_file = str(tmp_path / 'skyrim_characters.csv')
+
+    startup = Startup()
+    startup.add('config', lambda: SkyrimConfig())
+    startup.add('character_store', lambda config: setup.load_character_store(config, (missing_file, missing_file)), 'config')
+
+    with pytest.raises(OSError):
+        startup.run()
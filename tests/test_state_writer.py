@@ -0,0 +1,116 @@
+import builtins
+import os
+import pytest
+import src.game_io.state_writer as state_writer
+from src.game_io.state_writer import GameStateWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return GameStateWriter(str(tmp_path), retry_delays=(0.01, 0.01, 0.01))
+
+
+def lock_file(monkeypatch, file_name: str, failures: int) -> list[str]:
+    """Makes writes to `file_name` fail with PermissionError `failures` times, as when the game has the file open"""
+    attempts = []
+    def open_locked(file, mode='r', *args, **kwargs):
+        if 'w' in mode and os.path.basename(file) == file_name:
+            attempts.append(file_name)
+            if len(attempts) <= failures:
+                raise PermissionError(13, 'Permission denied', file)
+        return builtins.open(file, mode, *args, **kwargs)
+    monkeypatch.setattr(state_writer, 'open', open_locked, raising=False)
+    return attempts
+
+
+def test_writes_new_values(writer, tmp_path):
+    assert writer.write('_mantella_status.txt', 'Listening...')
+    assert (tmp_path / '_mantella_status.txt').read_text(encoding='utf-8') == 'Listening...'
+
+
+def test_skips_a_value_the_file_still_holds(writer, tmp_path):
+    writer.write('_mantella_say_line.txt', 'True')
+
+    assert not writer.write('_mantella_say_line.txt', 'True')
+    assert writer.write('_mantella_say_line.txt', 'False')
+
+
+def test_rewrites_a_value_the_game_has_changed(writer, tmp_path):
+    writer.write('_mantella_say_line.txt', 'True')
+    (tmp_path / '_mantella_say_line.txt').write_text('False', encoding='utf-8')
+
+    assert writer.write('_mantella_say_line.txt', 'True')
+    assert (tmp_path / '_mantella_say_line.txt').read_text(encoding='utf-8') == 'True'
+
+
+def test_compares_the_content_of_a_racily_clean_file(writer, tmp_path):
+    file_path = tmp_path / '_mantella_say_line.txt'
+    writer.write('_mantella_say_line.txt', 'True')
+    # the game writes a value of the same size in the same mtime tick, so the stat looks unchanged
+    stat = os.stat(file_path)
+    file_path.write_text('Fals', encoding='utf-8')
+    os.utime(file_path, ns=(stat.st_mtime_ns, stat.st_mtime_ns))
+
+    assert writer.write('_mantella_say_line.txt', 'True')
+    assert file_path.read_text(encoding='utf-8') == 'True'
+
+
+def test_rewrites_a_deleted_file(writer, tmp_path):
+    writer.write('_mantella_say_line.txt', 'True')
+    os.remove(tmp_path / '_mantella_say_line.txt')
+
+    assert writer.write('_mantella_say_line.txt', 'True')
+
+
+def test_forget_writes_the_value_again(writer, tmp_path):
+    writer.write('_mantella_say_line.txt', 'True')
+    writer.forget('_mantella_say_line.txt')
+
+    assert writer.write('_mantella_say_line.txt', 'True')
+
+
+def test_batch_writes_the_last_value_of_each_changed_file(writer, tmp_path):
+    writer.write('_mantella_actor_count.txt', '1')
+
+    batch = writer.batch()
+    batch.set('_mantella_status.txt', 'Thinking...')
+    batch.set('_mantella_status.txt', 'Speaking...')
+    batch.set('_mantella_actor_count.txt', '1')
+    assert batch.flush() == 1
+    assert batch.flush() == 0
+
+    assert (tmp_path / '_mantella_status.txt').read_text(encoding='utf-8') == 'Speaking...'
+
+
+def test_batch_is_written_when_the_block_exits(writer, tmp_path):
+    with writer.batch() as batch:
+        batch.set('_mantella_status.txt', 'Speaking...')
+        assert not (tmp_path / '_mantella_status.txt').exists()
+
+    assert (tmp_path / '_mantella_status.txt').read_text(encoding='utf-8') == 'Speaking...'
+
+
+def test_batch_is_dropped_on_an_error(writer, tmp_path):
+    with pytest.raises(RuntimeError):
+        with writer.batch() as batch:
+            batch.set('_mantella_status.txt', 'Speaking...')
+            raise RuntimeError()
+
+    assert not (tmp_path / '_mantella_status.txt').exists()
+
+
+def test_retries_a_locked_file(writer, tmp_path, monkeypatch):
+    attempts = lock_file(monkeypatch, '_mantella_say_line.txt', failures=2)
+
+    assert writer.write_many({'_mantella_say_line.txt': 'True', '_mantella_status.txt': 'Speaking...'}) == 2
+    assert len(attempts) == 3
+    assert (tmp_path / '_mantella_say_line.txt').read_text(encoding='utf-8') == 'True'
+
+
+def test_gives_up_on_a_file_that_stays_locked(writer, monkeypatch):
+    attempts = lock_file(monkeypatch, '_mantella_say_line.txt', failures=100)
+
+    with pytest.raises(PermissionError):
+        writer.write('_mantella_say_line.txt', 'True')
+    # the first try and one per retry delay
+    assert len(attempts) == 4
@@ -0,0 +1,35 @@
+import hashlib
+import pytest
+import tiktoken.load
+import src.llm.tokenizer as tokenizer
+
+
+@pytest.fixture
+def cache_folder(tmp_path, monkeypatch):
+    monkeypatch.setenv('TIKTOKEN_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(tokenizer, '_cache_folder', None)
+    return tmp_path / 'cache'
+
+
+@pytest.mark.parametrize('encoding_name', sorted(tokenizer.ENCODING_URLS))
+def test_cache_file_names_follow_tiktoken(encoding_name):
+    url = tokenizer.ENCODING_URLS[encoding_name]
+    assert tokenizer.get_cache_file_name(url) == hashlib.sha1(url.encode()).hexdigest()
+
+
+def test_bundled_encodings_have_a_download_url():
+    assert tokenizer.DEFAULT_ENCODING in tokenizer.BUNDLED_ENCODINGS
+    assert all(encoding_name in tokenizer.ENCODING_URLS for encoding_name in tokenizer.BUNDLED_ENCODINGS)
+
+
+def test_tiktoken_reads_bundled_encodings_from_the_cache(tmp_path, cache_folder):
+    tokenizer_folder = tmp_path / 'tokenizers'
+    tokenizer_folder.mkdir()
+    for encoding_name in tokenizer.BUNDLED_ENCODINGS:
+        (tokenizer_folder / f'{encoding_name}.tiktoken').write_bytes(f'{encoding_name} ranks'.encode())
+
+    assert tokenizer.get_cache_folder(str(tokenizer_folder)) == str(cache_folder)
+
+    # tiktoken would download the file if it was not cached under the name it expects
+    for encoding_name in tokenizer.BUNDLED_ENCODINGS:
+        assert tiktoken.load.read_file_cached(tokenizer.ENCODING_URLS[encoding_name]) == f'{encoding_name} ranks'.encode()
@@ -0,0 +1,111 @@
+import json
+import socket
+import pytest
+from src.game_io.transport import FileTransport, SocketTransport
+
+TIMEOUT = 5
+
+
+@pytest.fixture
+def mantella_files(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield transport
+    transport.close()
+
+
+@pytest.fixture
+def game_files(tmp_path):
+    transport = FileTransport(str(tmp_path))
+    yield transport
+    transport.close()
+
+
+@pytest.fixture
+def mantella_socket():
+    transport = SocketTransport(port=0)
+    yield transport
+    transport.close()
+
+
+def connect_game(mantella_socket: SocketTransport) -> SocketTransport:
+    return SocketTransport(port=mantella_socket.port, listen=False, connect_timeout=TIMEOUT)
+
+
+def test_files_round_trip(mantella_files, game_files, tmp_path):
+    mantella_files.write_many({'_mantella_status': 'Listening...', '_mantella_say_line': 'True'})
+
+    assert (tmp_path / '_mantella_say_line.txt').read_text(encoding='utf-8') == 'True'
+    assert game_files.wait_for('_mantella_say_line', lambda text: text == 'True', timeout=TIMEOUT) == 'True'
+
+    game_files.write('_mantella_say_line', 'False')
+    assert mantella_files.wait_for('_mantella_say_line', lambda text: text == 'False', timeout=TIMEOUT) == 'False'
+
+
+def test_files_read_the_first_line_or_everything(mantella_files, tmp_path):
+    (tmp_path / '_mantella_in_game_events.txt').write_text(' first \nsecond\n', encoding='utf-8')
+
+    assert mantella_files.read('_mantella_in_game_events') == 'first'
+    assert mantella_files.read_all('_mantella_in_game_events') == ' first \nsecond\n'
+    assert mantella_files.read('_mantella_missing') == ''
+
+
+def test_files_read_from_an_offset_and_restart_once_truncated(mantella_files, tmp_path):
+    (tmp_path / '_mantella_in_game_events.txt').write_bytes(b'a\nb\n')
+    assert mantella_files.read_from('_mantella_in_game_events', 2) == (2, b'b\n')
+
+    (tmp_path / '_mantella_in_game_events.txt').write_bytes(b'c')
+    assert mantella_files.read_from('_mantella_in_game_events', 4) == (0, b'c')
+    assert mantella_files.read_from('_mantella_missing', 4) == (0, b'')
+
+
+def test_socket_round_trip(mantella_socket):
+    game = connect_game(mantella_socket)
+    try:
+        mantella_socket.write('_mantella_say_line', 'True\nignored')
+        assert game.wait_for('_mantella_say_line', lambda text: text == 'True', timeout=TIMEOUT) == 'True'
+        assert game.read_all('_mantella_say_line') == 'True\nignored'
+
+        game.write_many({'_mantella_current_actor': 'Lydia', '_mantella_say_line': 'False'})
+        assert mantella_socket.wait_for('_mantella_say_line', lambda text: text == 'False', timeout=TIMEOUT) == 'False'
+        assert mantella_socket.read('_mantella_current_actor') == 'Lydia'
+    finally:
+        game.close()
+
+
+def test_socket_sends_what_was_set_before_the_game_connected(mantella_socket):
+    mantella_socket.write('_mantella_status', 'Waiting for the game')
+
+    game = connect_game(mantella_socket)
+    try:
+        assert game.wait_for('_mantella_status', lambda text: text == 'Waiting for the game', timeout=TIMEOUT)
+    finally:
+        game.close()
+
+
+def test_socket_reconnect(mantella_socket):
+    game = connect_game(mantella_socket)
+    mantella_socket.write('_mantella_status', 'Listening...')
+    game.wait_for('_mantella_status', lambda text: text == 'Listening...', timeout=TIMEOUT)
+    game.write('_mantella_current_actor', 'Lydia')
+    mantella_socket.wait_for('_mantella_current_actor', lambda text: text == 'Lydia', timeout=TIMEOUT)
+    game.close()
+
+    # the game reloads a save and connects again
+    mantella_socket.write('_mantella_status', 'Thinking...')
+    game = connect_game(mantella_socket)
+    try:
+        assert game.wait_for('_mantella_status', lambda text: text == 'Thinking...', timeout=TIMEOUT)
+
+        game.write('_mantella_current_actor', 'Faendal')
+        assert mantella_socket.wait_for('_mantella_current_actor', lambda text: text == 'Faendal', timeout=TIMEOUT) == 'Faendal'
+
+        mantella_socket.write('_mantella_status', 'Speaking...')
+        assert game.wait_for('_mantella_status', lambda text: text == 'Speaking...', timeout=TIMEOUT)
+    finally:
+        game.close()
+
+
+def test_socket_ignores_malformed_messages(mantella_socket):
+    with socket.create_connection(('127.0.0.1', mantella_socket.port), timeout=TIMEOUT) as game:
+        game.sendall(b'not json\n' + json.dumps({'op': 'set', 'key': '_mantella_say_line', 'value': 'False'}).encode() + b'\n')
+        assert mantella_socket.wait_for('_mantella_say_line', lambda text: text == 'False', timeout=TIMEOUT) == 'False'
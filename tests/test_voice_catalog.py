@@ -0,0 +1,121 @@
+import json
+import os
+import pytest
+from src.voice_catalog import VoiceCatalog, VoiceModelInfo
+
+
+@pytest.fixture
+def model_folder(tmp_path):
+    folder = tmp_path / 'models' / 'Skyrim'
+    folder.mkdir(parents=True)
+    return folder
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / 'voice_models' / 'Skyrim.cache')
+
+
+@pytest.fixture
+def parsed_files(monkeypatch) -> list[str]:
+    """Records every .json file the catalog parses"""
+    parsed_files = []
+    from_json_file = VoiceModelInfo.from_json_file
+    def record(json_file):
+        parsed_files.append(os.path.basename(json_file))
+        return from_json_file(json_file)
+    monkeypatch.setattr(VoiceModelInfo, 'from_json_file', staticmethod(record))
+    return parsed_files
+
+
+def write_model(model_folder, model_name: str, model_version: float = 3.0, base_speaker_emb: list[float] | None = None, mtime_ns: int | None = None):
+    model = {'modelType': 'xVAPitch', 'modelVersion': model_version, 'games': [{'base_speaker_emb': base_speaker_emb}] if base_speaker_emb else []}
+    json_file = model_folder / f'{model_name}.json'
+    json_file.write_text(json.dumps(model), encoding='utf-8')
+    if mtime_ns is not None:
+        os.utime(json_file, ns=(mtime_ns, mtime_ns))
+
+
+def test_reads_the_metadata_of_every_model(model_folder, cache_file):
+    write_model(model_folder, 'sk_malenord', base_speaker_emb=[0.5, -1.25])
+    write_model(model_folder, 'sk_femaleeventoned', model_version=1.0)
+    (model_folder / 'sk_malenord.pt').write_bytes(b'weights')
+
+    catalog = VoiceCatalog(str(model_folder), cache_file)
+    catalog.start()
+    malenord = catalog.get('sk_malenord')
+
+    assert len(catalog) == 2
+    assert malenord.path == os.path.join(str(model_folder), 'sk_malenord')
+    assert (malenord.model_type, malenord.model_version, malenord.base_speaker_emb) == ('xVAPitch', 3.0, '0.5, -1.25')
+    assert catalog.get('sk_femaleeventoned').base_speaker_emb is None
+    assert catalog.get('sk_maleorc') is None
+
+
+def test_a_later_scan_only_parses_changed_models(model_folder, cache_file, parsed_files):
+    write_model(model_folder, 'sk_malenord', mtime_ns=1_000_000_000)
+    write_model(model_folder, 'sk_femaleeventoned', mtime_ns=1_000_000_000)
+    VoiceCatalog(str(model_folder), cache_file).scan()
+    parsed_files.clear()
+
+    write_model(model_folder, 'sk_malenord', model_version=3.01, mtime_ns=2_000_000_000)
+    catalog = VoiceCatalog(str(model_folder), cache_file)
+    catalog.scan()
+
+    assert parsed_files == ['sk_malenord.json']
+    assert catalog.get('sk_malenord').model_version == 3.01
+    assert catalog.get('sk_femaleeventoned').model_version == 3.0
+
+
+def test_the_signature_changes_when_a_model_is_replaced(model_folder, cache_file):
+    write_model(model_folder, 'sk_malenord', mtime_ns=1_000_000_000)
+    signature = VoiceCatalog(str(model_folder), cache_file).get_signature('sk_malenord')
+
+    write_model(model_folder, 'sk_malenord', model_version=3.01, mtime_ns=2_000_000_000)
+    assert VoiceCatalog(str(model_folder), cache_file).get_signature('sk_malenord') != signature
+    assert VoiceCatalog(str(model_folder), cache_file).get_signature('sk_maleorc') is None
+
+
+def test_a_model_downloaded_after_the_scan_is_found(model_folder, cache_file):
+    catalog = VoiceCatalog(str(model_folder), cache_file)
+    catalog.scan()
+
+    write_model(model_folder, 'sk_maleorc')
+    assert catalog.get('sk_maleorc').model_type == 'xVAPitch'
+    assert len(catalog) == 1
+
+
+def test_removed_and_unreadable_models_are_left_out(model_folder, cache_file):
+    write_model(model_folder, 'sk_malenord')
+    write_model(model_folder, 'sk_maleorc')
+    VoiceCatalog(str(model_folder), cache_file).scan()
+
+    os.remove(model_folder / 'sk_malenord.json')
+    (model_folder / 'sk_maleorc.json').write_text('{"modelType": ', encoding='utf-8')
+    catalog = VoiceCatalog(str(model_folder), cache_file)
+    catalog.scan()
+
+    assert len(catalog) == 0
+    assert catalog.get('sk_malenord') is None
+    assert catalog.get('sk_maleorc') is None
+
+
+def test_a_cache_of_another_models_folder_is_not_used(tmp_path, model_folder, cache_file, parsed_files):
+    write_model(model_folder, 'sk_malenord', mtime_ns=1_000_000_000)
+    VoiceCatalog(str(model_folder), cache_file).scan()
+
+    # xvasynth_folder now points at another install with a model of the same name and stat
+    other_folder = tmp_path / 'other' / 'Skyrim'
+    other_folder.mkdir(parents=True)
+    write_model(other_folder, 'sk_malenord', mtime_ns=1_000_000_000)
+    parsed_files.clear()
+    catalog = VoiceCatalog(str(other_folder), cache_file)
+
+    assert catalog.get('sk_malenord').path == os.path.join(str(other_folder), 'sk_malenord')
+    assert parsed_files == ['sk_malenord.json']
+
+
+def test_a_missing_models_folder_has_no_models(tmp_path, cache_file):
+    catalog = VoiceCatalog(str(tmp_path / 'missing'), cache_file)
+    assert catalog.get('sk_malenord') is None
+    assert len(catalog) == 0